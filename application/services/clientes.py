@@ -0,0 +1,117 @@
+"""
+CAPA: Application / Services
+==============================
+Directorio de clientes.
+
+  - Índices hash por id, nombre normalizado, email y teléfono: toda
+    búsqueda es un lookup en un dict.
+  - Perfil de pago por (cliente, pasarela) calculado una vez con
+    IPasarelaPago.perfil_cliente() y guardado en caché; se descarta si
+    cambian los datos de contacto.
+  - Historial de pedidos pagados indexado por id de cliente.
+"""
+import threading
+
+from domain.model.modelos import Cliente, Pedido
+from domain.interfaces.interfaces import IPasarelaPago
+
+
+class DirectorioClientes:
+    """Clientes registrados, sus perfiles de pago y sus pedidos."""
+
+    def __init__(self):
+        self._por_id:       dict[str, Cliente] = {}
+        self._por_nombre:   dict[str, Cliente] = {}
+        self._por_email:    dict[str, Cliente] = {}
+        self._por_telefono: dict[str, Cliente] = {}
+        self._perfiles: dict[tuple[str, str], dict] = {}     # (id, pasarela) → perfil
+        self._pedidos:  dict[str, list[Pedido]] = {}         # id → pedidos pagados
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._por_id)
+
+    # ── Registro ──────────────────────────────────────────
+
+    def registrar(self, nombre: str, email: str = "", telefono: str = "") -> Cliente:
+        """
+        Retorna el cliente con ese nombre, creándolo si no existe. Si se
+        pasan email o teléfono se actualizan sus datos de contacto.
+        """
+        email, telefono = email.strip().lower(), _solo_digitos(telefono)
+        with self._lock:
+            cliente = self._por_nombre.get(Cliente.normalizar(nombre))
+            if cliente is None:
+                self._verificar_libres("", email, telefono)
+                cliente = Cliente.desde_nombre(nombre, email, telefono)
+                # Los datos derivados del nombre pueden chocar con los de otro
+                if cliente.email in self._por_email:
+                    cliente.email = f"{cliente.id.lower()}@email.com"
+                while cliente.telefono in self._por_telefono:
+                    cliente.telefono = str(900000000 + (int(cliente.telefono) + 1) % 100000000)
+                self._indexar(cliente)
+            elif (email and email != cliente.email) or (telefono and telefono != cliente.telefono):
+                self._verificar_libres(cliente.id, email, telefono)
+                self._desindexar(cliente)
+                cliente.email    = email or cliente.email
+                cliente.telefono = telefono or cliente.telefono
+                self._indexar(cliente)
+                for pasarela in [k for k in self._perfiles if k[0] == cliente.id]:
+                    del self._perfiles[pasarela]
+            return cliente
+
+    def _verificar_libres(self, id_cliente: str, email: str, telefono: str):
+        otro = self._por_email.get(email) if email else None
+        if otro is not None and otro.id != id_cliente:
+            raise ValueError(f"El email '{email}' ya pertenece a otro cliente ({otro.id}).")
+        otro = self._por_telefono.get(telefono) if telefono else None
+        if otro is not None and otro.id != id_cliente:
+            raise ValueError(f"El teléfono '{telefono}' ya pertenece a otro cliente ({otro.id}).")
+
+    def _indexar(self, cliente: Cliente):
+        self._por_id[cliente.id] = cliente
+        self._por_nombre[Cliente.normalizar(cliente.nombre)] = cliente
+        self._por_email[cliente.email] = cliente
+        self._por_telefono[cliente.telefono] = cliente
+
+    def _desindexar(self, cliente: Cliente):
+        self._por_email.pop(cliente.email, None)
+        self._por_telefono.pop(cliente.telefono, None)
+
+    # ── Búsquedas ─────────────────────────────────────────
+
+    def por_id(self, id_cliente: str) -> Cliente | None:
+        return self._por_id.get(id_cliente.upper())
+
+    def por_nombre(self, nombre: str) -> Cliente | None:
+        return self._por_nombre.get(Cliente.normalizar(nombre))
+
+    def por_email(self, email: str) -> Cliente | None:
+        return self._por_email.get(email.strip().lower())
+
+    def por_telefono(self, telefono: str) -> Cliente | None:
+        return self._por_telefono.get(_solo_digitos(telefono))
+
+    # ── Perfiles de pago ──────────────────────────────────
+
+    def perfil_pago(self, id_cliente: str, clave_pasarela: str,
+                    pasarela: IPasarelaPago) -> dict:
+        clave = (id_cliente, clave_pasarela)
+        perfil = self._perfiles.get(clave)
+        if perfil is None:
+            perfil = self._perfiles[clave] = pasarela.perfil_cliente(self._por_id[id_cliente])
+        return perfil
+
+    # ── Pedidos ───────────────────────────────────────────
+
+    def registrar_pedido(self, pedido: Pedido):
+        self._pedidos.setdefault(pedido.id_cliente, []).append(pedido)
+
+    def pedidos_de(self, id_cliente: str) -> list[Pedido]:
+        return self._pedidos.get(id_cliente, [])
+
+
+def _solo_digitos(telefono: str) -> str:
+    """'+51 987-654-321' → '987654321' (sin prefijo de país)."""
+    digitos = "".join(c for c in telefono if c.isdigit())
+    return digitos[2:] if len(digitos) == 11 and digitos.startswith("51") else digitos
@@ -0,0 +1,123 @@
+"""
+CAPA: Application / Services
+==============================
+Límites de compra declarativos.
+
+Los límites (LimiteCompra) se compilan en tablas de lookup: un dict por
+ámbito (tipo, producto, cliente) más el máximo de unidades por pedido.
+Cada verificación hace unos pocos lookups y compara contra contadores
+ya agregados:
+  - del carrito: Sesion.unidades / Sesion.total_unidades
+  - del cliente: unidades compradas en pedidos pagados, por producto
+
+Las reglas se comprueban contra lo que habría en el carrito tras agregar,
+no solo contra la cantidad nueva: repetir "agregar" no las esquiva.
+
+Una regla por (ámbito, clave): agregar otra con la misma clave la
+reemplaza (sube o baja el máximo) y quitar() la elimina. Las compras se
+cuentan para todos los productos, así que un límite por cliente agregado
+después ya ve lo que el cliente compró antes.
+"""
+from domain.model.modelos import Producto, ItemPedido, LimiteCompra, Sesion
+from infrastructure.config.configuracion import ConfiguracionTienda
+
+
+AMBITOS = ("TIPO", "PRODUCTO", "CLIENTE")
+
+
+class TablaLimites:
+    """Tablas compiladas de límites y contadores de compras por cliente."""
+
+    def __init__(self, limites: list[LimiteCompra] = (), max_pedido: int | None = None):
+        self._limites: list[LimiteCompra] = []
+        self._max_pedido = max_pedido
+        self._por_tipo:     dict[str, int] = {}
+        self._por_producto: dict[str, int] = {}
+        self._por_cliente:  dict[str, int] = {}
+        self._compradas: dict[tuple[str, str], int] = {}   # (cliente, id) → unidades
+        self.agregar(*limites)
+
+    @classmethod
+    def desde_config(cls, config: ConfiguracionTienda) -> "TablaLimites":
+        limites  = [LimiteCompra("TIPO", t, n) for t, n in config.obtener("limites_por_tipo").items()]
+        limites += [LimiteCompra("PRODUCTO", i, n) for i, n in config.obtener("limites_producto").items()]
+        limites += [LimiteCompra("CLIENTE", i, n) for i, n in config.obtener("limites_cliente").items()]
+        return cls(limites, config.obtener("max_items_pedido"))
+
+    # ── Compilación ───────────────────────────────────────
+
+    def agregar(self, *limites: LimiteCompra):
+        """Agrega reglas; la de un (ámbito, clave) que ya existía la reemplaza."""
+        for limite in limites:
+            tabla, clave = self._tabla(limite.ambito), limite.clave.upper()
+            if limite.maximo < 0:
+                raise ValueError(f"Máximo inválido para {limite.ambito.upper()} "
+                                 f"'{limite.clave}': {limite.maximo}")
+            self.quitar(limite.ambito, clave)
+            tabla[clave] = limite.maximo
+            self._limites.append(limite)
+
+    def quitar(self, ambito: str, clave: str) -> bool:
+        """Elimina la regla de (ámbito, clave). Retorna False si no existía."""
+        tabla, clave = self._tabla(ambito), clave.upper()
+        if tabla.pop(clave, None) is None:
+            return False
+        self._limites = [l for l in self._limites
+                         if (l.ambito.upper(), l.clave.upper()) != (ambito.upper(), clave)]
+        return True
+
+    def _tabla(self, ambito: str) -> dict[str, int]:
+        tablas = {"TIPO": self._por_tipo, "PRODUCTO": self._por_producto,
+                  "CLIENTE": self._por_cliente}
+        try:
+            return tablas[ambito.upper()]
+        except KeyError:
+            raise ValueError(f"Ámbito '{ambito}' no válido. Opciones: {', '.join(AMBITOS)}") from None
+
+    def listar(self) -> list[LimiteCompra]:
+        return list(self._limites)
+
+    # ── Verificación ──────────────────────────────────────
+
+    def verificar(self, producto: Producto, cantidad: int, sesion: Sesion) -> tuple[bool, str]:
+        """¿Se pueden agregar 'cantidad' unidades de producto al carrito de la sesión?"""
+        en_carrito = sesion.unidades.get(producto.id, 0)
+        total = en_carrito + cantidad
+        nota = f" (ya tienes {en_carrito} en el carrito)" if en_carrito else ""
+
+        maximo = self._por_tipo.get(producto.tipo)
+        if maximo is not None and total > maximo:
+            return False, (f"Máximo {maximo} unidad(es) por producto {producto.tipo} "
+                           f"en un pedido{nota}.")
+        maximo = self._por_producto.get(producto.id)
+        if maximo is not None and total > maximo:
+            return False, f"Máximo {maximo} unidad(es) de '{producto.nombre}' por pedido{nota}."
+        maximo = self._por_cliente.get(producto.id)
+        if maximo is not None:
+            compradas = self._compradas.get((sesion.cliente, producto.id), 0)
+            if compradas + total > maximo:
+                return False, (f"Límite por cliente: {maximo} unidad(es) de '{producto.nombre}'. "
+                               f"Ya compraste {compradas}{nota}.")
+        return self.verificar_pedido(cantidad, sesion)
+
+    def verificar_pedido(self, cantidad: int, sesion: Sesion) -> tuple[bool, str]:
+        """Máximo de unidades por pedido (max_items_pedido)."""
+        if self._max_pedido is not None and sesion.total_unidades + cantidad > self._max_pedido:
+            return False, (f"Máximo {self._max_pedido} unidades por pedido. "
+                           f"El carrito ya tiene {sesion.total_unidades}.")
+        return True, ""
+
+    # ── Contadores por cliente ────────────────────────────
+
+    def registrar_compra(self, cliente: str, items: list[ItemPedido]):
+        """Suma las unidades de un pedido pagado (de todo producto, tenga límite o no)."""
+        for item in items:
+            clave = (cliente, item.producto.id)
+            self._compradas[clave] = self._compradas.get(clave, 0) + item.cantidad
+
+    def anular_compra(self, cliente: str, items: list[ItemPedido]):
+        """Descuenta las unidades de un pedido cancelado (nunca por debajo de 0)."""
+        for item in items:
+            clave = (cliente, item.producto.id)
+            if clave in self._compradas:
+                self._compradas[clave] = max(0, self._compradas[clave] - item.cantidad)
@@ -0,0 +1,186 @@
+"""
+CAPA: Application / Services
+==============================
+Motor de promociones.
+
+Las reglas (Promocion) se indexan al registrarse por el criterio más
+selectivo que tengan: id de producto (o cada id del pack), plataforma,
+tipo, o globales.
+
+- Las reglas sin id ni pack dependen solo de (tipo, plataformas): la
+  mejor de ellas se calcula una vez por "clase" de producto.
+- Para cada producto se compila un "plan": la mejor regla fija que le
+  aplica y las reglas de pack en las que participa, ordenadas por
+  descuento. Compilarlo solo mira las reglas de ese id y su clase.
+
+Planes y clases se cachean y se descartan cuando cambian las reglas.
+
+Precio de un producto = lookup del plan + revisar sus packs contra los
+ids del carrito. Nunca se recorren todas las reglas.
+"""
+from dataclasses import dataclass
+
+from domain.model.modelos import Producto, ItemPedido, Promocion
+
+
+def _plataformas(producto: Producto) -> tuple[str, ...]:
+    """'Xbox/PC' → ('XBOX', 'PC')."""
+    return tuple(p.strip().upper() for p in producto.plataforma.split("/"))
+
+
+def _tipo(regla: Promocion) -> str:
+    """Tipo de la regla en la forma de Producto.tipo ('digital' → 'DIGITAL')."""
+    return regla.tipo.strip().upper()
+
+
+def _plataforma(regla: Promocion) -> str:
+    """Plataforma de la regla en la forma de _plataformas() (' ps5 ' → 'PS5')."""
+    return regla.plataforma.strip().upper()
+
+
+def _coincide(regla: Promocion, producto: Producto) -> bool:
+    return ((not regla.id_producto or regla.id_producto == producto.id)
+            and (not regla.tipo or _tipo(regla) == producto.tipo)
+            and (not regla.plataforma or _plataforma(regla) in _plataformas(producto))
+            and (not regla.pack or producto.id in regla.pack))
+
+
+@dataclass
+class _Plan:
+    """Reglas que pueden aplicar a un producto, precalculadas."""
+    clave: tuple                    # (tipo, plataforma) con que se compiló
+    fija: Promocion | None          # mejor regla sin pack
+    packs: list[Promocion]          # reglas de pack, de mayor a menor descuento
+
+
+class MotorPromociones:
+    """Registro de promociones y cálculo de precios del carrito."""
+
+    def __init__(self):
+        self._reglas: dict[str, Promocion] = {}
+        self._por_producto:   dict[str, list[Promocion]] = {}
+        self._por_plataforma: dict[str, list[Promocion]] = {}
+        self._por_tipo:       dict[str, list[Promocion]] = {}
+        self._globales: list[Promocion] = []
+        self._planes: dict[str, _Plan] = {}
+        self._por_clase: dict[tuple, Promocion | None] = {}
+
+    # ── Registro de reglas ────────────────────────────────
+
+    def agregar(self, *promociones: Promocion):
+        for promo in promociones:
+            if not 0 < promo.descuento < 1:
+                raise ValueError(f"Descuento inválido en '{promo.id}': {promo.descuento}")
+            if promo.id in self._reglas:
+                self.quitar(promo.id)
+            self._reglas[promo.id] = promo
+            self._indexar(promo)
+        self._planes.clear()
+        self._por_clase.clear()
+
+    def quitar(self, id_promocion: str):
+        if self._reglas.pop(id_promocion, None) is None:
+            return
+        self._por_producto.clear()
+        self._por_plataforma.clear()
+        self._por_tipo.clear()
+        self._globales.clear()
+        for promo in self._reglas.values():
+            self._indexar(promo)
+        self._planes.clear()
+        self._por_clase.clear()
+
+    def listar(self) -> list[Promocion]:
+        return list(self._reglas.values())
+
+    def _indexar(self, promo: Promocion):
+        if promo.pack:
+            for id_producto in promo.pack:
+                self._por_producto.setdefault(id_producto, []).append(promo)
+        elif promo.id_producto:
+            self._por_producto.setdefault(promo.id_producto, []).append(promo)
+        elif promo.plataforma:
+            self._por_plataforma.setdefault(_plataforma(promo), []).append(promo)
+        elif promo.tipo:
+            self._por_tipo.setdefault(_tipo(promo), []).append(promo)
+        else:
+            self._globales.append(promo)
+
+    # ── Planes ────────────────────────────────────────────
+
+    def _plan(self, producto: Producto) -> _Plan:
+        clave = (producto.tipo, producto.plataforma)
+        plan = self._planes.get(producto.id)
+        if plan is not None and plan.clave == clave:
+            return plan
+
+        fija, packs = self._mejor_de_clase(producto), []
+        for regla in self._por_producto.get(producto.id, ()):
+            if not _coincide(regla, producto):
+                continue
+            if regla.pack:
+                packs.append(regla)
+            elif fija is None or regla.descuento > fija.descuento:
+                fija = regla
+        packs.sort(key=lambda r: r.descuento, reverse=True)
+
+        plan = self._planes[producto.id] = _Plan(clave, fija, packs)
+        return plan
+
+    def _mejor_de_clase(self, producto: Producto) -> Promocion | None:
+        """Mejor regla por tipo/plataforma/global para productos como este."""
+        clase = (producto.tipo, _plataformas(producto))
+        if clase in self._por_clase:
+            return self._por_clase[clase]
+        candidatas = list(self._por_tipo.get(producto.tipo, ()))
+        for plataforma in clase[1]:
+            candidatas += self._por_plataforma.get(plataforma, ())
+        candidatas += self._globales
+        mejor = None
+        for regla in candidatas:
+            if _coincide(regla, producto) and (mejor is None or regla.descuento > mejor.descuento):
+                mejor = regla
+        self._por_clase[clase] = mejor
+        return mejor
+
+    # ── Precios ───────────────────────────────────────────
+
+    def precio(self, producto: Producto, ids_carrito) -> tuple[float, str]:
+        """
+        (precio_unitario, nombre_promocion) del producto dado el contenido
+        del carrito. Gana el mayor descuento; las promociones no se acumulan.
+        """
+        plan = self._plan(producto)
+        mejor = plan.fija
+        for regla in plan.packs:
+            if mejor is not None and regla.descuento <= mejor.descuento:
+                break
+            if all(i in ids_carrito for i in regla.pack):
+                mejor = regla
+                break
+        if mejor is None:
+            return producto.precio, ""
+        return round(producto.precio * (1 - mejor.descuento), 2), mejor.nombre
+
+    def repreciar(self, carrito: list[ItemPedido], id_producto: str):
+        """
+        Repreciado incremental tras agregar id_producto: solo se recalcula
+        ese ítem y los que comparten un pack con él.
+        """
+        indice = {item.producto.id: item for item in carrito}
+        item = indice.get(id_producto)
+        if item is None:
+            return
+        afectados = {id_producto}
+        for regla in self._plan(item.producto).packs:
+            afectados.update(regla.pack)
+        for id_afectado in afectados:
+            afectado = indice.get(id_afectado)
+            if afectado is not None:
+                afectado.precio_unitario, afectado.promocion = self.precio(afectado.producto, indice)
+
+    def repreciar_todo(self, carrito: list[ItemPedido]):
+        """Recalcula todo el carrito en una pasada (p. ej. si cambian las reglas)."""
+        indice = {item.producto.id: item for item in carrito}
+        for item in carrito:
+            item.precio_unitario, item.promocion = self.precio(item.producto, indice)
@@ -0,0 +1,141 @@
+"""
+CAPA: Application / Services
+==============================
+Recomendaciones "quienes compraron esto también compraron".
+
+  - Matriz de co-ocurrencia dispersa: para cada producto, un dict con las
+    veces que apareció en el mismo pedido pagado que cada otro producto.
+  - Vecinos precalculados: los N productos que más co-ocurren con cada
+    uno, ya ordenados. Una consulta solo mezcla esas listas cortas.
+  - Actualización diferida: registrar() encola los ids del pedido y
+    vuelve; un hilo de fondo aplica los pedidos por lotes, recalcula los
+    vecinos de los productos afectados y publica las listas nuevas. El
+    cobro nunca espera a la matriz.
+  - Cancelaciones: anular() encola el mismo pedido con signo negativo y
+    sus co-ocurrencias se descuentan (en orden, después de las suyas).
+
+Las listas publicadas no se modifican después (se reemplazan), así que
+las consultas las leen sin lock.
+"""
+import heapq
+import queue
+import threading
+from operator import itemgetter
+from typing import Callable, Iterable
+
+from domain.model.modelos import Pedido
+
+
+class MotorRecomendaciones:
+    """Co-ocurrencias de productos en pedidos pagados y vecinos más frecuentes."""
+
+    def __init__(self, vecinos: int = 20):
+        self._n_vecinos = vecinos
+        self._co:      dict[str, dict[str, int]] = {}
+        self._vecinos: dict[str, list[tuple[str, int]]] = {}
+        self._cola: queue.Queue = queue.Queue()
+        self._hilo: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    # ── Actualización ─────────────────────────────────────
+
+    def registrar(self, pedido: Pedido):
+        """Encola un pedido pagado. O(items), no toca la matriz."""
+        self._encolar(pedido, 1)
+
+    def anular(self, pedido: Pedido):
+        """Encola la resta de un pedido registrado antes (cancelado y reembolsado)."""
+        self._encolar(pedido, -1)
+
+    def _encolar(self, pedido: Pedido, signo: int):
+        ids = tuple({item.producto.id for item in pedido.items})
+        if len(ids) < 2:
+            return
+        if self._hilo is None:
+            self._arrancar()
+        self._cola.put((ids, signo))
+
+    def cargar(self, pedidos: Iterable[Pedido]):
+        """Construye la matriz con un historial existente (en el hilo actual)."""
+        lote = [tuple({item.producto.id for item in p.items}) for p in pedidos]
+        with self._lock:
+            self._recalcular(self._aplicar([(ids, 1) for ids in lote if len(ids) > 1]))
+
+    def esperar(self):
+        """Bloquea hasta que los pedidos encolados estén aplicados."""
+        self._cola.join()
+
+    def _arrancar(self):
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._procesar, daemon=True,
+                                              name="recomendaciones")
+                self._hilo.start()
+
+    def _procesar(self):
+        while True:
+            lote = [self._cola.get()]
+            while True:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            with self._lock:
+                self._recalcular(self._aplicar(lote))
+            for _ in lote:
+                self._cola.task_done()
+
+    def _aplicar(self, lote: list[tuple[tuple[str, ...], int]]) -> set[str]:
+        afectados = set()
+        for ids, signo in lote:
+            for a in ids:
+                fila = self._co.get(a)
+                if fila is None:
+                    fila = self._co[a] = {}
+                for b in ids:
+                    if b != a:
+                        n = fila.get(b, 0) + signo
+                        if n > 0:
+                            fila[b] = n
+                        else:
+                            fila.pop(b, None)
+            afectados.update(ids)
+        return afectados
+
+    def _recalcular(self, afectados: set[str]):
+        for a in afectados:
+            if self._co[a]:
+                self._vecinos[a] = heapq.nlargest(self._n_vecinos, self._co[a].items(),
+                                                  key=itemgetter(1))
+            else:
+                del self._co[a]
+                self._vecinos.pop(a, None)
+
+    # ── Consultas ─────────────────────────────────────────
+
+    def vecinos(self, id_producto: str) -> list[tuple[str, int]]:
+        return self._vecinos.get(id_producto, [])
+
+    def recomendar(self, ids: Iterable[str], k: int,
+                   admitir: Callable[[str], bool] = lambda _: True) -> list[str]:
+        """
+        Hasta k productos que más co-ocurren con los de 'ids' (sumando las
+        co-ocurrencias con cada uno), sin los que ya están en 'ids' y solo
+        los que admitir() acepta (tipo activo, con stock...).
+        """
+        ids = set(ids)
+        if len(ids) == 1:
+            candidatos = self._vecinos.get(next(iter(ids)), ())
+        else:
+            puntos: dict[str, int] = {}
+            for i in ids:
+                for vecino, n in self._vecinos.get(i, ()):
+                    puntos[vecino] = puntos.get(vecino, 0) + n
+            candidatos = sorted(puntos.items(), key=itemgetter(1), reverse=True)
+        elegidos = []
+        for vecino, _ in candidatos:
+            if vecino not in ids and admitir(vecino):
+                elegidos.append(vecino)
+                if len(elegidos) == k:
+                    break
+        return elegidos
@@ -0,0 +1,99 @@
+"""
+CAPA: Application / Services
+==============================
+Reembolsos por lotes (p. ej. un evento cancelado con miles de pedidos).
+
+  - Los pedidos se reparten en una cola por pasarela.
+  - Cada pasarela tiene su propio grupo de hilos, tantos como su máximo
+    de reembolsos simultáneos: una pasarela lenta no frena a las demás ni
+    recibe más llamadas a la vez de las que se le permiten.
+  - Los pedidos sin cobro se cancelan en el hilo que llama, sin pasarela.
+  - El progreso se publica cada ~1 % de los pedidos y al terminar.
+
+Cada pedido se cancela con la misma operación idempotente que el
+checkout (TiendaService.cancelar_pedido), así que relanzar un lote
+interrumpido no reembolsa dos veces.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from domain.model.modelos import Pedido
+
+
+class LoteReembolsos:
+    """Cancela pedidos en paralelo con concurrencia acotada por pasarela."""
+
+    def __init__(self, cancelar: Callable[[Pedido], tuple[bool, str]],
+                 simultaneos: dict[str, int], por_defecto: int = 2):
+        self._cancelar = cancelar
+        self._simultaneos = {k.upper(): max(1, n) for k, n in simultaneos.items()}
+        self._por_defecto = por_defecto
+        self._lock = threading.Lock()
+
+    def ejecutar(self, pedidos: list[Pedido],
+                 progreso: Callable[[int, int, int, int], None] | None = None) -> dict:
+        """
+        Retorna un resumen: total, reembolsados, fallidos [(id, mensaje)],
+        segundos y, por pasarela, {"ok", "fallidos", "hilos"}.
+        """
+        inicio = time.perf_counter()
+        self._total = len(pedidos)
+        self._hechos = self._ok = 0
+        self._fallidos: list[tuple[str, str]] = []
+        self._progreso = progreso
+        self._cada = max(1, self._total // 100)
+        self._por_pasarela: dict[str, dict] = {}
+
+        colas: dict[str, deque] = {}
+        for pedido in pedidos:
+            if pedido.estado == "PAGADO":
+                colas.setdefault(pedido.metodo_pago.upper(), deque()).append(pedido)
+            else:
+                self._procesar("", pedido)
+
+        hilos = []
+        for nombre, cola in colas.items():
+            n = min(len(cola), self._simultaneos.get(nombre, self._por_defecto))
+            self._por_pasarela[nombre] = {"ok": 0, "fallidos": 0, "hilos": n}
+            for i in range(n):
+                hilo = threading.Thread(target=self._trabajar, args=(nombre, cola),
+                                        daemon=True, name=f"reembolso-{nombre}-{i}")
+                hilo.start()
+                hilos.append(hilo)
+        for hilo in hilos:
+            hilo.join()
+
+        return {
+            "total":        self._total,
+            "reembolsados": self._ok,
+            "fallidos":     self._fallidos,
+            "segundos":     time.perf_counter() - inicio,
+            "por_pasarela": self._por_pasarela,
+        }
+
+    def _trabajar(self, nombre: str, cola: deque):
+        while True:
+            try:
+                pedido = cola.popleft()
+            except IndexError:
+                return
+            self._procesar(nombre, pedido)
+
+    def _procesar(self, nombre: str, pedido: Pedido):
+        try:
+            ok, mensaje = self._cancelar(pedido)
+        except Exception as e:
+            ok, mensaje = False, str(e)
+        with self._lock:
+            self._hechos += 1
+            if ok:
+                self._ok += 1
+            else:
+                self._fallidos.append((pedido.id, mensaje))
+            contador = self._por_pasarela.get(nombre)
+            if contador is not None:
+                contador["ok" if ok else "fallidos"] += 1
+            if self._progreso and (self._hechos % self._cada == 0 or self._hechos == self._total):
+                self._progreso(self._hechos, self._total, self._ok, len(self._fallidos))
@@ -7,12 +7,20 @@ Orquesta los 3 patrones para ejecutar la lógica de negocio.
   → SINGLETON  : ConfiguracionTienda  (validar, generar IDs)
   → FACTORY    : ProductoFactory      (crear manejador de producto)
   → ADAPTER    : obtener_pasarela()   (procesar pago con cualquier pasarela)
+
+La Factory, los Adapters y la maquinaria de pagos (idempotencia, salud)
+se importan en su primer uso, y el catálogo se carga en el primer
+acceso: un proceso que solo consulta el catálogo nunca carga el código
+de pagos.
 """
+import os
+import threading
+from typing import Callable
 
-from domain.model.modelos import Producto, Pedido, ItemPedido
+from domain.model.modelos import (Producto, Pedido, ItemPedido, Sesion, Promocion,
+                                  LimiteCompra, Suscripcion, Cliente)
+from domain.interfaces.interfaces import IPasarelaPago
 from infrastructure.config.configuracion import ConfiguracionTienda
-from infrastructure.factory.producto_factory import ProductoFactory
-from infrastructure.adapters.adapters_pago import obtener_pasarela
 
 
 class TiendaService:
@@ -21,16 +29,172 @@ class TiendaService:
     def __init__(self):
         # SINGLETON: única instancia de configuración
         self._config = ConfiguracionTienda()
-        self._catalogo: list[Producto]  = []
+        self._productos: list[Producto] | None = None   # carga diferida
+        self._indice_catalogo: dict[str, Producto] = {}
         self._pedidos:  list[Pedido]    = []
-        self._carrito:  list[ItemPedido] = []
-        self._cliente_actual: str = ""
-        self._cargar_catalogo_demo()
+        self._indice_pedidos: dict[str, Pedido] = {}
+        self._sesion:   Sesion          = Sesion()
+        self._motor_promociones = None                  # carga diferida
+        self._tabla_limites = None                      # carga diferida
+        self._registro_suscripciones = None             # carga diferida
+        self._directorio_clientes = None                # carga diferida
+        self._motor_recomendaciones = None              # carga diferida
+        self._libro_stock = None                        # carga diferida
+        # Adapters reutilizables (uno por pasarela), resultados de cobro
+        # recientes y salud de cada pasarela; se crean con el primer pago.
+        self._pasarelas: dict[str, IPasarelaPago] = {}
+        self._tabla_idempotencia = None
+        self._monitor_pasarelas  = None
+        self._lock_pagos = threading.Lock()
+        self._lock_perezosos = threading.Lock()
+        self._lock_entregas = threading.Lock()
+
+    # ── Carga diferida ────────────────────────────────────
+
+    @staticmethod
+    def _fabrica():
+        from infrastructure.factory.producto_factory import ProductoFactory
+        return ProductoFactory
+
+    @property
+    def _promociones(self):
+        if self._motor_promociones is None:
+            self._iniciar_perezosos("promociones")
+        return self._motor_promociones
+
+    @property
+    def _limites(self):
+        if self._tabla_limites is None:
+            self._iniciar_perezosos("limites")
+        return self._tabla_limites
+
+    @property
+    def _clientes(self):
+        if self._directorio_clientes is None:
+            self._iniciar_perezosos("clientes")
+        return self._directorio_clientes
+
+    @property
+    def _recomendaciones(self):
+        if self._motor_recomendaciones is None:
+            self._iniciar_perezosos("recomendaciones")
+        return self._motor_recomendaciones
+
+    @property
+    def _libro(self):
+        if self._libro_stock is None:
+            self._iniciar_perezosos("libro")
+        return self._libro_stock
+
+    @property
+    def _suscripciones(self):
+        if self._registro_suscripciones is None:
+            self._iniciar_perezosos("suscripciones")
+        return self._registro_suscripciones
+
+    def _iniciar_perezosos(self, *piezas: str):
+        """
+        Crea las piezas diferidas indicadas que aún no existan. Con lock:
+        la API cobra y reembolsa en hilos, y dos primeros usos a la vez
+        crearían dos instancias (dos diarios abiertos sobre el mismo archivo).
+        Cada pieza se publica ya completa.
+        """
+        with self._lock_perezosos:
+            if "promociones" in piezas and self._motor_promociones is None:
+                from application.services.promociones import MotorPromociones
+                motor = MotorPromociones()
+                self._cargar_promociones_demo(motor)
+                self._motor_promociones = motor
+            if "limites" in piezas and self._tabla_limites is None:
+                from application.services.limites import TablaLimites
+                self._tabla_limites = TablaLimites.desde_config(self._config)
+            if "clientes" in piezas and self._directorio_clientes is None:
+                from application.services.clientes import DirectorioClientes
+                self._directorio_clientes = DirectorioClientes()
+            if "recomendaciones" in piezas and self._motor_recomendaciones is None:
+                from application.services.recomendaciones import MotorRecomendaciones
+                motor = MotorRecomendaciones()
+                motor.cargar(p for p in self._pedidos if p.estado == "PAGADO")
+                self._motor_recomendaciones = motor
+            if "libro" in piezas and self._libro_stock is None:
+                from infrastructure.inventario.libro_stock import LibroStock
+                self._libro_stock = LibroStock(
+                    self._config.obtener("stock_archivo"),
+                    snapshot_cada=self._config.obtener("stock_snapshot_cada"),
+                )
+            if "suscripciones" in piezas and self._registro_suscripciones is None:
+                from infrastructure.suscripciones.registro import RegistroSuscripciones
+                self._registro_suscripciones = RegistroSuscripciones(
+                    archivo    = self._config.obtener("suscripciones_archivo"),
+                    aviso_dias = self._config.obtener("suscripcion_aviso_dias"),
+                )
+
+    @property
+    def _idempotencia(self):
+        if self._tabla_idempotencia is None:
+            self._iniciar_pagos()
+        return self._tabla_idempotencia
+
+    @property
+    def _monitor(self):
+        if self._monitor_pasarelas is None:
+            self._iniciar_pagos()
+        return self._monitor_pasarelas
+
+    def _iniciar_pagos(self):
+        from infrastructure.pagos.idempotencia import TablaIdempotencia
+        from infrastructure.pagos.salud import MonitorPasarelas
+        with self._lock_pagos:
+            if self._tabla_idempotencia is None:
+                self._tabla_idempotencia = TablaIdempotencia(
+                    capacidad    = self._config.obtener("idempotencia_max"),
+                    ttl_segundos = self._config.obtener("idempotencia_ttl_s"),
+                )
+            if self._monitor_pasarelas is None:
+                # Salud por pasarela: circuit breaker, latencias y ruteo
+                self._monitor_pasarelas = MonitorPasarelas(
+                    umbral_error   = self._config.obtener("circuito_umbral"),
+                    enfriamiento_s = self._config.obtener("circuito_enfriar_s"),
+                    lento_s        = self._config.obtener("pago_lento_s"),
+                )
+
+    # ── Sesión ────────────────────────────────────────────
+    # El cliente y el carrito viven en una Sesion. El menú de consola usa
+    # siempre la misma; la API HTTP activa la sesión de cada petición.
+
+    def usar_sesion(self, sesion: Sesion):
+        self._sesion = sesion
+
+    def sesion_actual(self) -> Sesion:
+        return self._sesion
+
+    @property
+    def _cliente_actual(self) -> str:
+        return self._sesion.cliente
+
+    @_cliente_actual.setter
+    def _cliente_actual(self, nombre: str):
+        self._sesion.cliente = nombre
+
+    @property
+    def _carrito(self) -> list[ItemPedido]:
+        return self._sesion.carrito
+
+    @_carrito.setter
+    def _carrito(self, items: list[ItemPedido]):
+        self._sesion.carrito = items
+        self._sesion.recontar()
 
     # ── Catálogo ──────────────────────────────────────────
 
+    @property
+    def _catalogo(self) -> list[Producto]:
+        if self._productos is None:
+            self._cargar_catalogo_demo()
+        return self._productos
+
     def _cargar_catalogo_demo(self):
-        """Carga productos de ejemplo al iniciar."""
+        """Carga productos de ejemplo en el primer acceso al catálogo."""
         productos = [
             Producto("G001", "Elden Ring",            "RPG",      "PC",              199.90, "DIGITAL",     999),
             Producto("G002", "FIFA 25",                "Deportes", "PS5",             249.90, "FISICO",       15),
@@ -43,7 +207,40 @@ class TiendaService:
             Producto("G009", "PS Plus Extra 12m",     "—",        "PS5/PS4",         269.90, "SUSCRIPCION", 999),
             Producto("G010", "Spider-Man 2",          "Acción",   "PS5",             299.90, "FISICO",        5),
         ]
-        self._catalogo = productos
+        self._productos = productos
+        self._indice_catalogo = {p.id: p for p in productos}
+        self._restaurar_stock()
+
+    def _restaurar_stock(self):
+        """Si hay libro de stock en disco, el stock sale de él (última instantánea + diario)."""
+        if not os.path.exists(self._config.obtener("stock_archivo")):
+            return
+        for id_producto, saldo in self._libro.saldos().items():
+            producto = self._indice_catalogo.get(id_producto)
+            if producto is not None:
+                producto.stock = saldo
+
+    def agregar_producto(self, producto: Producto):
+        """Agrega (o reemplaza) un producto del catálogo."""
+        catalogo = self._catalogo
+        anterior = self._indice_catalogo.get(producto.id)
+        if anterior is not None:
+            catalogo[catalogo.index(anterior)] = producto
+        else:
+            catalogo.append(producto)
+        self._indice_catalogo[producto.id] = producto
+
+    @staticmethod
+    def _cargar_promociones_demo(motor):
+        motor.agregar(
+            Promocion("P001", "Pack Cyberpunk + Phantom Liberty", 0.20, pack=("G005", "G006")),
+        )
+
+    def tipos_producto(self) -> list[tuple[str, str]]:
+        """(tipo, nombre) de cada tipo registrado y activo, plugins incluidos."""
+        fabrica = self._fabrica()
+        return [(tipo, fabrica.etiqueta(tipo)) for tipo in fabrica.tipos_disponibles()
+                if self._config.tipo_activo(tipo)]
 
     def listar_catalogo(self, filtro_tipo: str = "") -> list[Producto]:
         if filtro_tipo:
@@ -51,36 +248,166 @@ class TiendaService:
         return self._catalogo
 
     def buscar_producto(self, id_producto: str) -> Producto | None:
-        return next((p for p in self._catalogo if p.id == id_producto.upper()), None)
+        if self._productos is None:
+            self._cargar_catalogo_demo()
+        return self._indice_catalogo.get(id_producto.upper())
 
     # ── Carrito ───────────────────────────────────────────
 
     def set_cliente(self, nombre: str):
-        self._cliente_actual = nombre
+        self._cliente_actual = self._clientes.registrar(nombre).nombre
         self._carrito = []
 
+    def registrar_cliente(self, nombre: str, email: str = "", telefono: str = "") -> Cliente:
+        return self._clientes.registrar(nombre, email, telefono)
+
+    def buscar_cliente(self, id_cliente: str = "", email: str = "",
+                       telefono: str = "") -> Cliente | None:
+        """Busca por id, email o teléfono (el primero que se indique)."""
+        if id_cliente:
+            return self._clientes.por_id(id_cliente)
+        if email:
+            return self._clientes.por_email(email)
+        if telefono:
+            return self._clientes.por_telefono(telefono)
+        return None
+
     def agregar_al_carrito(self, id_producto: str, cantidad: int) -> tuple[bool, str]:
         producto = self.buscar_producto(id_producto)
         if not producto:
             return False, f"Producto '{id_producto}' no encontrado."
+        if cantidad <= 0:
+            return False, f"Cantidad inválida: {cantidad}."
+
+        # Límites declarativos: contra lo que ya hay en el carrito + lo nuevo
+        valido, mensaje = self._limites.verificar(producto, cantidad, self._sesion)
+        if not valido:
+            return False, mensaje
 
         # FACTORY: crea el manejador correcto para este tipo de producto
-        manejador = ProductoFactory.crear(producto)
+        manejador = self._fabrica().crear(producto)
 
-        # Validar compra con las reglas del tipo
-        valido, mensaje = manejador.validar_compra(cantidad)
+        # Validar compra con las reglas del tipo (stock, etc.)
+        en_carrito = self._sesion.unidades.get(producto.id, 0)
+        valido, mensaje = manejador.validar_compra(en_carrito + cantidad)
         if not valido:
             return False, mensaje
 
+        self._sesion.sumar(producto.id, cantidad)
         # Verificar si ya está en el carrito
-        for item in self._carrito:
-            if item.producto.id == id_producto:
-                item.cantidad += cantidad
-                return True, f"Cantidad actualizada: {item.cantidad}x {producto.nombre}"
+        if en_carrito:
+            for item in self._carrito:
+                if item.producto.id == producto.id:
+                    item.cantidad += cantidad
+                    return True, f"Cantidad actualizada: {item.cantidad}x {producto.nombre}"
 
         self._carrito.append(ItemPedido(producto, cantidad, producto.precio))
+        # Solo cambia el precio del nuevo ítem y de los que comparten pack con él
+        self._promociones.repreciar(self._carrito, producto.id)
         return True, f"✅ Agregado: {cantidad}x {producto.nombre}"
 
+    def agregar_lote(self, lineas: list[tuple[str, int]]) -> tuple[bool, list[tuple[str, bool, str]]]:
+        """
+        Agrega varias líneas (id, cantidad) al carrito: todo o nada.
+
+        Los productos se resuelven con el índice del catálogo, las líneas
+        repetidas se suman y la validación se agrupa por tipo (la Factory
+        resuelve la clase manejadora una vez por tipo). Los límites se
+        comprueban sobre lo que ya hay en el carrito más el lote. Si alguna
+        línea falla el carrito no cambia.
+
+        Retorna (ok, [(id, ok, mensaje) por línea, en el orden recibido]).
+        """
+        fabrica = self._fabrica()
+        limites = self._limites
+        sesion = self._sesion
+        resultados: list[list] = []
+        por_producto: dict[str, list] = {}      # id → [producto, cantidad, índices de línea]
+        for i, (id_producto, cantidad) in enumerate(lineas):
+            producto = self.buscar_producto(str(id_producto))
+            if producto is None:
+                resultados.append([id_producto, False, f"Producto '{id_producto}' no encontrado."])
+                continue
+            if cantidad <= 0:
+                resultados.append([producto.id, False, f"Cantidad inválida: {cantidad}."])
+                continue
+            resultados.append([producto.id, True, ""])
+            acumulado = por_producto.setdefault(producto.id, [producto, 0, []])
+            acumulado[1] += cantidad
+            acumulado[2].append(i)
+
+        por_tipo: dict[str, list] = {}
+        for acumulado in por_producto.values():
+            por_tipo.setdefault(acumulado[0].tipo, []).append(acumulado)
+        for tipo, grupo in por_tipo.items():
+            try:
+                clase = fabrica.clase_para(tipo)
+            except ValueError as e:
+                for _, _, indices in grupo:
+                    for i in indices:
+                        resultados[i][1:] = [False, str(e)]
+                continue
+            for producto, cantidad, indices in grupo:
+                valido, mensaje = limites.verificar(producto, cantidad, sesion)
+                if valido:
+                    en_carrito = sesion.unidades.get(producto.id, 0)
+                    valido, mensaje = clase(producto).validar_compra(en_carrito + cantidad)
+                if not valido:
+                    for i in indices:
+                        resultados[i][1:] = [False, mensaje]
+
+        if all(ok for _, ok, _ in resultados):
+            unidades_lote = sum(c for _, c, _ in por_producto.values())
+            valido, mensaje = limites.verificar_pedido(unidades_lote, sesion)
+            if not valido:
+                for r in resultados:
+                    r[1:] = [False, mensaje]
+                return False, [tuple(r) for r in resultados]
+        else:
+            for r in resultados:
+                if r[1]:
+                    r[2] = "Válida (lote no aplicado)."
+            return False, [tuple(r) for r in resultados]
+
+        en_carrito = {item.producto.id: item for item in self._carrito}
+        for producto, cantidad, _ in por_producto.values():
+            item = en_carrito.get(producto.id)
+            if item is not None:
+                item.cantidad += cantidad
+            else:
+                self._carrito.append(ItemPedido(producto, cantidad, producto.precio))
+            sesion.sumar(producto.id, cantidad)
+        self._promociones.repreciar_todo(self._carrito)
+
+        for r in resultados:
+            producto, cantidad, _ = por_producto[r[0]]
+            r[2] = f"✅ {cantidad}x {producto.nombre}"
+        return True, [tuple(r) for r in resultados]
+
+    # ── Promociones ───────────────────────────────────────
+
+    def agregar_promocion(self, *promociones: Promocion):
+        self._promociones.agregar(*promociones)
+        self._promociones.repreciar_todo(self._carrito)
+
+    def quitar_promocion(self, id_promocion: str):
+        self._promociones.quitar(id_promocion)
+        self._promociones.repreciar_todo(self._carrito)
+
+    def listar_promociones(self) -> list[Promocion]:
+        return self._promociones.listar()
+
+    # ── Límites de compra ─────────────────────────────────
+
+    def agregar_limite(self, *limites: LimiteCompra):
+        self._limites.agregar(*limites)
+
+    def quitar_limite(self, ambito: str, clave: str) -> bool:
+        return self._limites.quitar(ambito, clave)
+
+    def listar_limites(self) -> list[LimiteCompra]:
+        return self._limites.listar()
+
     def ver_carrito(self) -> list[ItemPedido]:
         return self._carrito
 
@@ -90,6 +417,23 @@ class TiendaService:
     def vaciar_carrito(self):
         self._carrito = []
 
+    def sugerencias(self, k: int | None = None) -> list[Producto]:
+        """'También compraron': productos que suelen pedirse con los del carrito."""
+        if not self._carrito:
+            return []
+        ids = self._recomendaciones.recomendar(
+            (item.producto.id for item in self._carrito),
+            k or self._config.obtener("recomendaciones_k"),
+            self._recomendable,
+        )
+        return [self._indice_catalogo[i] for i in ids]
+
+    def _recomendable(self, id_producto: str) -> bool:
+        producto = self._indice_catalogo.get(id_producto)
+        # Solo lo físico se agota: lo digital tiene stock 0 y siempre se puede comprar
+        return (producto is not None and self._config.tipo_activo(producto.tipo)
+                and (producto.tipo != "FISICO" or producto.stock > 0))
+
     # ── Pedido y pago ─────────────────────────────────────
 
     def crear_pedido(self) -> Pedido | None:
@@ -100,45 +444,326 @@ class TiendaService:
 
         # SINGLETON: genera el ID de pedido
         id_pedido = self._config.generar_id_pedido()
+        cliente = self._clientes.registrar(self._cliente_actual)
         pedido = Pedido(
-            id       = id_pedido,
-            cliente  = self._cliente_actual,
-            items    = self._carrito.copy(),
+            id         = id_pedido,
+            cliente    = cliente.nombre,
+            # Copias: el carrito puede seguir cambiando mientras el pedido se cobra
+            items      = [ItemPedido(i.producto, i.cantidad, i.precio_unitario, i.promocion)
+                          for i in self._carrito],
+            id_cliente = cliente.id,
         )
         return pedido
 
-    def procesar_pago(self, pedido: Pedido, metodo: str) -> tuple[bool, str]:
+    def procesar_pago(self, pedido: Pedido, metodo: str,
+                      intento: int = 1, sesion: Sesion | None = None) -> tuple[bool, str]:
         """
         Procesa el pago usando la pasarela seleccionada.
         ADAPTER: obtener_pasarela() devuelve el adaptador correcto.
+
+        Idempotente por (pedido, intento): repetir la llamada devuelve el
+        resultado ya obtenido sin cobrar de nuevo, y llamadas simultáneas
+        con la misma clave comparten un único cobro. Para reintentar tras
+        un rechazo se usa el siguiente número de intento.
+
+        'sesion' es la del carrito que se vacía tras cobrar (por defecto la
+        activa). La API la pasa y cobra en un hilo sin retener la sesión
+        activa, que mientras tanto atiende a otros clientes.
         """
+        sesion = sesion or self._sesion
         if not self._config.pasarela_activa(metodo):
-            return False, f"Pasarela '{metodo}' no disponible en esta tienda."
+            # Puede ser una pasarela de plugin aún sin descubrir
+            self.pasarelas_disponibles()
+            if not self._config.pasarela_activa(metodo):
+                return False, f"Pasarela '{metodo}' no disponible en esta tienda."
+
+        from infrastructure.pagos.idempotencia import clave_pago
+        ok, mensaje, _ = self._idempotencia.ejecutar(
+            clave_pago(pedido.id, intento),
+            lambda: self._cobrar(pedido, metodo.upper(), sesion),
+            guardar=lambda resultado: resultado[2],
+        )
+        return ok, mensaje
+
+    def verificar_pago(self, pedido: Pedido) -> dict:
+        """
+        Consulta la transacción del pedido en su pasarela. Es una lectura
+        idempotente, así que se hace como llamada cubierta (hedged): si la
+        pasarela tarda más que su p90 habitual se lanza una segunda consulta
+        (si su circuito lo admite).
+        """
+        if not pedido.id_transaccion:
+            return {"id_transaccion": "", "estado": "SIN_TRANSACCION", "proveedor": ""}
+        pasarela = self._pasarela(pedido.metodo_pago)
+        return self._monitor.cubierta(
+            f"{pedido.metodo_pago}/verificar",
+            lambda: pasarela.verificar(pedido.id_transaccion),
+        )
+
+    def pasarelas_disponibles(self) -> list[tuple[str, str]]:
+        """(clave, nombre) de cada pasarela registrada y activa, plugins incluidos."""
+        from infrastructure.adapters.adapters_pago import PASARELAS
+        return [(clave, PASARELAS.etiqueta(clave)) for clave in PASARELAS.claves()
+                if self._config.pasarela_activa(clave)]
 
-        # ADAPTER: selecciona y retorna el adaptador correcto
-        pasarela = obtener_pasarela(metodo)
-        moneda   = self._config.obtener("moneda")
+    def usar_pasarela(self, nombre: str, pasarela: IPasarelaPago):
+        """Sustituye el adapter de una pasarela (p. ej. por un doble con fallos)."""
+        self._pasarelas[nombre.upper()] = pasarela
 
-        resultado = pasarela.cobrar(pedido, moneda)
+    def estado_pasarelas(self) -> list[dict]:
+        return self._monitor.resumen()
+
+    def _pasarela(self, metodo: str) -> IPasarelaPago:
+        key = metodo.upper()
+        pasarela = self._pasarelas.get(key)
+        if pasarela is None:
+            from infrastructure.adapters.adapters_pago import obtener_pasarela
+            with self._lock_perezosos:
+                pasarela = self._pasarelas.get(key)
+                if pasarela is None:
+                    # ADAPTER: selecciona y retorna el adaptador correcto
+                    pasarela = self._pasarelas[key] = obtener_pasarela(key)
+        return pasarela
+
+    def _cobrar(self, pedido: Pedido, metodo: str, sesion: Sesion) -> tuple[bool, str, bool]:
+        """
+        Cobra en la pasarela elegida o, con ruteo_fallback, en la siguiente
+        pasarela sana si la elegida falla o tiene el circuito abierto.
 
-        if resultado["exitoso"]:
-            pedido.estado         = "PAGADO"
-            pedido.metodo_pago    = metodo
-            pedido.id_transaccion = resultado["id_transaccion"]
-            self._pedidos.append(pedido)
+        El tercer valor indica si el resultado es definitivo (alguna pasarela
+        respondió). Si ninguna llegó a responder no se cobró nada y el mismo
+        intento puede repetirse.
+
+        Solo se pasa a otra pasarela ante una excepción (caída, timeout,
+        circuito abierto); un rechazo del cobro es una respuesta válida.
+        """
+        if pedido.estado == "PAGADO":
+            return True, (f"El pedido {pedido.id} ya estaba pagado "
+                          f"(transacción {pedido.id_transaccion})."), True
+
+        candidatas = self._monitor.ordenar(
+            metodo,
+            self._config.obtener("pasarelas_activas"),
+            self._config.obtener("ruteo_fallback"),
+        )
+        if not candidatas:
+            return False, (f"Pasarela '{metodo}' temporalmente no disponible. "
+                           f"Intenta con otro método."), False
+
+        moneda = self._config.obtener("moneda")
+        for nombre in candidatas:
+            pasarela = self._pasarela(nombre)
+            if pedido.id_cliente:
+                # Email, teléfono... que pide esta pasarela, calculados una vez por cliente
+                pedido.perfil_pago = self._clientes.perfil_pago(pedido.id_cliente, nombre, pasarela)
+            try:
+                resultado = self._monitor.medir(nombre, lambda: pasarela.cobrar(pedido, moneda))
+            except Exception as e:
+                print(f"  ⚠️  [{nombre}] {e}")
+                continue
+
+            if not resultado["exitoso"]:
+                return False, "El pago no pudo procesarse. Intenta con otro método.", True
+
+            # Cobros de varias sesiones pueden terminar a la vez (API, lotes)
+            with self._lock_entregas:
+                pedido.estado         = "PAGADO"
+                pedido.metodo_pago    = nombre
+                pedido.id_transaccion = resultado["id_transaccion"]
+                # Solo encola: la matriz de co-ocurrencias se actualiza en segundo
+                # plano. Antes del append: si el motor se crea aquí, carga el
+                # historial sin este pedido y no lo cuenta dos veces.
+                self._recomendaciones.registrar(pedido)
+                self._pedidos.append(pedido)
+                self._indice_pedidos[pedido.id] = pedido
+                if pedido.id_cliente:
+                    self._clientes.registrar_pedido(pedido)
+                self._limites.registrar_compra(pedido.cliente, pedido.items)
+
+                # FACTORY: ejecuta post_compra para cada producto
+                print("\n  📬 Procesando entrega:")
+                for item in pedido.items:
+                    manejador = self._fabrica().crear(item.producto)
+                    manejador.post_compra(pedido)
+                    if item.producto.tipo == "FISICO":
+                        # Write-behind: solo se anota en memoria, el disco va aparte
+                        self._libro.registrar(item.producto.id, "VENTA", -item.cantidad,
+                                              item.producto.stock, pedido.id)
+                    elif item.producto.tipo == "SUSCRIPCION":
+                        self._activar_suscripcion(pedido.cliente, item)
+
+                self._descontar_del_carrito(sesion, pedido.items)
+            return True, resultado["mensaje"], True
+
+        return False, "Ninguna pasarela pudo procesar el pago. Intenta más tarde.", False
+
+    def _descontar_del_carrito(self, sesion: Sesion, items: list[ItemPedido]):
+        """
+        Quita del carrito solo lo que se pagó: lo agregado mientras el cobro
+        estaba en curso (la API no retiene la sesión al cobrar) se queda.
+        """
+        pagado: dict[str, int] = {}
+        for item in items:
+            pagado[item.producto.id] = pagado.get(item.producto.id, 0) + item.cantidad
+        restante = []
+        for item in sesion.carrito:
+            item.cantidad -= pagado.pop(item.producto.id, 0)
+            if item.cantidad > 0:
+                restante.append(item)
+        sesion.carrito = restante
+        sesion.recontar()
+        self._promociones.repreciar_todo(restante)
 
-            # FACTORY: ejecuta post_compra para cada producto
-            print("\n  📬 Procesando entrega:")
+    # ── Cancelación y reembolsos ──────────────────────────
+
+    def cancelar_pedido(self, pedido: Pedido, motivo: str = "") -> tuple[bool, str]:
+        """
+        Cancela un pedido. Si estaba pagado lo reembolsa en su pasarela y
+        deshace la entrega: devuelve el stock, revoca las claves digitales,
+        desactiva DLC y resta los días de suscripción.
+
+        Idempotente por pedido: repetir la llamada (o llamadas simultáneas)
+        no reembolsa dos veces. Solo se guarda un reembolso hecho: tras un
+        rechazo de la pasarela, volver a cancelar lo intenta de nuevo.
+        """
+        if pedido.estado == "CANCELADO":
+            detalle = f" (reembolso {pedido.id_reembolso})" if pedido.id_reembolso else ""
+            return True, f"El pedido {pedido.id} ya estaba cancelado{detalle}."
+        if pedido.estado != "PAGADO":
+            pedido.estado = "CANCELADO"
+            return True, f"Pedido {pedido.id} cancelado (no tenía cobro)."
+
+        from infrastructure.pagos.idempotencia import clave_reembolso
+        ok, mensaje, _ = self._idempotencia.ejecutar(
+            clave_reembolso(pedido.id),
+            lambda: self._reembolsar(pedido, motivo),
+            guardar=lambda resultado: resultado[0],
+        )
+        return ok, mensaje
+
+    def _reembolsar(self, pedido: Pedido, motivo: str) -> tuple[bool, str, bool]:
+        """
+        Reembolsa en la pasarela que cobró y deshace la entrega.
+        El tercer valor indica si la pasarela respondió (como en _cobrar).
+        """
+        if pedido.estado == "CANCELADO":
+            return True, f"El pedido {pedido.id} ya estaba cancelado.", True
+        nombre = pedido.metodo_pago
+        pasarela = self._pasarela(nombre)
+        moneda = self._config.obtener("moneda")
+        try:
+            resultado = self._monitor.medir(
+                f"{nombre}/reembolsar",
+                lambda: pasarela.reembolsar(pedido.id_transaccion, pedido.total, moneda),
+            )
+        except Exception as e:
+            print(f"  ⚠️  [{nombre}] {e}")
+            return False, f"{nombre} no respondió al reembolso. Intenta más tarde.", False
+        if not resultado["exitoso"]:
+            return False, f"{nombre} rechazó el reembolso del pedido {pedido.id}.", True
+
+        # El stock y los registros se comparten entre los hilos de un lote
+        with self._lock_entregas:
+            pedido.estado       = "CANCELADO"
+            pedido.id_reembolso = resultado["id_reembolso"]
+            print(f"\n  📭 Deshaciendo entrega de {pedido.id}"
+                  + (f" — {motivo}:" if motivo else ":"))
             for item in pedido.items:
-                manejador = ProductoFactory.crear(item.producto)
-                manejador.post_compra(pedido)
+                manejador = self._fabrica().crear(item.producto)
+                manejador.cancelar(pedido)
+                if item.producto.tipo == "FISICO":
+                    self._libro.registrar(item.producto.id, "CANCELACION", item.cantidad,
+                                          item.producto.stock, pedido.id)
+                elif item.producto.tipo == "SUSCRIPCION":
+                    self._revocar_suscripcion(pedido.cliente, item)
+            self._limites.anular_compra(pedido.cliente, pedido.items)
+            # "También compraron" deja de contar este pedido (también en diferido).
+            # Si el motor aún no existe, al crearse ya no lo cargará.
+            if self._motor_recomendaciones is not None:
+                self._motor_recomendaciones.anular(pedido)
+        return True, resultado["mensaje"], True
+
+    def reembolsar_lote(self, pedidos: list[Pedido],
+                        progreso: Callable[[int, int, int, int], None] | None = None) -> dict:
+        """
+        Cancela y reembolsa muchos pedidos a la vez, con un máximo de
+        reembolsos simultáneos por pasarela (reembolsos_simultaneos).
+        progreso(hechos, total, ok, fallidos) se llama a medida que avanza.
+        """
+        from application.services.reembolsos import LoteReembolsos
+        # Lo diferido se crea aquí, antes de abrir los hilos: así los
+        # primeros reembolsos no esperan el lock de creación
+        piezas = ["limites", "libro"]
+        if any(item.producto.tipo == "SUSCRIPCION" for p in pedidos for item in p.items):
+            piezas.append("suscripciones")
+        self._iniciar_pagos()
+        self._iniciar_perezosos(*piezas)
+        for metodo in {p.metodo_pago for p in pedidos if p.metodo_pago}:
+            self._pasarela(metodo)
+        lote = LoteReembolsos(self.cancelar_pedido,
+                              self._config.obtener("reembolsos_simultaneos"))
+        return lote.ejecutar(pedidos, progreso)
 
-            self._carrito = []
-            return True, resultado["mensaje"]
+    def buscar_pedido(self, id_pedido: str) -> Pedido | None:
+        return self._indice_pedidos.get(id_pedido.upper())
 
-        return False, "El pago no pudo procesarse. Intenta con otro método."
+    # ── Stock ─────────────────────────────────────────────
+
+    def reponer_stock(self, id_producto: str, cantidad: int) -> tuple[bool, str]:
+        producto = self.buscar_producto(id_producto)
+        if producto is None:
+            return False, f"Producto '{id_producto}' no encontrado."
+        if cantidad <= 0:
+            return False, f"Cantidad inválida: {cantidad}."
+        producto.stock += cantidad
+        self._libro.registrar(producto.id, "REPOSICION", cantidad, producto.stock)
+        return True, f"Stock de {producto.nombre}: {producto.stock} unidades."
+
+    def stock_en(self, id_producto: str, instante: float) -> int | None:
+        """Stock que tenía el producto en un instante (time.time()), según el libro."""
+        return self._libro.stock_en(id_producto.upper(), instante)
+
+    def movimientos_stock(self, id_producto: str = "") -> list[tuple]:
+        return self._libro.movimientos(id_producto.upper())
+
+    # ── Suscripciones ─────────────────────────────────────
+
+    def _activar_suscripcion(self, cliente: str, item: ItemPedido):
+        from infrastructure.suscripciones.registro import duracion_plan, fecha
+        dias = duracion_plan(item.producto.nombre) * item.cantidad
+        sub = self._suscripciones.activar(cliente, item.producto.id, dias)
+        print(f"        Vigente hasta: {fecha(sub.fin)}")
+
+    def _revocar_suscripcion(self, cliente: str, item: ItemPedido):
+        from infrastructure.suscripciones.registro import duracion_plan, fecha
+        dias = duracion_plan(item.producto.nombre) * item.cantidad
+        sub = self._suscripciones.revocar(cliente, item.producto.id, dias)
+        print(f"        Vigente hasta: {fecha(sub.fin)}" if sub else "        Sin acceso vigente.")
+
+    def suscripciones_de(self, cliente: str) -> list[Suscripcion]:
+        # Cada consulta avanza el calendario: así también corre en modo API
+        self._suscripciones.revisar()
+        return self._suscripciones.consultar(cliente)
+
+    def avisos_suscripcion(self, cliente: str) -> tuple[list[Suscripcion], list[Suscripcion]]:
+        """(vencidas, por_vencer) del cliente que aún no había recogido."""
+        return self._suscripciones.avisos_de(cliente)
+
+    # ── Cierre ────────────────────────────────────────────
+
+    def cerrar(self):
+        """Vuelca el libro de stock y cierra el diario de suscripciones, si se abrieron."""
+        if self._libro_stock is not None:
+            self._libro_stock.cerrar()
+        if self._registro_suscripciones is not None:
+            self._registro_suscripciones.cerrar()
 
     # ── Historial ─────────────────────────────────────────
 
     def historial_pedidos(self) -> list[Pedido]:
         return self._pedidos
+
+    def pedidos_de(self, cliente: str) -> list[Pedido]:
+        """Pedidos pagados de un cliente (por nombre), vía el índice por cliente."""
+        registrado = self._clientes.por_nombre(cliente)
+        return self._clientes.pedidos_de(registrado.id) if registrado else []
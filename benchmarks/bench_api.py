@@ -0,0 +1,143 @@
+"""
+Benchmark — API HTTP (peticiones por segundo)
+===============================================
+Levanta el servidor de presentation/api_http.py en un hilo local y lo
+carga con N conexiones keep-alive desde asyncio.
+
+Escenarios:
+  catalogo        GET /catalogo (gzip)
+  catalogo-304    GET /catalogo con If-None-Match → 304 sin cuerpo
+  pipelining      igual que 'catalogo' pero con varias peticiones en vuelo
+  carrito         POST /carrito + DELETE /carrito con una sesión por conexión
+
+  python benchmarks/bench_api.py [--conexiones 32] [--peticiones 500]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from application.services.tienda_service import TiendaService
+from domain.model.modelos import Producto
+from presentation.api_http import iniciar_servidor
+
+# El servidor silencia los print() de las capas inferiores redirigiendo
+# sys.stdout (global); los resultados se escriben en la salida original.
+_SALIDA = sys.stdout
+
+
+def _arrancar_servidor(n_productos: int) -> int:
+    """Arranca el servidor en un hilo aparte y retorna el puerto."""
+    listo = threading.Event()
+    puerto = []
+
+    def _hilo():
+        async def _principal():
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                svc = TiendaService()
+                for i in range(n_productos):
+                    svc.agregar_producto(Producto(
+                        f"B{i:05d}", f"Juego {i}", "Acción", "PC", 59.90, "DIGITAL", 999))
+            servidor = await iniciar_servidor(svc, puerto=0)
+            puerto.append(servidor.sockets[0].getsockname()[1])
+            listo.set()
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                await servidor.serve_forever()
+        asyncio.run(_principal())
+
+    threading.Thread(target=_hilo, daemon=True).start()
+    listo.wait()
+    return puerto[0]
+
+
+def _peticion(metodo: str, ruta: str, cuerpo: dict | None = None, **cab) -> bytes:
+    datos = json.dumps(cuerpo).encode() if cuerpo is not None else b""
+    lineas = [f"{metodo} {ruta} HTTP/1.1", "Host: localhost",
+              f"Content-Length: {len(datos)}"]
+    lineas += [f"{k.replace('_', '-')}: {v}" for k, v in cab.items()]
+    return ("\r\n".join(lineas) + "\r\n\r\n").encode() + datos
+
+
+async def _leer_respuesta(reader: asyncio.StreamReader) -> tuple[int, dict, bytes]:
+    crudo = await reader.readuntil(b"\r\n\r\n")
+    linea, *resto = crudo.decode("latin-1").split("\r\n")
+    cab = {}
+    for c in resto:
+        if ":" in c:
+            k, v = c.split(":", 1)
+            cab[k.strip().lower()] = v.strip()
+    largo = int(cab.get("content-length", 0))
+    cuerpo = await reader.readexactly(largo) if largo else b""
+    return int(linea.split(" ")[1]), cab, cuerpo
+
+
+async def _cliente(puerto: int, escenario: str, peticiones: int, profundidad: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+    catalogo = _peticion("GET", "/catalogo?por_pagina=100", Accept_Encoding="gzip")
+
+    if escenario == "catalogo-304":
+        writer.write(catalogo)
+        _, cab, _ = await _leer_respuesta(reader)
+        plantilla = _peticion("GET", "/catalogo?por_pagina=100", If_None_Match=cab["etag"])
+    elif escenario == "carrito":
+        writer.write(_peticion("POST", "/sesiones", {"cliente": "bench"}))
+        _, _, cuerpo = await _leer_respuesta(reader)
+        token = json.loads(cuerpo)["sesion"]
+        # Agregar y vaciar: el carrito no crece ni choca con los límites
+        plantilla = (_peticion("POST", "/carrito", {"id": "G001", "cantidad": 1},
+                               X_Sesion=token)
+                     + _peticion("DELETE", "/carrito", X_Sesion=token))
+        por_plantilla = 2
+    else:
+        plantilla = catalogo
+    if escenario != "carrito":
+        por_plantilla = 1
+
+    enviadas = recibidas = 0
+    while recibidas < peticiones:
+        while enviadas < peticiones and enviadas - recibidas < profundidad:
+            writer.write(plantilla)
+            enviadas += por_plantilla
+        await writer.drain()
+        for _ in range(por_plantilla):
+            estado, _, _ = await _leer_respuesta(reader)
+            assert estado < 400, f"{escenario}: HTTP {estado}"
+        recibidas += por_plantilla
+    writer.close()
+
+
+async def _correr(puerto: int, escenario: str, conexiones: int, peticiones: int,
+                  profundidad: int) -> float:
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(puerto, escenario, peticiones, profundidad)
+                           for _ in range(conexiones)))
+    return conexiones * peticiones / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conexiones", type=int, default=32)
+    parser.add_argument("--peticiones", type=int, default=500,
+                        help="peticiones por conexión")
+    parser.add_argument("--productos", type=int, default=2000,
+                        help="productos extra en el catálogo")
+    args = parser.parse_args()
+
+    puerto = _arrancar_servidor(args.productos)
+    print(f"  Servidor en 127.0.0.1:{puerto} | {args.conexiones} conexiones × "
+          f"{args.peticiones} peticiones", file=_SALIDA)
+    escenarios = [("catalogo", 1), ("catalogo-304", 1), ("pipelining", 8), ("carrito", 1)]
+    for escenario, profundidad in escenarios:
+        rps = asyncio.run(_correr(puerto, escenario, args.conexiones,
+                                  args.peticiones, profundidad))
+        print(f"  {escenario:<14} {rps:>10,.0f} req/s", file=_SALIDA)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark — Carga por lotes del carrito
+=========================================
+Compara 500 llamadas a agregar_al_carrito con una sola llamada a
+agregar_lote para las mismas 500 líneas.
+
+  python benchmarks/bench_lote.py [--lineas 500] [--productos 5000]
+"""
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from application.services.tienda_service import TiendaService
+from domain.model.modelos import Producto
+from infrastructure.config.configuracion import ConfiguracionTienda
+
+
+def _servicio(n_productos: int, n_lineas: int) -> TiendaService:
+    # El carrito del benchmark supera el máximo de unidades por pedido
+    ConfiguracionTienda().establecer("max_items_pedido", n_lineas)
+    svc = TiendaService()
+    azar = random.Random(1)
+    for i in range(n_productos):
+        svc.agregar_producto(Producto(f"L{i:05d}", f"Juego {i}", "Acción", "PC",
+                                      round(azar.uniform(20, 300), 2),
+                                      azar.choice(["FISICO", "DIGITAL", "SUSCRIPCION"]), 10_000))
+    return svc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lineas", type=int, default=500)
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--rondas", type=int, default=20)
+    args = parser.parse_args()
+
+    salida = sys.stdout
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        svc = _servicio(args.productos, args.lineas)
+        azar = random.Random(2)
+        ids = [p.id for p in svc.listar_catalogo() if p.id.startswith("L")]
+        lineas = [(id_p, 1) for id_p in azar.sample(ids, args.lineas)]
+
+        t_uno = t_lote = 0.0
+        for _ in range(args.rondas):
+            svc.set_cliente("bench")
+            inicio = time.perf_counter()
+            for id_p, cantidad in lineas:
+                svc.agregar_al_carrito(id_p, cantidad)
+            t_uno += time.perf_counter() - inicio
+
+            svc.set_cliente("bench")
+            inicio = time.perf_counter()
+            ok, _ = svc.agregar_lote(lineas)
+            t_lote += time.perf_counter() - inicio
+            assert ok
+
+    print(f"  {args.lineas} agregar_al_carrito : {t_uno / args.rondas * 1000:8.2f} ms", file=salida)
+    print(f"  1 agregar_lote({args.lineas})   : {t_lote / args.rondas * 1000:8.2f} ms", file=salida)
+    print(f"  aceleración               : {t_uno / t_lote:8.1f}x", file=salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark — Pasarelas degradadas (circuit breaker, fallback y hedging)
+========================================================================
+Culqi se sustituye por un doble lento y con errores. Se mide la latencia
+del checkout con y sin ruteo de respaldo, y la de verificar() con y sin
+llamadas cubiertas frente a una cola de latencia.
+
+  python benchmarks/bench_pasarelas.py [--pedidos 200]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from application.services.tienda_service import TiendaService
+from infrastructure.adapters.simulados import pasarela_con_fallos
+from infrastructure.config.configuracion import ConfiguracionTienda
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    valores = sorted(valores)
+    return valores[min(int(len(valores) * p), len(valores) - 1)]
+
+
+def _checkout(pedidos: int, fallback: bool) -> tuple[list[float], int]:
+    ConfiguracionTienda().establecer("ruteo_fallback", fallback)
+    svc = TiendaService()
+    svc.usar_pasarela("CULQI", pasarela_con_fallos(
+        "CULQI", latencia_s=0.02, tasa_error=0.6, semilla=1))
+    latencias, exitos = [], 0
+    for i in range(pedidos):
+        svc.set_cliente(f"cliente-{i}")
+        svc.agregar_al_carrito("G001", 1)
+        pedido = svc.crear_pedido()
+        inicio = time.perf_counter()
+        ok, _ = svc.procesar_pago(pedido, "CULQI")
+        latencias.append(time.perf_counter() - inicio)
+        exitos += ok
+    return latencias, exitos
+
+
+def _verificacion(consultas: int, cubierta: bool) -> list[float]:
+    svc = TiendaService()
+    pasarela = pasarela_con_fallos("YAPE", latencia_s=0.002, tasa_lenta=0.05,
+                                   latencia_lenta_s=0.1, semilla=3)
+    svc.usar_pasarela("YAPE", pasarela)
+    svc.set_cliente("verificador")
+    svc.agregar_al_carrito("G001", 1)
+    pedido = svc.crear_pedido()
+    svc.procesar_pago(pedido, "YAPE")
+    latencias = []
+    for _ in range(consultas):
+        inicio = time.perf_counter()
+        if cubierta:
+            svc.verificar_pago(pedido)
+        else:
+            pasarela.verificar(pedido.id_transaccion)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pedidos", type=int, default=200)
+    args = parser.parse_args()
+
+    salida = sys.stdout
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        resultados = {fb: _checkout(args.pedidos, fb) for fb in (False, True)}
+        verif = {c: _verificacion(args.pedidos, c) for c in (False, True)}
+
+    for fallback, (lat, exitos) in resultados.items():
+        print(f"  checkout fallback={'sí' if fallback else 'no':<3} "
+              f"éxito {exitos:>4}/{args.pedidos}  "
+              f"p50 {_percentil(lat, .5)*1000:7.2f} ms  p99 {_percentil(lat, .99)*1000:7.2f} ms",
+              file=salida)
+    for cubierta, lat in verif.items():
+        print(f"  verificar cubierta={'sí' if cubierta else 'no':<3}            "
+              f"p50 {_percentil(lat, .5)*1000:7.2f} ms  p99 {_percentil(lat, .99)*1000:7.2f} ms",
+              file=salida)
+
+
+if __name__ == "__main__":
+    main()
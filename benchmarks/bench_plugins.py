@@ -0,0 +1,96 @@
+"""
+Benchmark — Registros de plugins (tipos de producto y pasarelas)
+==================================================================
+  - resolver un tipo: el registro con la clave ya normalizada (un acceso
+    al dict) frente al despacho anterior (.upper() + 'in' + [])
+  - importar el registro; importar la Factory y los Adapters no descubre
+    ni importa plugins
+  - descubrir por primera vez con N plugins en la carpeta local (solo
+    nombres de archivo) y cargar uno de ellos al usarlo
+
+  python benchmarks/bench_plugins.py [--plugins 200] [--consultas 1000000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--plugins", type=int, default=200)
+    parser.add_argument("--consultas", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        for i in range(args.plugins):
+            with open(os.path.join(carpeta, f"producto_extra{i:04d}.py"), "w") as f:
+                f.write("from infrastructure.factory.producto_factory import ProductoDLC\n"
+                        "PLUGIN = type('ProductoExtra', (ProductoDLC,), {})\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Lo que la Factory y los Adapters ya importaban antes del registro
+            import threading  # noqa: F401
+            import domain.interfaces.interfaces  # noqa: F401
+            from infrastructure.config.configuracion import ConfiguracionTienda
+            ConfiguracionTienda().establecer("plugins_carpeta", carpeta)
+            inicio = time.perf_counter()
+            import infrastructure.plugins.registro  # noqa: F401
+            t_import = time.perf_counter() - inicio
+            from infrastructure.factory.producto_factory import ProductoFactory
+            from infrastructure.adapters.adapters_pago import PASARELAS
+        registro = ProductoFactory._registro
+        cargados = sum(1 for m in sys.modules if m.startswith("gamestore_plugins."))
+        print(f"  import del registro        : {t_import * 1e3:8.2f} ms "
+              f"(tras importar Factory y Adapters: descubierto={registro._descubierto}, "
+              f"plugins importados={cargados})")
+
+        # Despacho
+        anterior = dict(registro)
+        tipos = ["FISICO", "DIGITAL", "DLC", "SUSCRIPCION"] * (args.consultas // 4)
+        inicio = time.perf_counter()
+        for tipo in tipos:
+            tipo = tipo.upper()
+            if tipo not in anterior:
+                raise ValueError(tipo)
+            anterior[tipo]
+        t_anterior = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for tipo in tipos:
+            registro[tipo]
+        t_registro = time.perf_counter() - inicio
+        minusculas = [t.lower() for t in tipos]
+        inicio = time.perf_counter()
+        for tipo in minusculas:
+            registro[tipo]
+        t_alias = time.perf_counter() - inicio
+        n = len(tipos)
+        print(f"  resolver: upper + in + []  : {t_anterior / n * 1e9:8.1f} ns")
+        print(f"  resolver: clave normalizada: {t_registro / n * 1e9:8.1f} ns")
+        print(f"  resolver: otra grafía      : {t_alias / n * 1e9:8.1f} ns")
+
+        # Descubrimiento y carga diferida
+        inicio = time.perf_counter()
+        PASARELAS.claves()
+        t_vacio = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        claves = ProductoFactory.tipos_disponibles()
+        t_descubrir = time.perf_counter() - inicio
+        cargados = sum(1 for m in sys.modules if m.startswith("gamestore_plugins."))
+        inicio = time.perf_counter()
+        ProductoFactory.clase_para("EXTRA0007")
+        t_cargar = time.perf_counter() - inicio
+        print(f"  descubrir sin plugins      : {t_vacio * 1e3:8.2f} ms "
+              f"({len(sys.path)} carpetas de sys.path)")
+        print(f"  descubrir {args.plugins} plugins      : {t_descubrir * 1e3:8.2f} ms "
+              f"({len(claves)} tipos, plugins importados: {cargados})")
+        print(f"  cargar un plugin al usarlo : {t_cargar * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
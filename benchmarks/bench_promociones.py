@@ -0,0 +1,101 @@
+"""
+Benchmark — Motor de promociones
+==================================
+Latencia de repreciar el carrito tras cada agregar (incremental) y de
+preciar el carrito completo, con 0, 1 000 y 10 000 promociones activas.
+Se compara con una evaluación ingenua que recorre todas las reglas.
+
+  python benchmarks/bench_promociones.py [--productos 5000] [--carrito 30]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from application.services.promociones import MotorPromociones, _coincide
+from domain.model.modelos import Producto, ItemPedido, Promocion
+
+TIPOS = ["FISICO", "DIGITAL", "DLC", "SUSCRIPCION"]
+PLATAFORMAS = ["PC", "PS5", "Xbox", "Nintendo Switch", "Xbox/PC", "PS5/PS4"]
+
+
+def _catalogo(n: int) -> list[Producto]:
+    azar = random.Random(1)
+    return [Producto(f"P{i:06d}", f"Juego {i}", "Acción", azar.choice(PLATAFORMAS),
+                     round(azar.uniform(20, 300), 2), azar.choice(TIPOS), 999)
+            for i in range(n)]
+
+
+def _promociones(n: int, catalogo: list[Producto]) -> list[Promocion]:
+    azar = random.Random(2)
+    promos = []
+    for i in range(n):
+        d = round(azar.uniform(0.05, 0.5), 2)
+        forma = azar.random()
+        if forma < 0.70:
+            promos.append(Promocion(f"R{i}", f"Promo {i}", d, id_producto=azar.choice(catalogo).id))
+        elif forma < 0.90:
+            pack = tuple(p.id for p in azar.sample(catalogo, 2))
+            promos.append(Promocion(f"R{i}", f"Pack {i}", d, pack=pack))
+        elif forma < 0.97:
+            promos.append(Promocion(f"R{i}", f"Plataforma {i}", d,
+                                    plataforma=azar.choice(["PC", "PS5", "XBOX"]),
+                                    tipo=azar.choice(TIPOS)))
+        else:
+            promos.append(Promocion(f"R{i}", f"Tipo {i}", d, tipo=azar.choice(TIPOS)))
+    return promos
+
+
+def _ingenuo(reglas: list[Promocion], carrito: list[ItemPedido]):
+    ids = {i.producto.id for i in carrito}
+    for item in carrito:
+        mejor = 0.0
+        for r in reglas:
+            if _coincide(r, item.producto) and (not r.pack or all(x in ids for x in r.pack)):
+                mejor = max(mejor, r.descuento)
+        item.precio_unitario = round(item.producto.precio * (1 - mejor), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--carrito", type=int, default=30)
+    parser.add_argument("--rondas", type=int, default=200)
+    args = parser.parse_args()
+
+    catalogo = _catalogo(args.productos)
+    azar = random.Random(3)
+    print(f"  {'promos':>7} {'repreciar/agregar':>18} {'carrito completo':>17} {'ingenuo':>12}")
+    for n in (0, 1_000, 10_000):
+        reglas = _promociones(n, catalogo)
+        motor = MotorPromociones()
+        motor.agregar(*reglas)
+
+        t_inc = t_full = t_naive = 0.0
+        for _ in range(args.rondas):
+            carrito = []
+            for producto in azar.sample(catalogo, args.carrito):
+                carrito.append(ItemPedido(producto, 1, producto.precio))
+                inicio = time.perf_counter()
+                motor.repreciar(carrito, producto.id)
+                t_inc += time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            motor.repreciar_todo(carrito)
+            t_full += time.perf_counter() - inicio
+        for _ in range(max(args.rondas // 20, 1)):
+            carrito = [ItemPedido(p, 1, p.precio) for p in azar.sample(catalogo, args.carrito)]
+            inicio = time.perf_counter()
+            _ingenuo(reglas, carrito)
+            t_naive += time.perf_counter() - inicio
+
+        agregados = args.rondas * args.carrito
+        print(f"  {n:>7,} {t_inc / agregados * 1e6:>15.1f} µs "
+              f"{t_full / args.rondas * 1e6:>14.1f} µs "
+              f"{t_naive / max(args.rondas // 20, 1) * 1e3:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark — Recomendaciones "también compraron"
+=================================================
+Con un historial de pedidos sintético (popularidad sesgada, 2-5 productos
+por pedido) mide:
+  - construir la matriz desde el historial
+  - latencia de recomendar() para carritos de 1 y de 5 productos
+  - costo en el camino del cobro: registrar() (encolar) frente a aplicar
+    el pedido a la matriz y recalcular vecinos en el mismo hilo
+  - throughput del hilo de fondo
+
+  python benchmarks/bench_recomendaciones.py [--productos 5000] [--pedidos 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from application.services.recomendaciones import MotorRecomendaciones
+from domain.model.modelos import Producto, ItemPedido, Pedido
+
+
+def _pedidos(n: int, productos: list[Producto], azar: random.Random) -> list[Pedido]:
+    acumulado, total = [], 0.0
+    for i in range(len(productos)):                            # Zipf
+        total += 1 / (i + 1)
+        acumulado.append(total)
+    pedidos = []
+    for i in range(n):
+        elegidos = {p.id: p for p in azar.choices(productos, cum_weights=acumulado,
+                                                  k=azar.randint(2, 5))}
+        pedidos.append(Pedido(f"B{i}", "bench",
+                              [ItemPedido(p, 1, p.precio) for p in elegidos.values()]))
+    return pedidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--pedidos", type=int, default=200_000)
+    parser.add_argument("--consultas", type=int, default=20_000)
+    args = parser.parse_args()
+
+    azar = random.Random(7)
+    productos = [Producto(f"R{i:05d}", f"Juego {i}", "Acción", "PC", 50.0, "DIGITAL", 999)
+                 for i in range(args.productos)]
+    historial = _pedidos(args.pedidos, productos, azar)
+    nuevos = _pedidos(20_000, productos, azar)
+
+    motor = MotorRecomendaciones()
+    inicio = time.perf_counter()
+    motor.cargar(historial)
+    t_cargar = time.perf_counter() - inicio
+
+    ids = [p.id for p in productos]
+    populares = ids[:200]
+    print(f"  historial: {args.pedidos:,} pedidos, {args.productos:,} productos")
+    print(f"  construir matriz          : {t_cargar:8.2f} s")
+    for tam in (1, 5):
+        carritos = [azar.sample(populares, tam) for _ in range(args.consultas)]
+        inicio = time.perf_counter()
+        for carrito in carritos:
+            motor.recomendar(carrito, 3)
+        t = time.perf_counter() - inicio
+        print(f"  recomendar (carrito de {tam}) : {t / args.consultas * 1e6:8.1f} µs")
+
+    # En el camino del cobro: encolar vs actualizar en línea
+    inicio = time.perf_counter()
+    for pedido in nuevos:
+        motor.registrar(pedido)
+    t_encolar = time.perf_counter() - inicio
+    motor.esperar()
+    t_fondo = time.perf_counter() - inicio
+
+    en_linea = MotorRecomendaciones()
+    en_linea.cargar(historial)
+    inicio = time.perf_counter()
+    for pedido in nuevos:
+        ids_pedido = tuple({item.producto.id for item in pedido.items})
+        en_linea._recalcular(en_linea._aplicar([(ids_pedido, 1)]))
+    t_en_linea = time.perf_counter() - inicio
+
+    print(f"  registrar() por cobro     : {t_encolar / len(nuevos) * 1e6:8.1f} µs (encolar)")
+    print(f"  actualizar en línea       : {t_en_linea / len(nuevos) * 1e6:8.1f} µs por pedido")
+    print(f"  hilo de fondo             : {len(nuevos) / t_fondo:8,.0f} pedidos/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark — Reembolsos por lotes
+==================================
+Cancela miles de pedidos pagados repartidos entre las tres pasarelas, con
+dobles que tardan 'latencia' por llamada. Mide:
+  - reembolsos/s del lote (concurrencia acotada por pasarela) frente a
+    reembolsar uno por uno (medido sobre una muestra y extrapolado)
+  - máximo de reembolsos simultáneos observado en cada pasarela, que no
+    debe pasar de su límite (reembolsos_simultaneos)
+  - que el stock devuelto cuadre con lo vendido
+
+  python benchmarks/bench_reembolsos.py [--pedidos 20000] [--latencia 0.005]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from application.services.tienda_service import TiendaService
+from domain.interfaces.interfaces import IPasarelaPago
+from domain.model.modelos import Pedido, ItemPedido
+from infrastructure.adapters.simulados import pasarela_con_fallos
+from infrastructure.config.configuracion import ConfiguracionTienda
+
+PASARELAS = ("PAYPAL", "CULQI", "YAPE")
+
+
+class _Contador(IPasarelaPago):
+    """Envuelve una pasarela y anota cuántos reembolsos tuvo en curso a la vez."""
+
+    def __init__(self, pasarela: IPasarelaPago):
+        self._pasarela = pasarela
+        self._lock = threading.Lock()
+        self.en_curso = self.maximo = 0
+
+    def cobrar(self, pedido, moneda):
+        return self._pasarela.cobrar(pedido, moneda)
+
+    def verificar(self, id_transaccion):
+        return self._pasarela.verificar(id_transaccion)
+
+    def reembolsar(self, id_transaccion, monto, moneda):
+        with self._lock:
+            self.en_curso += 1
+            self.maximo = max(self.maximo, self.en_curso)
+        try:
+            return self._pasarela.reembolsar(id_transaccion, monto, moneda)
+        finally:
+            with self._lock:
+                self.en_curso -= 1
+
+    def nombre(self):
+        return self._pasarela.nombre()
+
+
+def _tienda(latencia: float, semilla: int) -> tuple[TiendaService, dict[str, _Contador]]:
+    svc = TiendaService()
+    contadores = {}
+    for i, nombre in enumerate(PASARELAS):
+        contadores[nombre] = _Contador(pasarela_con_fallos(
+            nombre, latencia_s=latencia, tasa_error=0.001, semilla=semilla + i))
+        svc.usar_pasarela(nombre, contadores[nombre])
+    return svc, contadores
+
+
+def _pedidos_pagados(svc: TiendaService, n: int, prefijo: str) -> list[Pedido]:
+    """Pedidos ya cobrados (sin pasar por el checkout) con un físico y un digital."""
+    fisico, digital = svc.buscar_producto("G002"), svc.buscar_producto("G001")
+    pedidos = []
+    for i in range(n):
+        pedido = Pedido(f"{prefijo}-{i:06d}", f"cliente-{i % 5000}",
+                        [ItemPedido(fisico, 1, fisico.precio),
+                         ItemPedido(digital, 1, digital.precio)],
+                        estado="PAGADO", metodo_pago=PASARELAS[i % 3],
+                        id_transaccion=f"TX-{prefijo}-{i}")
+        pedido.claves[digital.id] = [f"CLAVE-{i}"]
+        fisico.stock -= 1
+        pedidos.append(pedido)
+    return pedidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pedidos", type=int, default=20_000)
+    parser.add_argument("--latencia", type=float, default=0.005)
+    parser.add_argument("--muestra", type=int, default=600)
+    args = parser.parse_args()
+
+    config = ConfiguracionTienda()
+    with tempfile.TemporaryDirectory() as carpeta:
+        config.establecer("stock_archivo", os.path.join(carpeta, "stock.log"))
+        config.establecer("suscripciones_archivo", os.path.join(carpeta, "suscripciones.tsv"))
+        # Muchas claves distintas: que la tabla de idempotencia no desaloje las del lote
+        config.establecer("idempotencia_max", args.pedidos * 2)
+
+        # 1. Uno por uno, sobre una muestra
+        with contextlib.redirect_stdout(io.StringIO()):
+            svc, _ = _tienda(args.latencia, 10)
+            muestra = _pedidos_pagados(svc, args.muestra, "SEQ")
+            inicio = time.perf_counter()
+            for pedido in muestra:
+                svc.cancelar_pedido(pedido)
+            t_uno = (time.perf_counter() - inicio) / args.muestra
+            svc._libro.cerrar()
+
+        # 2. El lote completo
+        avance = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            svc, contadores = _tienda(args.latencia, 20)
+            stock_inicial = svc.buscar_producto("G002").stock
+            pedidos = _pedidos_pagados(svc, args.pedidos, "LOT")
+            resumen = svc.reembolsar_lote(
+                pedidos, lambda hechos, total, ok, fallidos: avance.append(hechos))
+            # Los fallidos (errores simulados) se reintentan en un segundo lote
+            pendientes = [p for p in pedidos if p.estado == "PAGADO"]
+            reintento = svc.reembolsar_lote(pendientes)
+            svc._libro.cerrar()
+
+        limites = config.obtener("reembolsos_simultaneos")
+        stock_final = svc.buscar_producto("G002").stock
+        revocadas = sum(len(p.claves_revocadas) for p in pedidos)
+        print(f"  {args.pedidos:,} pedidos, latencia de pasarela {args.latencia * 1e3:.1f} ms")
+        print(f"  uno por uno (extrapolado) : {args.pedidos * t_uno:8.1f} s "
+              f"({1 / t_uno:,.0f} reembolsos/s)")
+        print(f"  lote                      : {resumen['segundos']:8.1f} s "
+              f"({args.pedidos / resumen['segundos']:,.0f} reembolsos/s)")
+        print(f"  reembolsados / fallidos   : {resumen['reembolsados']:,} / "
+              f"{len(resumen['fallidos']):,} (reintento: {reintento['reembolsados']:,} ok)")
+        print(f"  avisos de progreso        : {len(avance)}")
+        for nombre in PASARELAS:
+            print(f"  {nombre:<6} simultáneos máx.   : {contadores[nombre].maximo:3d} "
+                  f"(límite {limites[nombre]})")
+        print(f"  stock G002 inicial / final: {stock_inicial} / {stock_final} | "
+              f"claves revocadas: {revocadas:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark — Captura y reproducción de tráfico
+===============================================
+Simula N compras (sesión, cliente, carrito, lote, pedido, pago y a veces
+cancelación) y mide:
+  - costo de grabar: µs extra por llamada con el grabador instalado
+  - tamaño de la traza: bytes por llamada
+  - reproducir sin esperas, dos veces con la misma semilla: las huellas
+    deben coincidir; con otra semilla, no
+  - lo que agrega el perfilador (cProfile + tracemalloc) a la reproducción
+
+  python benchmarks/bench_reproduccion.py [--compras 3000] [--semilla 7]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from application.services.tienda_service import TiendaService
+from domain.model.modelos import Sesion
+from infrastructure.config.configuracion import ConfiguracionTienda
+from infrastructure.perfilado.reproduccion import Reproductor
+from infrastructure.perfilado.traza import GrabadorTraza
+
+PASARELAS = ("PAYPAL", "CULQI", "YAPE")
+
+
+def _compras(svc: TiendaService, n: int) -> int:
+    """
+    Tráfico sintético; retorna cuántas llamadas hizo a la tienda. La mitad
+    de las sesiones llega con su cliente ya puesto, como las de la API.
+    """
+    llamadas = 0
+    for i in range(n):
+        if i % 2:
+            svc.usar_sesion(Sesion(cliente=f"api-{i % 300}"))
+        else:
+            svc.usar_sesion(Sesion())
+            svc.set_cliente(f"cliente-{i % 300}")
+            llamadas += 1
+        svc.agregar_al_carrito("G001", 1)
+        svc.agregar_lote([("G002", 1), ("G006", 1)])
+        pedido = svc.crear_pedido()
+        svc.procesar_pago(pedido, PASARELAS[i % 3])
+        llamadas += 5
+        if i % 10 == 0:
+            svc.cancelar_pedido(pedido, "bench")
+            llamadas += 1
+    return llamadas
+
+
+def _medir(n: int, ruta: str | None) -> tuple[float, int]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        svc = TiendaService()
+        grabador = None
+        if ruta:
+            grabador = GrabadorTraza(ruta)
+            grabador.instalar(svc)
+        inicio = time.perf_counter()
+        llamadas = _compras(svc, n)
+        segundos = time.perf_counter() - inicio
+        if grabador:
+            grabador.cerrar()
+        svc.cerrar()
+    return segundos, llamadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--compras", type=int, default=3000)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    config = ConfiguracionTienda()
+    with tempfile.TemporaryDirectory() as carpeta:
+        config.establecer("stock_archivo", os.path.join(carpeta, "stock.log"))
+        config.establecer("suscripciones_archivo", os.path.join(carpeta, "suscripciones.tsv"))
+        config.establecer("idempotencia_max", args.compras * 4)
+        ruta = os.path.join(carpeta, "traza.gst")
+
+        _medir(min(args.compras, 300), None)           # calentar imports y primeros usos
+        t_sin, llamadas = _medir(args.compras, None)
+        t_con, _ = _medir(args.compras, ruta)
+        tamano = os.path.getsize(ruta)
+
+        corridas = []
+        for semilla, perfilar in ((args.semilla, False), (args.semilla, False),
+                                  (args.semilla + 1, False), (args.semilla, True)):
+            reproductor = Reproductor(ruta, semilla=semilla, perfilar=perfilar)
+            reproductor.ejecutar()
+            corridas.append(reproductor)
+        a, b, otra, perfilada = corridas
+
+        print(f"  {args.compras:,} compras, {llamadas:,} llamadas a la tienda")
+        print(f"  sin grabar                : {t_sin * 1e6 / llamadas:8.1f} µs/llamada")
+        print(f"  grabando                  : {t_con * 1e6 / llamadas:8.1f} µs/llamada "
+              f"(+{(t_con - t_sin) * 1e6 / llamadas:.1f})")
+        print(f"  traza                     : {tamano / 1024:8.1f} KB "
+              f"({tamano / llamadas:.1f} bytes/llamada)")
+        pedidos = a.etapas["crear_pedido"]
+        print(f"  reproducir (sin esperas)  : {a.segundos * 1e3:8.1f} ms "
+              f"({a.eventos:,} llamadas, {a.omitidos} omitidas, "
+              f"pedidos creados {pedidos.ok:,}/{len(pedidos.tiempos):,})")
+        print(f"  reproducir con perfilador : {perfilada.segundos * 1e3:8.1f} ms")
+        print(f"  huellas semilla {args.semilla}         : {a.huella} / {b.huella} "
+              f"→ {'iguales' if a.huella == b.huella else 'DISTINTAS'}")
+        print(f"  huella semilla {args.semilla + 1}          : {otra.huella} "
+              f"→ {'distinta' if otra.huella != a.huella else 'IGUAL'}")
+
+
+if __name__ == "__main__":
+    main()
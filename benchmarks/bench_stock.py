@@ -0,0 +1,119 @@
+"""
+Benchmark — Libro de stock (write-behind)
+===========================================
+  - latencia de registrar() en el camino del checkout (p50 / p99) con el
+    volcador escribiendo por lotes en segundo plano, frente a escribir y
+    hacer flush de cada movimiento en el mismo hilo
+  - movimientos/s sostenidos con varios hilos de checkout
+  - arranque: recuperar los saldos desde la última instantánea frente a
+    releer todo el diario
+  - reconstrucción del stock en un instante pasado
+
+  python benchmarks/bench_stock.py [--movimientos 200000] [--productos 500]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from infrastructure.inventario.libro_stock import LibroStock, VENTA, REPOSICION
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    valores = sorted(valores)
+    return valores[min(int(len(valores) * p), len(valores) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--movimientos", type=int, default=200_000)
+    parser.add_argument("--productos", type=int, default=500)
+    parser.add_argument("--hilos", type=int, default=4)
+    args = parser.parse_args()
+
+    azar = random.Random(8)
+    ids = [f"S{i:04d}" for i in range(args.productos)]
+    movs = [(azar.choice(ids), azar.randint(1, 3)) for _ in range(args.movimientos)]
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        # 1. Un hilo: write-behind frente a escritura síncrona
+        libro = LibroStock(os.path.join(carpeta, "stock.log"))
+        saldos = dict.fromkeys(ids, 1_000_000)
+        latencias = []
+        inicio = time.perf_counter()
+        for n, (id_p, cantidad) in enumerate(movs):
+            saldos[id_p] -= cantidad
+            t = time.perf_counter()
+            libro.registrar(id_p, VENTA, -cantidad, saldos[id_p], f"ORD-{n}")
+            latencias.append(time.perf_counter() - t)
+        t_registrar = time.perf_counter() - inicio
+        libro.esperar()
+        t_total = time.perf_counter() - inicio
+        marca = time.time()
+
+        sincronas = []
+        with open(os.path.join(carpeta, "sincrono.log"), "a") as f:
+            for n, (id_p, cantidad) in enumerate(movs[:20_000]):
+                t = time.perf_counter()
+                f.write(f"{time.time():.6f}\t{id_p}\t{VENTA}\t{-cantidad}\t0\tORD-{n}\n")
+                f.flush()
+                sincronas.append(time.perf_counter() - t)
+
+        print(f"  {args.movimientos:,} movimientos, {args.productos} productos")
+        print(f"  registrar() p50 / p99      : {_percentil(latencias, .5) * 1e6:6.2f} / "
+              f"{_percentil(latencias, .99) * 1e6:6.2f} µs")
+        print(f"  write + flush  p50 / p99   : {_percentil(sincronas, .5) * 1e6:6.2f} / "
+              f"{_percentil(sincronas, .99) * 1e6:6.2f} µs")
+        print(f"  1 hilo: registrar / en disco: {args.movimientos / t_registrar:>10,.0f} / "
+              f"{args.movimientos / t_total:,.0f} mov/s")
+
+        # 2. Varios hilos de checkout a la vez
+        por_hilo = args.movimientos // args.hilos
+
+        def _checkout(k):
+            for n in range(por_hilo):
+                id_p, cantidad = movs[(k * por_hilo + n) % len(movs)]
+                libro.registrar(id_p, REPOSICION, cantidad, 0, f"H{k}")
+
+        hilos = [threading.Thread(target=_checkout, args=(k,)) for k in range(args.hilos)]
+        inicio = time.perf_counter()
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        libro.esperar()
+        t_hilos = time.perf_counter() - inicio
+        print(f"  {args.hilos} hilos (hasta el disco)   : {por_hilo * args.hilos / t_hilos:>10,.0f} mov/s")
+        libro.cerrar()
+
+        # 3. Arranque y reconstrucción
+        archivo = os.path.join(carpeta, "stock.log")
+        inicio = time.perf_counter()
+        recuperado = LibroStock(archivo)
+        t_snap = time.perf_counter() - inicio
+        assert recuperado.saldos()[movs[-1][0]] is not None
+        recuperado.cerrar()
+        os.rename(archivo + ".snap", archivo + ".snap.bak")
+        inicio = time.perf_counter()
+        LibroStock(archivo).cerrar()
+        t_completo = time.perf_counter() - inicio
+        os.rename(archivo + ".snap.bak", archivo + ".snap")
+        print(f"  arranque con instantánea   : {t_snap * 1e3:8.1f} ms")
+        print(f"  arranque releyendo diario  : {t_completo * 1e3:8.1f} ms")
+
+        recuperado = LibroStock(archivo)
+        inicio = time.perf_counter()
+        for id_p in ids[:50]:
+            recuperado.stock_en(id_p, marca)
+        t_en = (time.perf_counter() - inicio) / 50
+        recuperado.cerrar()
+        print(f"  stock_en(instante pasado)  : {t_en * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark — Registro de suscripciones
+=======================================
+Altas, renovaciones apiladas y barrido de vencimientos/recordatorios con
+millones de suscripciones activas, sobre un reloj simulado que avanza un
+año. Se compara un revisar() con la rueda de temporizadores contra un
+barrido ingenuo que recorre todas las suscripciones. Opcionalmente mide
+compactar y recargar el diario en disco.
+
+  python benchmarks/bench_suscripciones.py [--n 5000000] [--disco]
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from infrastructure.suscripciones.registro import RegistroSuscripciones, DIA
+
+
+T0 = 1_800_000_000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=5_000_000)
+    parser.add_argument("--disco", action="store_true", help="mide compactar y recargar el diario")
+    args = parser.parse_args()
+
+    reloj = [T0]
+    registro = RegistroSuscripciones(archivo=None, aviso_dias=3, reloj=lambda: reloj[0])
+    azar = random.Random(5)
+    planes = (("G007", 30), ("G008", 90), ("G009", 365))
+
+    # Cada alta empezó en algún momento de su plan aún vigente: los
+    # vencimientos se reparten a lo largo del año siguiente
+    altas = []
+    for i in range(args.n):
+        id_plan, dias = azar.choice(planes)
+        altas.append((f"c{i}", id_plan, dias, T0 - azar.uniform(0, dias - 1) * DIA))
+    inicio = time.perf_counter()
+    for cliente, id_plan, dias, cuando in altas:
+        registro.activar(cliente, id_plan, dias, ahora=cuando)
+    t_altas = time.perf_counter() - inicio
+    del altas
+
+    renovar = max(args.n // 10, 1)
+    duraciones = dict(planes)
+    inicio = time.perf_counter()
+    for i in azar.sample(range(args.n), renovar):
+        sub = registro.consultar(f"c{i}")[0]
+        registro.activar(sub.cliente, sub.id_producto, duraciones[sub.id_producto], ahora=T0)
+    t_apilar = time.perf_counter() - inicio
+    memoria_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    vigentes = list(registro._vigentes.values())
+    inicio = time.perf_counter()
+    _ingenuo(vigentes, T0 + 60)
+    t_ingenuo = time.perf_counter() - inicio
+    del vigentes
+
+    # Un revisar() por minuto de reloj simulado durante el primer día,
+    # luego uno por hora hasta cubrir el año.
+    eventos = revisiones = 0
+    peor = 0.0
+    inicio = time.perf_counter()
+    pasos = [T0 + m * 60 for m in range(1, 24 * 60 + 1)]
+    pasos += [T0 + DIA + h * 3600 for h in range(1, 24 * 365 + 1)]
+    for instante in pasos:
+        reloj[0] = instante
+        t = time.perf_counter()
+        vencidas, avisos = registro.revisar()
+        peor = max(peor, time.perf_counter() - t)
+        eventos += len(vencidas) + len(avisos)
+        revisiones += 1
+    t_barrido = time.perf_counter() - inicio
+
+    print(f"  suscripciones            : {args.n:,} (+{renovar:,} renovaciones apiladas)")
+    print(f"  memoria (pico RSS)       : {memoria_mb:,.0f} MB")
+    print(f"  altas                    : {args.n / t_altas:>12,.0f} /s")
+    print(f"  renovaciones             : {renovar / t_apilar:>12,.0f} /s")
+    print(f"  eventos disparados       : {eventos:,} en {revisiones:,} revisiones")
+    print(f"  throughput de disparo    : {eventos / t_barrido:>12,.0f} eventos/s")
+    print(f"  revisar() medio / peor   : {t_barrido / revisiones * 1e3:8.3f} ms / {peor * 1e3:.1f} ms")
+    print(f"  barrido ingenuo (1 tick) : {t_ingenuo * 1e3:8.1f} ms")
+
+    if args.disco:
+        _disco(args.n)
+
+
+def _ingenuo(vigentes, ahora):
+    """Lo que costaría cada revisión recorriendo todas las suscripciones."""
+    aviso = 3 * DIA
+    return ([s for s in vigentes if s.fin <= ahora],
+            [s for s in vigentes if not s.avisada and s.fin - aviso <= ahora < s.fin])
+
+
+def _disco(n: int):
+    azar = random.Random(6)
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivo = os.path.join(carpeta, "suscripciones.tsv")
+        registro = RegistroSuscripciones(archivo=archivo, reloj=lambda: T0)
+        inicio = time.perf_counter()
+        for i in range(n):
+            registro.activar(f"c{i}", "G009", azar.choice((30, 90, 365)))
+        t_diario = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        registro.compactar()
+        t_compactar = time.perf_counter() - inicio
+        registro.cerrar()
+        tamano_mb = os.path.getsize(archivo) / 2**20
+        del registro
+
+        inicio = time.perf_counter()
+        recargado = RegistroSuscripciones(archivo=archivo, reloj=lambda: T0)
+        t_cargar = time.perf_counter() - inicio
+        assert len(recargado) == n
+
+    print(f"  alta con diario (flush)  : {n / t_diario:>12,.0f} /s")
+    print(f"  compactar                : {t_compactar:8.2f} s  ({tamano_mb:,.0f} MB)")
+    print(f"  recargar al arrancar     : {t_cargar:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ sin decir CÓMO lo hace. Ninguna capa superior depende de
 implementaciones concretas, solo de estas interfaces.
 """
 from abc import ABC, abstractmethod
-from domain.model.modelos import Producto, Pedido
+from domain.model.modelos import Producto, Pedido, Cliente
 
 
 class IProducto(ABC):
@@ -23,7 +23,8 @@ class IProducto(ABC):
     @abstractmethod
     def validar_compra(self, cantidad: int) -> tuple[bool, str]:
         """
-        Valida si la compra es posible.
+        Valida si la compra es posible. 'cantidad' son las unidades que
+        habría en el carrito tras agregar (no solo las nuevas).
         Retorna (True, "") si ok, o (False, "razón") si no.
         """
         pass
@@ -33,6 +34,14 @@ class IProducto(ABC):
         """Acciones después de confirmar la compra (ej: descontar stock)."""
         pass
 
+    @abstractmethod
+    def cancelar(self, pedido: Pedido):
+        """
+        Deshace post_compra al cancelar un pedido pagado
+        (ej: devolver stock, revocar claves).
+        """
+        pass
+
 
 class IPasarelaPago(ABC):
     """
@@ -53,7 +62,23 @@ class IPasarelaPago(ABC):
         """Consulta el estado de una transacción."""
         pass
 
+    @abstractmethod
+    def reembolsar(self, id_transaccion: str, monto: float, moneda: str) -> dict:
+        """
+        Devuelve 'monto' de una transacción cobrada.
+        Retorna dict con: exitoso, id_reembolso, mensaje
+        """
+        pass
+
     @abstractmethod
     def nombre(self) -> str:
         """Nombre de la pasarela."""
         pass
+
+    def perfil_cliente(self, cliente: Cliente) -> dict:
+        """
+        Datos del cliente que la pasarela necesita para cobrar (email,
+        teléfono...). No dependen del pedido, así que se calculan una vez
+        por cliente y se guardan en caché. Por defecto, ninguno.
+        """
+        return {}
@@ -3,6 +3,8 @@ CAPA: Domain / Model
 =====================
 Entidades puras del negocio. No dependen de nada externo.
 """
+import hashlib
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
@@ -20,6 +22,10 @@ class Producto:
     stock: int = 0
     descripcion: str = ""
 
+    def __post_init__(self):
+        # Normalizado e internado una vez: la Factory lo resuelve con un solo lookup
+        self.tipo = sys.intern(self.tipo.strip().upper())
+
     def __str__(self):
         stock_txt = f"Stock: {self.stock}" if self.tipo == "FISICO" else "Descarga"
         return (f"[{self.id}] {self.nombre} | {self.plataforma} | "
@@ -32,6 +38,7 @@ class ItemPedido:
     producto: Producto
     cantidad: int
     precio_unitario: float
+    promocion: str = ""           # nombre de la promoción aplicada, si hay
 
     @property
     def subtotal(self) -> float:
@@ -48,19 +55,127 @@ class Pedido:
     metodo_pago: str = ""
     id_transaccion: str = ""
     fecha: datetime = field(default_factory=datetime.now)
+    id_cliente: str = ""
+    perfil_pago: dict = field(default_factory=dict)   # datos del cliente para la pasarela
+    claves: dict = field(default_factory=dict)        # id producto → claves de activación
+    claves_revocadas: list = field(default_factory=list)
+    id_reembolso: str = ""
 
     @property
     def total(self) -> float:
         return sum(item.subtotal for item in self.items)
 
-    def mostrar(self):
-        print(f"\n  🛒 Pedido: {self.id} | Cliente: {self.cliente} | Estado: {self.estado}")
-        print(f"     {'Producto':<30} {'Cant':>5} {'P.Unit':>8} {'Subtotal':>10}")
-        print(f"     {'─'*56}")
+    def lineas(self) -> list[str]:
+        """Detalle del pedido formateado, una cadena por línea."""
+        lineas = [
+            f"\n  🛒 Pedido: {self.id} | Cliente: {self.cliente} | Estado: {self.estado}",
+            f"     {'Producto':<30} {'Cant':>5} {'P.Unit':>8} {'Subtotal':>10}",
+            f"     {'─'*56}",
+        ]
         for item in self.items:
-            print(f"     {item.producto.nombre:<30} {item.cantidad:>5} "
-                  f"S/{item.precio_unitario:>7.2f} S/{item.subtotal:>9.2f}")
-        print(f"     {'─'*56}")
-        print(f"     {'TOTAL':>44} S/{self.total:>9.2f}")
+            lineas.append(f"     {item.producto.nombre:<30} {item.cantidad:>5} "
+                          f"S/{item.precio_unitario:>7.2f} S/{item.subtotal:>9.2f}")
+        lineas.append(f"     {'─'*56}")
+        lineas.append(f"     {'TOTAL':>44} S/{self.total:>9.2f}")
         if self.id_transaccion:
-            print(f"     Transacción: {self.id_transaccion} | Método: {self.metodo_pago}")
+            lineas.append(f"     Transacción: {self.id_transaccion} | Método: {self.metodo_pago}")
+        if self.id_reembolso:
+            lineas.append(f"     Reembolso: {self.id_reembolso}")
+        return lineas
+
+    def mostrar(self):
+        print("\n".join(self.lineas()))
+
+
+@dataclass
+class Cliente:
+    """
+    Cliente de la tienda. El id y, si no se indican, el email y el teléfono
+    se derivan del nombre con hashlib: son los mismos en cada ejecución.
+    """
+    id: str
+    nombre: str
+    email: str
+    telefono: str
+
+    @staticmethod
+    def normalizar(nombre: str) -> str:
+        return " ".join(nombre.lower().split())
+
+    @classmethod
+    def desde_nombre(cls, nombre: str, email: str = "", telefono: str = "") -> "Cliente":
+        clave = cls.normalizar(nombre)
+        resumen = hashlib.sha1(clave.encode()).hexdigest()
+        return cls(
+            id       = "CLI-" + resumen[:10].upper(),
+            nombre   = " ".join(nombre.split()),
+            email    = email or f"{clave.replace(' ', '.')}@email.com",
+            telefono = telefono or str(900000000 + int(resumen[10:18], 16) % 100000000),
+        )
+
+
+@dataclass
+class Sesion:
+    """
+    Estado de compra de un cliente: quién compra y qué lleva en el carrito.
+    'unidades' y 'total_unidades' son contadores del carrito (por producto
+    y en total) para validar límites sin recorrerlo.
+    """
+    cliente: str = ""
+    carrito: list = field(default_factory=list)
+    unidades: dict = field(default_factory=dict)
+    total_unidades: int = 0
+
+    def sumar(self, id_producto: str, cantidad: int):
+        self.unidades[id_producto] = self.unidades.get(id_producto, 0) + cantidad
+        self.total_unidades += cantidad
+
+    def recontar(self):
+        self.unidades = {}
+        self.total_unidades = 0
+        for item in self.carrito:
+            self.sumar(item.producto.id, item.cantidad)
+
+
+@dataclass
+class Promocion:
+    """
+    Regla de descuento porcentual. Los criterios vacíos no restringen:
+    una promoción solo con plataforma="PS5" aplica a todo lo de PS5.
+    Con pack, aplica a cada producto del pack solo si todos están en el carrito.
+    """
+    id: str
+    nombre: str
+    descuento: float              # 0.20 → 20 % de descuento
+    id_producto: str = ""
+    tipo: str = ""
+    plataforma: str = ""
+    pack: tuple = ()              # ej: ("G005", "G006")
+
+
+@dataclass
+class LimiteCompra:
+    """
+    Máximo de unidades permitido, según el ámbito:
+      "TIPO"     → de cada producto de ese tipo, por pedido   (clave = tipo)
+      "PRODUCTO" → de ese producto, por pedido                (clave = id)
+      "CLIENTE"  → de ese producto, por cliente, sumando sus
+                   pedidos pagados y su carrito               (clave = id)
+    """
+    ambito: str
+    clave: str
+    maximo: int
+
+
+@dataclass(slots=True)
+class Suscripcion:
+    """
+    Acceso de un cliente a un plan de suscripción. 'inicio' y 'fin' son
+    instantes en segundos (time.time()); comprar de nuevo el mismo plan
+    antes del fin alarga 'fin'.
+    """
+    cliente: str
+    id_producto: str
+    inicio: float
+    fin: float
+    avisada: bool = False         # recordatorio de renovación ya enviado
@@ -16,12 +16,20 @@ Adapters:
   AdapterPayPal  → PayPalSDK   → IPasarelaPago
   AdapterCulqi   → CulqiClient → IPasarelaPago
   AdapterYape    → YapeAPI     → IPasarelaPago
+
+reembolsar() se traduce igual: cada adapter llama al método de
+devolución de su API (refund_capture, crear_devolucion, devolver_pago).
+
+Pasarelas nuevas sin tocar este archivo: un plugin (entry point del grupo
+'gamestore.pasarelas' o archivo plugins/pasarela_<clave>.py) con una
+clase IPasarelaPago. Ver infrastructure/plugins/registro.py.
 """
 
 import random
 import string
 from domain.interfaces.interfaces import IPasarelaPago
-from domain.model.modelos import Pedido
+from domain.model.modelos import Pedido, Cliente
+from infrastructure.plugins.registro import RegistroPlugins, normalizar
 
 
 # ════════════════════════════════════════════════════
@@ -57,6 +65,14 @@ class PayPalSDK:
     def get_order_details(self, order_id: str) -> dict:
         return {"order_id": order_id, "status": "COMPLETED", "provider": "PayPal"}
 
+    def refund_capture(self, capture_id: str, amount_usd: float) -> dict:
+        print(f"     [PayPal SDK] refund_capture: {capture_id} | ${amount_usd:.2f} USD")
+        return {
+            "refund_id": "RF-" + ''.join(random.choices(string.digits, k=10)),
+            "status":    "COMPLETED",
+            "amount":    amount_usd,
+        }
+
 
 class CulqiClient:
     """
@@ -84,6 +100,14 @@ class CulqiClient:
             "proveedor": "Culqi",
         }
 
+    def crear_devolucion(self, cargo_id: str, monto_centimos: int, razon: str) -> dict:
+        print(f"     [Culqi Client] crear_devolucion: {cargo_id} | S/{monto_centimos/100:.2f} | {razon}")
+        return {
+            "devolucion_id": "rfd_" + ''.join(random.choices(string.ascii_lowercase + string.digits, k=12)),
+            "estado":        "exitoso",
+            "monto":         monto_centimos,
+        }
+
 
 class YapeDirectAPI:
     """
@@ -110,11 +134,24 @@ class YapeDirectAPI:
             "proveedor":        "Yape",
         }
 
+    def devolver_pago(self, codigo_op: str, monto: float) -> dict:
+        print(f"     [Yape API] devolver_pago: op {codigo_op} | S/{monto:.2f}")
+        return {
+            "codigo_devolucion": random.randint(100000, 999999),
+            "codigo_operacion":  codigo_op,
+            "aprobado":          True,
+        }
+
 
 # ════════════════════════════════════════════════════
 # ADAPTERS — Traducen las APIs al contrato IPasarelaPago
 # ════════════════════════════════════════════════════
 
+def _perfil(pasarela: IPasarelaPago, pedido: Pedido) -> dict:
+    """Perfil precalculado que trae el pedido o, si no trae, el del nombre del cliente."""
+    return pedido.perfil_pago or pasarela.perfil_cliente(Cliente.desde_nombre(pedido.cliente))
+
+
 class AdapterPayPal(IPasarelaPago):
     """
     Adapta el PayPalSDK → IPasarelaPago.
@@ -127,8 +164,8 @@ class AdapterPayPal(IPasarelaPago):
 
     TIPO_DE_CAMBIO = 3.75
 
-    def __init__(self):
-        self._sdk = PayPalSDK()
+    def __init__(self, sdk: PayPalSDK | None = None):
+        self._sdk = sdk or PayPalSDK()
 
     def cobrar(self, pedido: Pedido, moneda: str) -> dict:
         print(f"\n  🔌 [ADAPTER PayPal] Traduciendo pedido {pedido.id} para SDK de PayPal...")
@@ -158,6 +195,16 @@ class AdapterPayPal(IPasarelaPago):
             "proveedor":      "PayPal",
         }
 
+    def reembolsar(self, id_transaccion: str, monto: float, moneda: str) -> dict:
+        # Traducción: PEN → USD, igual que al cobrar
+        monto_usd = round(monto / self.TIPO_DE_CAMBIO, 2)
+        reembolso = self._sdk.refund_capture(id_transaccion, monto_usd)
+        return {
+            "exitoso":      reembolso["status"] == "COMPLETED",
+            "id_reembolso": reembolso["refund_id"],
+            "mensaje":      f"Reembolso PayPal (${monto_usd} USD ≈ S/{monto:.2f})",
+        }
+
     def nombre(self) -> str:
         return "PayPal"
 
@@ -172,15 +219,15 @@ class AdapterCulqi(IPasarelaPago):
     - Respuesta: dict Culqi → dict estándar
     """
 
-    def __init__(self):
-        self._client = CulqiClient()
+    def __init__(self, client: CulqiClient | None = None):
+        self._client = client or CulqiClient()
 
     def cobrar(self, pedido: Pedido, moneda: str) -> dict:
         print(f"\n  🔌 [ADAPTER Culqi] Traduciendo pedido {pedido.id} para Culqi...")
 
         # Traducción: soles → céntimos
         monto_centimos = int(pedido.total * 100)
-        email_cliente = f"{pedido.cliente.lower().replace(' ', '.')}@email.com"
+        email_cliente = _perfil(self, pedido)["email"]
 
         # Llamada al cliente Culqi con su propia API
         cargo = self._client.crear_cargo(
@@ -198,6 +245,9 @@ class AdapterCulqi(IPasarelaPago):
             "mensaje":        f"Pago Culqi aprobado — S/{pedido.total:.2f}",
         }
 
+    def perfil_cliente(self, cliente: Cliente) -> dict:
+        return {"email": cliente.email}
+
     def verificar(self, id_transaccion: str) -> dict:
         consulta = self._client.consultar_cargo(id_transaccion)
         return {
@@ -206,6 +256,15 @@ class AdapterCulqi(IPasarelaPago):
             "proveedor":      "Culqi",
         }
 
+    def reembolsar(self, id_transaccion: str, monto: float, moneda: str) -> dict:
+        devolucion = self._client.crear_devolucion(
+            id_transaccion, int(round(monto * 100)), "solicitud_comprador")
+        return {
+            "exitoso":      devolucion["estado"] == "exitoso",
+            "id_reembolso": devolucion["devolucion_id"],
+            "mensaje":      f"Devolución Culqi — S/{monto:.2f}",
+        }
+
     def nombre(self) -> str:
         return "Culqi"
 
@@ -215,23 +274,23 @@ class AdapterYape(IPasarelaPago):
     Adapta la YapeDirectAPI → IPasarelaPago.
 
     Traducciones realizadas:
-    - cobrar() requiere número de teléfono → lo extrae del nombre del cliente
+    - cobrar() requiere número de teléfono → lo toma del perfil del cliente
     - Respuesta: usa 'codigo_operacion' numérico → id_transaccion string
     - 'aprobado: True' → 'exitoso: True'
     """
 
-    def __init__(self):
-        self._api = YapeDirectAPI()
+    def __init__(self, api: YapeDirectAPI | None = None):
+        self._api = api or YapeDirectAPI()
 
     def cobrar(self, pedido: Pedido, moneda: str) -> dict:
         print(f"\n  🔌 [ADAPTER Yape] Traduciendo pedido {pedido.id} para Yape API...")
 
-        # Yape necesita número de teléfono: simulamos uno basado en el cliente
-        numero_simulado = str(abs(hash(pedido.cliente)) % 900000000 + 900000000)[:9]
+        # Yape necesita el número de teléfono del cliente
+        numero = _perfil(self, pedido)["numero"]
 
         # Llamada a la API de Yape con su propia estructura
         resultado = self._api.iniciar_pago(
-            numero_simulado,
+            numero,
             pedido.total,
             f"Pedido {pedido.id}",
         )
@@ -245,6 +304,9 @@ class AdapterYape(IPasarelaPago):
             "mensaje":        f"Yape aprobado — Código op: {resultado['codigo_operacion']}",
         }
 
+    def perfil_cliente(self, cliente: Cliente) -> dict:
+        return {"numero": cliente.telefono}
+
     def verificar(self, id_transaccion: str) -> dict:
         codigo = id_transaccion.replace("YAPE-", "")
         consulta = self._api.consultar_operacion(codigo)
@@ -254,23 +316,39 @@ class AdapterYape(IPasarelaPago):
             "proveedor":      "Yape",
         }
 
+    def reembolsar(self, id_transaccion: str, monto: float, moneda: str) -> dict:
+        codigo = id_transaccion.replace("YAPE-", "")
+        devolucion = self._api.devolver_pago(codigo, monto)
+        return {
+            "exitoso":      devolucion["aprobado"],
+            "id_reembolso": f"YAPE-D{devolucion['codigo_devolucion']}",
+            "mensaje":      f"Yape devuelto — Código op: {devolucion['codigo_devolucion']}",
+        }
+
     def nombre(self) -> str:
         return "Yape"
 
 
 # ── Registro de pasarelas disponibles ────────────────
-PASARELAS = {
-    "PAYPAL": AdapterPayPal,
-    "CULQI":  AdapterCulqi,
-    "YAPE":   AdapterYape,
-}
+# clave → clase; los plugins se descubren y cargan en su primer uso
+PASARELAS = RegistroPlugins(
+    "gamestore.pasarelas", "pasarela_",
+    {
+        "PAYPAL": AdapterPayPal,
+        "CULQI":  AdapterCulqi,
+        "YAPE":   AdapterYape,
+    },
+    etiquetas={"PAYPAL": "PayPal", "CULQI": "Culqi", "YAPE": "Yape"},
+    lista_activos="pasarelas_activas",
+)
 
 
 def obtener_pasarela(nombre: str) -> IPasarelaPago:
     """Retorna la pasarela de pago solicitada."""
-    key = nombre.upper()
-    if key not in PASARELAS:
-        disponibles = ", ".join(PASARELAS.keys())
-        raise ValueError(f"Pasarela '{nombre}' no disponible. Opciones: {disponibles}")
-    print(f"  🔌 [ADAPTER] Seleccionando pasarela: {key} → {PASARELAS[key].__name__}")
-    return PASARELAS[key]()
+    try:
+        clase = PASARELAS[nombre]
+    except KeyError:
+        disponibles = ", ".join(PASARELAS.claves())
+        raise ValueError(f"Pasarela '{nombre}' no disponible. Opciones: {disponibles}") from None
+    print(f"  🔌 [ADAPTER] Seleccionando pasarela: {normalizar(nombre)} → {clase.__name__}")
+    return clase()
@@ -0,0 +1,74 @@
+"""
+CAPA: Infrastructure / Adapters
+=================================
+Dobles de prueba de las APIs externas (Adaptees) con fallos inyectables.
+
+AdapteeConFallos envuelve un PayPalSDK, CulqiClient o YapeDirectAPI y
+añade a cada llamada una latencia, una probabilidad de llamada lenta
+(cola de latencia) y una probabilidad de error configurables (con semilla, para que las corridas sean reproducibles).
+Como el Adapter recibe el Adaptee por constructor, el resto del sistema
+no nota la diferencia:
+
+    pasarela = pasarela_con_fallos("CULQI", latencia_s=0.2, tasa_error=0.3)
+    svc.usar_pasarela("CULQI", pasarela)
+"""
+import random
+import time
+
+from domain.interfaces.interfaces import IPasarelaPago
+from infrastructure.adapters.adapters_pago import (
+    PayPalSDK, CulqiClient, YapeDirectAPI,
+    AdapterPayPal, AdapterCulqi, AdapterYape,
+)
+
+
+class FalloSimulado(ConnectionError):
+    """Error inyectado por AdapteeConFallos."""
+
+
+class AdapteeConFallos:
+    """Proxy de un Adaptee que retrasa y hace fallar sus métodos públicos."""
+
+    def __init__(self, real, latencia_s: float = 0.0, tasa_error: float = 0.0,
+                 semilla: int | None = None, tasa_lenta: float = 0.0,
+                 latencia_lenta_s: float = 0.0):
+        self._real = real
+        self.latencia_s = latencia_s
+        self.tasa_error = tasa_error
+        self.tasa_lenta = tasa_lenta
+        self.latencia_lenta_s = latencia_lenta_s
+        self._azar = random.Random(semilla)
+        self.llamadas = 0
+
+    def __getattr__(self, nombre: str):
+        atributo = getattr(self._real, nombre)
+        if nombre.startswith("_") or not callable(atributo):
+            return atributo
+
+        def _con_fallos(*args, **kwargs):
+            self.llamadas += 1
+            lenta = self._azar.random() < self.tasa_lenta
+            espera = self.latencia_lenta_s if lenta else self.latencia_s
+            if espera:
+                time.sleep(espera)
+            if self._azar.random() < self.tasa_error:
+                raise FalloSimulado(f"{type(self._real).__name__}.{nombre}: fallo simulado")
+            return atributo(*args, **kwargs)
+
+        return _con_fallos
+
+
+_ADAPTEES = {
+    "PAYPAL": (AdapterPayPal, PayPalSDK),
+    "CULQI":  (AdapterCulqi,  CulqiClient),
+    "YAPE":   (AdapterYape,   YapeDirectAPI),
+}
+
+
+def pasarela_con_fallos(nombre: str, **fallos) -> IPasarelaPago:
+    """
+    Adapter real de la pasarela, conectado a un Adaptee con fallos.
+    Los argumentos con nombre son los de AdapteeConFallos.
+    """
+    adapter, adaptee = _ADAPTEES[nombre.upper()]
+    return adapter(AdapteeConFallos(adaptee(), **fallos))
@@ -7,6 +7,11 @@ Configuración global de la tienda. Una sola instancia
 garantiza que todos los módulos lean los mismos parámetros
 sin inconsistencias ni duplicados.
 """
+import os
+
+# Raíz del proyecto: la carpeta de plugins se busca aquí, no en el
+# directorio desde el que se lanzó el proceso
+_RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 class ConfiguracionTienda:
@@ -38,7 +43,26 @@ class ConfiguracionTienda:
             "tipos_activos":      ["FISICO", "DIGITAL", "DLC", "SUSCRIPCION"],
             "pasarelas_activas":  ["PAYPAL", "CULQI", "YAPE"],
             "max_items_pedido":   10,
+            "limites_por_tipo":   {"DIGITAL": 5, "DLC": 1},
+            "limites_producto":   {},
+            "limites_cliente":    {},
             "prefijo_pedido":     "ORD",
+            "idempotencia_ttl_s": 24 * 3600,
+            "idempotencia_max":   10_000,
+            "ruteo_fallback":     False,
+            "circuito_umbral":    0.5,
+            "circuito_enfriar_s": 30,
+            "pago_lento_s":       2.0,
+            "suscripciones_archivo":  os.path.join(_RAIZ, "datos", "suscripciones.tsv"),
+            "suscripcion_aviso_dias": 3,
+            "recomendaciones_k":  3,
+            "stock_archivo":      os.path.join(_RAIZ, "datos", "stock.log"),
+            "stock_snapshot_cada": 10_000,
+            "reembolsos_simultaneos": {"PAYPAL": 4, "CULQI": 8, "YAPE": 4},
+            "api_sesion_ttl_s":   30 * 60,
+            "api_sesiones_max":   100_000,
+            "plugins_carpeta":    os.path.join(_RAIZ, "plugins"),
+            "plugins_activar":    False,
         }
         self._correlativo_pedido = 1
 
@@ -67,5 +91,10 @@ class ConfiguracionTienda:
         self._correlativo_pedido += 1
         return id_pedido
 
+    def reiniciar_correlativo(self, siguiente: int = 1) -> int:
+        """Fija el próximo número de pedido y retorna el que tocaba (reproducir trazas)."""
+        anterior, self._correlativo_pedido = self._correlativo_pedido, siguiente
+        return anterior
+
     def calcular_igv(self, subtotal: float) -> float:
         return round(subtotal * self._config["igv"], 2)
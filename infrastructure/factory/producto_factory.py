@@ -8,10 +8,15 @@ Cada tipo tiene sus propias reglas de validación y post-compra.
 
 El servicio nunca instancia productos directamente:
     ProductoFactory.crear(producto_data)  →  ProductoFisico | ProductoDigital | ...
+
+Tipos nuevos sin tocar este archivo: un plugin (entry point del grupo
+'gamestore.productos' o archivo plugins/producto_<tipo>.py) con una clase
+IProducto. Ver infrastructure/plugins/registro.py.
 """
 
 from domain.interfaces.interfaces import IProducto
 from domain.model.modelos import Producto, Pedido
+from infrastructure.plugins.registro import RegistroPlugins
 
 
 # ════════════════════════════════════════════════════
@@ -44,11 +49,20 @@ class ProductoFisico(IProducto):
                 print(f"     📦 Stock actualizado: {self._producto.nombre} "
                       f"→ {self._producto.stock} unidades restantes.")
 
+    def cancelar(self, pedido: Pedido):
+        for item in pedido.items:
+            if item.producto.id == self._producto.id:
+                self._producto.stock += item.cantidad
+                print(f"     📦 Stock devuelto: {self._producto.nombre} "
+                      f"→ {self._producto.stock} unidades.")
+
 
 class ProductoDigital(IProducto):
     """
     Juego descargable (Steam, PSN, eShop).
     Sin stock físico, entrega instantánea de clave de activación.
+    El máximo de copias por pedido sale de las tablas de límites
+    (limites_por_tipo).
     """
     def __init__(self, producto: Producto):
         self._producto = producto
@@ -57,22 +71,27 @@ class ProductoDigital(IProducto):
         return "DIGITAL"
 
     def validar_compra(self, cantidad: int) -> tuple[bool, str]:
-        if cantidad > 5:
-            return False, "Máximo 5 copias digitales por pedido."
         return True, ""
 
     def post_compra(self, pedido: Pedido):
         import random, string
         clave = ''.join(random.choices(string.ascii_uppercase + string.digits, k=16))
         clave_fmt = '-'.join([clave[i:i+4] for i in range(0, 16, 4)])
+        pedido.claves.setdefault(self._producto.id, []).append(clave_fmt)
         print(f"     🔑 Clave de activación generada: {clave_fmt}")
         print(f"        Juego: {self._producto.nombre} | Plataforma: {self._producto.plataforma}")
 
+    def cancelar(self, pedido: Pedido):
+        for clave in pedido.claves.pop(self._producto.id, []):
+            pedido.claves_revocadas.append(clave)
+            print(f"     🔒 Clave revocada: {clave} ({self._producto.nombre})")
+
 
 class ProductoDLC(IProducto):
     """
     Contenido descargable adicional (expansiones, skins, pases de temporada).
     Requiere juego base instalado.
+    El máximo por pedido (1) sale de las tablas de límites.
     """
     def __init__(self, producto: Producto):
         self._producto = producto
@@ -81,22 +100,24 @@ class ProductoDLC(IProducto):
         return "DLC"
 
     def validar_compra(self, cantidad: int) -> tuple[bool, str]:
-        if cantidad > 1:
-            return False, "Solo se puede comprar 1 unidad de DLC por pedido."
         return True, ""
 
     def post_compra(self, pedido: Pedido):
         print(f"     🎮 DLC activado: {self._producto.nombre}")
         print(f"        Se añadirá automáticamente a tu biblioteca.")
 
+    def cancelar(self, pedido: Pedido):
+        print(f"     🎮 DLC desactivado: {self._producto.nombre}")
+        print(f"        Se retirará de tu biblioteca.")
+
 
 class ProductoSuscripcion(IProducto):
     """
     Suscripción mensual/anual (Game Pass, PS Plus, Nintendo Online).
-    Sin límite de cantidad, se activa por días según plan.
+    Sin límite de cantidad, se activa por días según plan ("1m", "3 meses",
+    "12m"...). Cada unidad suma su duración; el alta y el vencimiento los
+    lleva el registro de suscripciones.
     """
-    _duraciones = {"1 mes": 30, "3 meses": 90, "12 meses": 365}
-
     def __init__(self, producto: Producto):
         self._producto = producto
 
@@ -107,11 +128,16 @@ class ProductoSuscripcion(IProducto):
         return True, ""
 
     def post_compra(self, pedido: Pedido):
+        from infrastructure.suscripciones.registro import duracion_plan
         nombre = self._producto.nombre
-        dias = next((v for k, v in self._duraciones.items() if k in nombre), 30)
+        dias = duracion_plan(nombre)
         print(f"     ⭐ Suscripción activada: {nombre}")
         print(f"        Duración: {dias} días de acceso premium.")
 
+    def cancelar(self, pedido: Pedido):
+        # Los días a descontar los resta el registro de suscripciones
+        print(f"     ⭐ Suscripción cancelada: {self._producto.nombre}")
+
 
 # ════════════════════════════════════════════════════
 # FACTORY — Decide qué clase concreta crear
@@ -129,12 +155,19 @@ class ProductoFactory:
     Y obtiene el manejador correcto sin conocer las clases concretas.
     """
 
-    _registro = {
-        "FISICO":      ProductoFisico,
-        "DIGITAL":     ProductoDigital,
-        "DLC":         ProductoDLC,
-        "SUSCRIPCION": ProductoSuscripcion,
-    }
+    # tipo → clase; los plugins se descubren y cargan en su primer uso
+    _registro = RegistroPlugins(
+        "gamestore.productos", "producto_",
+        {
+            "FISICO":      ProductoFisico,
+            "DIGITAL":     ProductoDigital,
+            "DLC":         ProductoDLC,
+            "SUSCRIPCION": ProductoSuscripcion,
+        },
+        etiquetas={"FISICO": "Físico", "DIGITAL": "Digital", "DLC": "DLC",
+                   "SUSCRIPCION": "Suscripción"},
+        lista_activos="tipos_activos",
+    )
 
     @classmethod
     def crear(cls, producto: Producto) -> IProducto:
@@ -147,16 +180,30 @@ class ProductoFactory:
         Returns:
             IProducto concreto listo para validar y procesar
         """
-        tipo = producto.tipo.upper()
-        if tipo not in cls._registro:
-            disponibles = ", ".join(cls._registro.keys())
-            raise ValueError(
-                f"Tipo '{tipo}' no reconocido. Disponibles: {disponibles}"
-            )
-        clase = cls._registro[tipo]
-        print(f"  🏭 [FACTORY] Tipo '{tipo}' → {clase.__name__}")
+        clase = cls.clase_para(producto.tipo)
+        print(f"  🏭 [FACTORY] Tipo '{producto.tipo}' → {clase.__name__}")
         return clase(producto)
 
+    @classmethod
+    def clase_para(cls, tipo: str) -> type[IProducto]:
+        """
+        Clase manejadora de un tipo, sin instanciarla.
+        Útil para validar muchos productos del mismo tipo (carga por lotes).
+        Con un tipo ya normalizado (Producto.tipo) es un solo acceso al dict.
+        """
+        try:
+            return cls._registro[tipo]
+        except KeyError:
+            disponibles = ", ".join(cls._registro.claves())
+            raise ValueError(
+                f"Tipo '{tipo.upper()}' no reconocido. Disponibles: {disponibles}"
+            ) from None
+
     @classmethod
     def tipos_disponibles(cls) -> list:
-        return list(cls._registro.keys())
+        return cls._registro.claves()
+
+    @classmethod
+    def etiqueta(cls, tipo: str) -> str:
+        """Nombre para mostrar: 'FISICO' → 'Físico'."""
+        return cls._registro.etiqueta(tipo)
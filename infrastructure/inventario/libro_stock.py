@@ -0,0 +1,267 @@
+"""
+CAPA: Infrastructure / Inventario
+===================================
+Libro de movimientos de stock (write-behind).
+
+  registrar()  → el checkout solo escribe el movimiento en un buffer
+                 circular en memoria (O(1), sin E/S) y sigue
+  hilo volcador → cada 'intervalo_s', o antes si se junta un lote, lleva
+                 los movimientos pendientes al diario en una sola
+                 escritura
+  diario       → archivo de solo-anexar, una línea por movimiento:
+                 instante, producto, tipo, cantidad (+/-), saldo, referencia
+  instantáneas → cada 'snapshot_cada' movimientos se anota en un archivo
+                 aparte el saldo de cada producto y la posición del diario
+
+Cada movimiento guarda el saldo resultante, así que el stock de un
+producto en un instante es el saldo de su último movimiento anterior.
+Para reconstruirlo se parte de la última instantánea previa y se lee el
+diario solo desde ahí; al arrancar, igual, desde la última instantánea.
+
+Si el buffer se llena (el disco no da abasto) registrar() espera a que el
+volcador libere espacio: ningún movimiento se pierde.
+
+Si el proceso muere a mitad de un volcado, el diario (o el archivo de
+instantáneas) puede quedar con una última línea cortada. Al arrancar se
+recorta esa línea: sus movimientos se pierden, el resto se recupera.
+
+Tipos de movimiento: la tienda anota VENTA al cobrar (el stock sale recién
+con el pago), CANCELACION al reembolsar y REPOSICION al reponer. RESERVA
+queda disponible para quien aparte stock antes del pago; la tienda no
+aparta stock al agregar al carrito ni al crear el pedido, así que no lo
+anota.
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+VENTA       = "VENTA"
+RESERVA     = "RESERVA"
+REPOSICION  = "REPOSICION"
+CANCELACION = "CANCELACION"
+TIPOS = (VENTA, RESERVA, REPOSICION, CANCELACION)
+
+
+class LibroStock:
+    """Movimientos de stock con buffer circular, volcado por lotes e instantáneas."""
+
+    def __init__(self, archivo: str, capacidad: int = 65_536, lote: int = 512,
+                 intervalo_s: float = 0.2, snapshot_cada: int = 10_000,
+                 reloj: Callable[[], float] = time.time):
+        self._archivo = archivo
+        self._archivo_snap = archivo + ".snap"
+        self._reloj = reloj
+        self._lote = lote
+        self._intervalo = intervalo_s
+        self._snapshot_cada = snapshot_cada
+
+        # Buffer circular: movimiento n en la posición n % capacidad
+        self._buffer: list = [None] * capacidad
+        self._capacidad = capacidad
+        self._escritos = 0          # movimientos registrados
+        self._volcados = 0          # movimientos ya en el diario
+        self._lock = threading.Lock()
+        self._hay_espacio = threading.Condition(self._lock)
+        self._despertar = threading.Event()
+
+        # Estado del diario (solo lo toca el volcador, o __init__)
+        self._saldos: dict[str, int] = {}                   # saldo al último volcado
+        self._instantaneas: list[tuple[float, int, int]] = []   # (instante, pos. diario, pos. snap)
+        self._desde_snapshot = 0
+        self._recuperar()
+
+        self._cerrado = False
+        self._hilo = threading.Thread(target=self._volcar_siempre, daemon=True,
+                                      name="libro-stock")
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    # ── Escritura (camino del checkout) ───────────────────
+
+    def registrar(self, id_producto: str, tipo: str, cantidad: int, saldo: int,
+                  referencia: str = ""):
+        """Anota un movimiento. 'cantidad' con signo; 'saldo' = stock resultante."""
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de movimiento '{tipo}' no válido. Opciones: {', '.join(TIPOS)}")
+        with self._lock:
+            while self._escritos - self._volcados >= self._capacidad:
+                self._despertar.set()
+                self._hay_espacio.wait()
+            # El instante se toma con el lock: el diario queda ordenado por tiempo
+            self._buffer[self._escritos % self._capacidad] = (
+                self._reloj(), id_producto, tipo, cantidad, saldo, referencia)
+            self._escritos += 1
+            pendientes = self._escritos - self._volcados
+        if pendientes >= self._lote:
+            self._despertar.set()
+
+    # ── Volcado (hilo de fondo) ───────────────────────────
+
+    def _volcar_siempre(self):
+        while not self._cerrado:
+            self._despertar.wait(self._intervalo)
+            self._despertar.clear()
+            self._volcar()
+
+    def _volcar(self):
+        with self._lock:
+            desde, hasta = self._volcados, self._escritos
+            if desde == hasta:
+                return
+            cap = self._capacidad
+            lote = [self._buffer[n % cap] for n in range(desde, hasta)]
+        lineas = []
+        for instante, id_producto, tipo, cantidad, saldo, referencia in lote:
+            lineas.append(f"{instante:.6f}\t{id_producto}\t{tipo}\t{cantidad}\t{saldo}\t{referencia}\n")
+            self._saldos[id_producto] = saldo
+        with open(self._archivo, "ab") as f:
+            f.write("".join(lineas).encode())
+            posicion = f.tell()
+        self._desde_snapshot += len(lote)
+        if self._desde_snapshot >= self._snapshot_cada:
+            self._tomar_instantanea(lote[-1][0], posicion)
+        with self._lock:
+            for n in range(desde, hasta):
+                self._buffer[n % cap] = None
+            self._volcados = hasta
+            self._hay_espacio.notify_all()
+
+    def _tomar_instantanea(self, instante: float, posicion: int):
+        with open(self._archivo_snap, "ab") as f:
+            pos_snap = f.tell()
+            f.write(f"{instante:.6f}\t{posicion}\t{json.dumps(self._saldos)}\n".encode())
+        self._instantaneas.append((instante, posicion, pos_snap))
+        self._desde_snapshot = 0
+
+    def esperar(self):
+        """Bloquea hasta que todo lo registrado esté en el diario."""
+        if self._cerrado:
+            self._volcar()
+            return
+        with self._lock:
+            objetivo = self._escritos
+        while True:
+            with self._lock:
+                if self._volcados >= objetivo:
+                    return
+            self._despertar.set()
+            time.sleep(0.001)
+
+    def cerrar(self):
+        if self._cerrado:
+            return
+        self._cerrado = True
+        self._despertar.set()
+        self._hilo.join()
+        self._volcar()
+
+    # ── Lectura ───────────────────────────────────────────
+
+    def saldos(self) -> dict[str, int]:
+        """Stock actual de cada producto con movimientos."""
+        self.esperar()
+        return dict(self._saldos)
+
+    def stock_en(self, id_producto: str, instante: float) -> int | None:
+        """
+        Stock del producto en 'instante'. Antes de su primer movimiento es
+        el stock previo a ese movimiento; None si nunca tuvo movimientos.
+        """
+        self.esperar()
+        i = bisect.bisect_right(self._instantaneas, (instante, float("inf"), 0)) - 1
+        saldo, posicion = None, 0
+        if i >= 0:
+            _, posicion, pos_snap = self._instantaneas[i]
+            saldo = self._leer_instantanea(pos_snap).get(id_producto)
+        for t, id_mov, _, cantidad, saldo_mov, _ in self._leer_diario(posicion):
+            if t > instante and saldo is not None:
+                break
+            if id_mov != id_producto:
+                continue
+            if t > instante:
+                saldo = saldo_mov - cantidad        # stock previo a su primer movimiento
+                break
+            saldo = saldo_mov
+        return saldo
+
+    def movimientos(self, id_producto: str = "", desde: float = 0.0,
+                    hasta: float = float("inf")) -> list[tuple]:
+        """Movimientos del diario en [desde, hasta], opcionalmente de un producto."""
+        self.esperar()
+        i = bisect.bisect_right(self._instantaneas, (desde, -1, 0)) - 1
+        posicion = self._instantaneas[i][1] if i >= 0 else 0
+        resultado = []
+        for mov in self._leer_diario(posicion):
+            if mov[0] > hasta:
+                break
+            if mov[0] >= desde and (not id_producto or mov[1] == id_producto):
+                resultado.append(mov)
+        return resultado
+
+    # ── Diario e instantáneas en disco ────────────────────
+
+    def _leer_diario(self, posicion: int):
+        if not os.path.exists(self._archivo):
+            return
+        with open(self._archivo, "rb") as f:
+            f.seek(posicion)
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    break                       # línea a medio escribir
+                instante, id_producto, tipo, cantidad, saldo, referencia = \
+                    linea.decode().rstrip("\n").split("\t")
+                yield float(instante), id_producto, tipo, int(cantidad), int(saldo), referencia
+
+    def _leer_instantanea(self, pos_snap: int) -> dict[str, int]:
+        with open(self._archivo_snap, "rb") as f:
+            f.seek(pos_snap)
+            return json.loads(f.readline().decode().split("\t", 2)[2])
+
+    def _recuperar(self):
+        """Al arrancar: índice de instantáneas, última de ellas y el resto del diario."""
+        carpeta = os.path.dirname(self._archivo)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        _recortar_linea_incompleta(self._archivo)
+        _recortar_linea_incompleta(self._archivo_snap)
+        posicion = 0
+        if os.path.exists(self._archivo_snap):
+            with open(self._archivo_snap, "rb") as f:
+                pos_snap = 0
+                for linea in f:
+                    instante, pos_diario, _ = linea.split(b"\t", 2)
+                    self._instantaneas.append((float(instante), int(pos_diario), pos_snap))
+                    pos_snap += len(linea)
+            if self._instantaneas:
+                _, posicion, pos_snap = self._instantaneas[-1]
+                self._saldos = self._leer_instantanea(pos_snap)
+        for _, id_producto, _, _, saldo, _ in self._leer_diario(posicion):
+            self._saldos[id_producto] = saldo
+            self._desde_snapshot += 1
+
+
+def _recortar_linea_incompleta(ruta: str, bloque: int = 64 * 1024):
+    """Si el archivo no termina en salto de línea, lo corta tras el último."""
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, "r+b") as f:
+        fin = f.seek(0, os.SEEK_END)
+        if fin == 0:
+            return
+        f.seek(fin - 1)
+        if f.read(1) == b"\n":
+            return
+        posicion = fin
+        while posicion > 0:
+            inicio = max(posicion - bloque, 0)
+            f.seek(inicio)
+            salto = f.read(posicion - inicio).rfind(b"\n")
+            if salto >= 0:
+                f.truncate(inicio + salto + 1)
+                return
+            posicion = inicio
+        f.truncate(0)
@@ -0,0 +1,105 @@
+"""
+CAPA: Infrastructure / Pagos
+==============================
+Tabla de idempotencia para cobros.
+
+Cada intento de cobro se identifica con una clave (pedido + número de
+intento). El primer llamado ejecuta el cobro real; los reintentos con la
+misma clave reciben el resultado guardado sin volver a tocar la pasarela.
+Si dos llamados con la misma clave llegan a la vez, el segundo espera al
+cobro en curso y comparte su resultado.
+
+La tabla está acotada (capacidad máxima) y sus entradas caducan (TTL).
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def clave_pago(id_pedido: str, intento: int = 1) -> str:
+    """Clave de idempotencia para el intento N de cobro de un pedido."""
+    return f"{id_pedido}#{intento}"
+
+
+def clave_reembolso(id_pedido: str) -> str:
+    """Clave de idempotencia del reembolso de un pedido (hay uno solo por pedido)."""
+    return f"{id_pedido}#reembolso"
+
+
+class TablaIdempotencia:
+    """
+    Resultados recientes indexados por clave de idempotencia.
+
+    Las entradas se guardan en orden de inserción, que es también su orden
+    de caducidad: purgar las vencidas y desalojar por capacidad consiste en
+    sacar elementos del frente del OrderedDict.
+    """
+
+    def __init__(self, capacidad: int = 10_000, ttl_segundos: float = 24 * 3600,
+                 reloj: Callable[[], float] = time.monotonic):
+        self._capacidad = capacidad
+        self._ttl = ttl_segundos
+        self._reloj = reloj
+        self._resultados: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._en_vuelo: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def ejecutar(self, clave: str, operacion: Callable[[], T],
+                 guardar: Callable[[T], bool] = lambda _: True) -> T:
+        """
+        Ejecuta operacion() una sola vez por clave.
+        Las excepciones no se guardan: un reintento vuelve a ejecutarla.
+        Tampoco los resultados para los que guardar(resultado) es False
+        (p. ej. cuando ninguna pasarela llegó a intentar el cobro).
+        """
+        with self._lock:
+            self._purgar()
+            guardado = self._resultados.get(clave)
+            if guardado is not None:
+                return guardado[1]
+            futuro = self._en_vuelo.get(clave)
+            lider = futuro is None
+            if lider:
+                futuro = self._en_vuelo[clave] = Future()
+
+        if not lider:
+            return futuro.result()
+
+        try:
+            resultado = operacion()
+        except BaseException as e:
+            with self._lock:
+                del self._en_vuelo[clave]
+            futuro.set_exception(e)
+            raise
+
+        with self._lock:
+            if guardar(resultado):
+                self._resultados[clave] = (self._reloj() + self._ttl, resultado)
+                while len(self._resultados) > self._capacidad:
+                    self._resultados.popitem(last=False)
+            del self._en_vuelo[clave]
+        futuro.set_result(resultado)
+        return resultado
+
+    def consultar(self, clave: str):
+        """Resultado guardado para la clave, o None si no existe o caducó."""
+        with self._lock:
+            self._purgar()
+            guardado = self._resultados.get(clave)
+            return guardado[1] if guardado is not None else None
+
+    def __len__(self) -> int:
+        return len(self._resultados)
+
+    def _purgar(self):
+        ahora = self._reloj()
+        while self._resultados:
+            vence, _ = next(iter(self._resultados.values()))
+            if vence > ahora:
+                break
+            self._resultados.popitem(last=False)
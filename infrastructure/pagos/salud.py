@@ -0,0 +1,252 @@
+"""
+CAPA: Infrastructure / Pagos
+==============================
+Salud de las pasarelas de pago.
+
+  SaludPasarela    → ventana corta de errores (circuit breaker CERRADO /
+                     ABIERTO / SEMIABIERTO) y ventana larga de latencias
+                     (percentiles estables para el ruteo y el hedging)
+  MonitorPasarelas → una SaludPasarela por pasarela, orden de ruteo
+                     según salud y latencia, y llamadas "cubiertas"
+                     (hedged) para operaciones de solo lectura
+
+Un circuito ABIERTO rechaza llamadas al instante en lugar de dejar que el
+checkout espere a una pasarela caída. Tras el enfriamiento pasa a
+SEMIABIERTO y deja pasar una única llamada de prueba: si sale bien, el
+circuito se cierra; si falla, vuelve a abrirse.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+CERRADO     = "CERRADO"
+ABIERTO     = "ABIERTO"
+SEMIABIERTO = "SEMIABIERTO"
+
+
+class CircuitoAbierto(Exception):
+    """La pasarela no acepta llamadas mientras su circuito esté abierto."""
+
+
+class SaludPasarela:
+    """Ventana deslizante de resultados y circuit breaker de una pasarela."""
+
+    def __init__(self, nombre: str, ventana: int = 20, umbral_error: float = 0.5,
+                 minimo_llamadas: int = 5, enfriamiento_s: float = 30.0,
+                 lento_s: float = 2.0, ventana_latencia: int = 200,
+                 reloj: Callable[[], float] = time.monotonic):
+        self.nombre = nombre
+        self._muestras: deque[tuple[bool, float]] = deque(maxlen=ventana)
+        self._latencias: deque[float] = deque(maxlen=ventana_latencia)
+        self._umbral_error = umbral_error
+        self._minimo = minimo_llamadas
+        self._enfriamiento = enfriamiento_s
+        self._lento = lento_s
+        self._reloj = reloj
+        self._estado = CERRADO
+        self._abierto_desde = 0.0
+        self._sonda_en_curso = False
+        self._lock = threading.Lock()
+
+    # ── Estado ────────────────────────────────────────────
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            if self._estado == ABIERTO and self._enfriado():
+                return SEMIABIERTO
+            return self._estado
+
+    def disponible(self) -> bool:
+        """True si una llamada sería aceptada ahora (sin reservarla)."""
+        with self._lock:
+            if self._estado == CERRADO:
+                return True
+            if self._estado == ABIERTO:
+                return self._enfriado()
+            return not self._sonda_en_curso
+
+    def permitir(self) -> bool:
+        """Reserva la llamada. En SEMIABIERTO solo pasa una sonda a la vez."""
+        with self._lock:
+            if self._estado == CERRADO:
+                return True
+            if self._estado == ABIERTO:
+                if not self._enfriado():
+                    return False
+                self._estado = SEMIABIERTO
+            if self._sonda_en_curso:
+                return False
+            self._sonda_en_curso = True
+            return True
+
+    def registrar(self, ok: bool, latencia: float):
+        ok = ok and latencia < self._lento
+        with self._lock:
+            self._muestras.append((ok, latencia))
+            self._latencias.append(latencia)
+            if self._estado == SEMIABIERTO:
+                self._sonda_en_curso = False
+                if ok:
+                    self._estado = CERRADO
+                    self._muestras.clear()
+                else:
+                    self._abrir()
+            elif (self._estado == CERRADO and len(self._muestras) >= self._minimo
+                  and self._tasa_error() >= self._umbral_error):
+                self._abrir()
+
+    # ── Métricas ──────────────────────────────────────────
+
+    def tasa_error(self) -> float:
+        with self._lock:
+            return self._tasa_error()
+
+    def latencia(self, percentil: float = 0.5) -> float:
+        with self._lock:
+            if not self._latencias:
+                return 0.0
+            valores = sorted(self._latencias)
+        return valores[min(int(len(valores) * percentil), len(valores) - 1)]
+
+    def resumen(self) -> dict:
+        return {
+            "pasarela":   self.nombre,
+            "estado":     self.estado,
+            "tasa_error": round(self.tasa_error(), 3),
+            "p50_ms":     round(self.latencia(0.50) * 1000, 1),
+            "p95_ms":     round(self.latencia(0.95) * 1000, 1),
+        }
+
+    # ── Internos (con el lock tomado) ─────────────────────
+
+    def _tasa_error(self) -> float:
+        if not self._muestras:
+            return 0.0
+        return sum(1 for ok, _ in self._muestras if not ok) / len(self._muestras)
+
+    def _enfriado(self) -> bool:
+        return self._reloj() - self._abierto_desde >= self._enfriamiento
+
+    def _abrir(self):
+        self._estado = ABIERTO
+        self._abierto_desde = self._reloj()
+
+
+class MonitorPasarelas:
+    """
+    Registro de salud de todas las pasarelas.
+
+    Las claves son el nombre de la pasarela ("PAYPAL") o, para operaciones
+    que se miden aparte, "PAYPAL/verificar".
+    """
+
+    def __init__(self, hilos_cobertura: int = 8, **parametros):
+        self._parametros = parametros
+        self._salud: dict[str, SaludPasarela] = {}
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self._hilos = hilos_cobertura
+
+    def salud(self, clave: str) -> SaludPasarela:
+        salud = self._salud.get(clave)
+        if salud is None:
+            with self._lock:
+                salud = self._salud.setdefault(
+                    clave, SaludPasarela(clave, **self._parametros))
+        return salud
+
+    def resumen(self) -> list[dict]:
+        return [s.resumen() for s in self._salud.values()]
+
+    # ── Ruteo ─────────────────────────────────────────────
+
+    def ordenar(self, preferida: str, activas: list[str], fallback: bool) -> list[str]:
+        """
+        Pasarelas a intentar, en orden. La elegida por el usuario va primero
+        si está disponible; con fallback se añaden las demás activas y
+        disponibles, de menor a mayor tasa de error y latencia mediana.
+        """
+        candidatas = [preferida] if self.salud(preferida).disponible() else []
+        if fallback:
+            otras = [p for p in activas
+                     if p != preferida and self.salud(p).disponible()]
+            otras.sort(key=lambda p: (self.salud(p).tasa_error(),
+                                      self.salud(p).latencia(0.5)))
+            candidatas.extend(otras)
+        return candidatas
+
+    # ── Llamadas medidas ──────────────────────────────────
+
+    def medir(self, clave: str, llamada: Callable[[], T]) -> T:
+        """
+        Ejecuta la llamada a través del circuito de la pasarela y registra
+        su latencia. Una excepción cuenta como error y se propaga.
+        """
+        salud = self.salud(clave)
+        if not salud.permitir():
+            raise CircuitoAbierto(f"Circuito abierto para {clave}.")
+        inicio = time.perf_counter()
+        try:
+            resultado = llamada()
+        except Exception:
+            salud.registrar(False, time.perf_counter() - inicio)
+            raise
+        salud.registrar(True, time.perf_counter() - inicio)
+        return resultado
+
+    def cubierta(self, clave: str, llamada: Callable[[], T],
+                 percentil: float = 0.9, retraso_minimo_s: float = 0.005) -> T:
+        """
+        Llamada "hedged": si la primera no respondió tras el percentil de
+        latencia observado (p90 por defecto), lanza una segunda idéntica y
+        usa la que termine antes. Solo para operaciones idempotentes de
+        lectura (verificar).
+
+        Ambas pasan por el circuito: con el circuito abierto no se llama, y
+        la copia solo sale si el circuito la admite (no en SEMIABIERTO, donde
+        la primera ya es la sonda). Una pasarela con problemas no recibe el
+        doble de tráfico.
+        """
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self._hilos,
+                                                    thread_name_prefix="cobertura")
+        salud = self.salud(clave)
+        if not salud.permitir():
+            raise CircuitoAbierto(f"Circuito abierto para {clave}.")
+        retraso = max(salud.latencia(percentil), retraso_minimo_s)
+
+        def _medida():
+            inicio = time.perf_counter()
+            try:
+                resultado = llamada()
+            except Exception:
+                salud.registrar(False, time.perf_counter() - inicio)
+                raise
+            salud.registrar(True, time.perf_counter() - inicio)
+            return resultado
+
+        primero = self._pool.submit(_medida)
+        hechos, _ = wait([primero], timeout=retraso)
+        if hechos and primero.exception() is None:
+            return primero.result()
+
+        # Lenta o fallida: se lanza una copia (si el circuito la admite) y
+        # gana la primera respuesta válida
+        pendientes = {primero} - hechos
+        if salud.permitir():
+            pendientes.add(self._pool.submit(_medida))
+        error = primero.exception() if hechos else None
+        while pendientes:
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                if futuro.exception() is None:
+                    return futuro.result()
+                error = futuro.exception()
+        raise error
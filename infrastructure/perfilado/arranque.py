@@ -0,0 +1,116 @@
+"""
+CAPA: Infrastructure / Perfilado
+==================================
+Perfilador de arranque: cuánto cuesta importar cada módulo y cuánto
+cuesta cada paso de inicialización.
+
+  perfil = PerfilArranque()
+  perfil.instalar()                     # antes de importar la app
+  with perfil.etapa("TiendaService()"):
+      svc = TiendaService()
+  print(perfil.reporte())
+
+Los imports se miden con un MetaPathFinder que envuelve el loader de
+cada módulo: se obtiene el tiempo total (incluye sus imports) y el
+tiempo propio (excluye los módulos que importó a su vez).
+"""
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+
+
+class _LoaderCronometrado:
+    """Delegado del loader real que mide exec_module()."""
+
+    def __init__(self, loader, nombre: str, perfil: "PerfilArranque"):
+        self._loader = loader
+        self._nombre = nombre
+        self._perfil = perfil
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, modulo):
+        # Mientras se ejecuta, los loaders reales siguen disponibles para
+        # linecache, pkgutil, etc.
+        modulo.__loader__ = self._loader
+        self._perfil._entrar(self._nombre)
+        try:
+            self._loader.exec_module(modulo)
+        finally:
+            self._perfil._salir()
+
+    def __getattr__(self, nombre):
+        return getattr(self._loader, nombre)
+
+
+class _Cronometro(MetaPathFinder):
+    def __init__(self, perfil: "PerfilArranque"):
+        self._perfil = perfil
+
+    def find_spec(self, nombre, path, target=None):
+        for buscador in sys.meta_path:
+            if buscador is self or not hasattr(buscador, "find_spec"):
+                continue
+            spec = buscador.find_spec(nombre, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _LoaderCronometrado(spec.loader, nombre, self._perfil)
+                return spec
+        return None
+
+
+class PerfilArranque:
+    """Acumula tiempos de import por módulo y tiempos por etapa."""
+
+    def __init__(self):
+        self.imports: dict[str, tuple[float, float]] = {}   # nombre → (total, propio)
+        self.etapas:  list[tuple[str, float, int]] = []     # (nombre, segundos, módulos nuevos)
+        self._pila: list[list] = []                         # [nombre, inicio, hijos]
+        self._cronometro = _Cronometro(self)
+
+    def instalar(self):
+        if self._cronometro not in sys.meta_path:
+            sys.meta_path.insert(0, self._cronometro)
+
+    def desinstalar(self):
+        if self._cronometro in sys.meta_path:
+            sys.meta_path.remove(self._cronometro)
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        antes = len(sys.modules)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append((nombre, time.perf_counter() - inicio,
+                                len(sys.modules) - antes))
+
+    def _entrar(self, nombre: str):
+        self._pila.append([nombre, time.perf_counter(), 0.0])
+
+    def _salir(self):
+        nombre, inicio, hijos = self._pila.pop()
+        total = time.perf_counter() - inicio
+        self.imports[nombre] = (total, total - hijos)
+        if self._pila:
+            self._pila[-1][2] += total
+
+    def reporte(self, limite: int = 25) -> str:
+        lineas = [f"\n  ⏱️  Perfil de arranque",
+                  f"  {'Etapa':<40} {'ms':>9} {'módulos':>8}",
+                  f"  {'─'*59}"]
+        for nombre, seg, nuevos in self.etapas:
+            lineas.append(f"  {nombre:<40} {seg*1000:>9.2f} {nuevos:>8}")
+        total = sum(seg for _, seg, _ in self.etapas)
+        lineas.append(f"  {'─'*59}")
+        lineas.append(f"  {'TOTAL':<40} {total*1000:>9.2f} {len(self.imports):>8}")
+
+        lineas += [f"\n  {'Módulo (por tiempo propio)':<40} {'propio ms':>9} {'total ms':>9}",
+                   f"  {'─'*60}"]
+        ordenados = sorted(self.imports.items(), key=lambda kv: kv[1][1], reverse=True)
+        for nombre, (total_mod, propio) in ordenados[:limite]:
+            lineas.append(f"  {nombre:<40} {propio*1000:>9.2f} {total_mod*1000:>9.2f}")
+        return "\n".join(lineas)
@@ -0,0 +1,231 @@
+"""
+CAPA: Infrastructure / Perfilado
+==================================
+Reproducción determinista de una traza grabada (ver traza.py) y
+perfil por etapa.
+
+  rep = Reproductor("datos/traza.gst", velocidad=10, semilla=7, perfilar=True)
+  rep.ejecutar()
+  print(rep.reporte())
+
+  - Tienda nueva: catálogo de demo, libro de stock y suscripciones en una
+    carpeta temporal, correlativo de pedidos desde 1.
+  - Azar con semilla: random.seed() antes de empezar (ids de PayPal,
+    Culqi y Yape, claves digitales) y pasarelas sustitutas de
+    simulados.py con esa misma semilla. Dos corridas con la misma traza
+    y la misma semilla dan la misma huella.
+  - velocidad: 1 = ritmo original, 10 = diez veces más rápido,
+    0 = sin esperas entre llamadas.
+  - perfilar: un cProfile y las medidas de tracemalloc por etapa (cada
+    método de TiendaService), solo mientras corre esa etapa.
+
+La salida por consola de la tienda se descarta (pero se paga: imprimir
+es parte del costo real de cada llamada).
+"""
+import contextlib
+import hashlib
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+from domain.model.modelos import Sesion
+from infrastructure.perfilado.traza import Evento, SIN_PEDIDO, resultado_exitoso, leer_traza
+
+
+@dataclass
+class Etapa:
+    """Medidas de un método de TiendaService a lo largo de la reproducción."""
+    nombre: str
+    tiempos: list[float] = field(default_factory=list)
+    original: float = 0.0           # segundos sumados en la grabación
+    ok: int = 0
+    pico_bytes: int = 0             # mayor memoria extra durante una llamada
+    neto_bytes: int = 0             # memoria que quedó retenida, sumada
+    perfil: object = None           # cProfile.Profile
+
+
+class Reproductor:
+    """Vuelve a ejecutar una traza sobre una tienda nueva y mide cada etapa."""
+
+    def __init__(self, ruta: str, velocidad: float = 0.0, semilla: int = 0,
+                 latencia_s: float = 0.0, perfilar: bool = False):
+        self._ruta = ruta
+        self._velocidad = velocidad
+        self._semilla = semilla
+        self._latencia = latencia_s
+        self._perfilar = perfilar
+        self.etapas: dict[str, Etapa] = {}
+        self.eventos = 0
+        self.omitidos = 0
+        self.segundos = 0.0
+        self.duracion_original = 0.0
+        self._huella = hashlib.sha1()
+
+    @property
+    def huella(self) -> str:
+        """Resumen de los resultados: igual en dos corridas con la misma semilla."""
+        return self._huella.hexdigest()[:16]
+
+    def ejecutar(self):
+        from application.services.tienda_service import TiendaService
+        from infrastructure.adapters.simulados import pasarela_con_fallos
+        from infrastructure.config.configuracion import ConfiguracionTienda
+
+        eventos = list(leer_traza(self._ruta))
+        if eventos:
+            self.duracion_original = eventos[-1].inicio + eventos[-1].duracion
+        config = ConfiguracionTienda()
+        claves = ("stock_archivo", "suscripciones_archivo")
+        guardado = {clave: config.obtener(clave) for clave in claves}
+
+        with tempfile.TemporaryDirectory() as carpeta, open(os.devnull, "w") as nulo:
+            for clave in claves:
+                config.establecer(clave, os.path.join(carpeta, os.path.basename(guardado[clave])))
+            siguiente = config.reiniciar_correlativo(1)
+            try:
+                with contextlib.redirect_stdout(nulo):
+                    random.seed(self._semilla)
+                    svc = TiendaService()
+                    for nombre in ("PAYPAL", "CULQI", "YAPE"):
+                        svc.usar_pasarela(nombre, pasarela_con_fallos(
+                            nombre, latencia_s=self._latencia, semilla=self._semilla))
+                    self._reproducir(svc, eventos)
+                    svc.cerrar()
+            finally:
+                config.reiniciar_correlativo(siguiente)
+                for clave, valor in guardado.items():
+                    config.establecer(clave, valor)
+
+    def _reproducir(self, svc, eventos: list[Evento]):
+        if self._perfilar:
+            import cProfile
+            import tracemalloc
+            tracemalloc.start()
+        sesiones: dict[int, Sesion] = {}
+        pedidos: dict = {}
+        inicio = time.perf_counter()
+        for evento in eventos:
+            if self._velocidad:
+                espera = inicio + evento.inicio / self._velocidad - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+            llamada = self._llamada(svc, evento, sesiones, pedidos)
+            if llamada is None:
+                self.omitidos += 1
+                continue
+            funcion, args = llamada
+            etapa = self.etapas.get(evento.metodo)
+            if etapa is None:
+                etapa = self.etapas[evento.metodo] = Etapa(evento.metodo)
+                if self._perfilar:
+                    etapa.perfil = cProfile.Profile()
+
+            if self._perfilar:
+                tracemalloc.reset_peak()
+                antes = tracemalloc.get_traced_memory()[0]
+                t = time.perf_counter()
+                etapa.perfil.enable()
+                resultado = funcion(*args)
+                etapa.perfil.disable()
+                t = time.perf_counter() - t
+                actual, pico = tracemalloc.get_traced_memory()
+                etapa.pico_bytes = max(etapa.pico_bytes, pico - antes)
+                etapa.neto_bytes += actual - antes
+            else:
+                t = time.perf_counter()
+                resultado = funcion(*args)
+                t = time.perf_counter() - t
+
+            etapa.tiempos.append(t)
+            etapa.original += evento.duracion
+            self.eventos += 1
+            etapa.ok += resultado_exitoso(evento.metodo, resultado)
+            if evento.metodo == "crear_pedido":
+                pedidos[evento.args[0]] = resultado
+            self._huella.update(_resumen(evento, resultado, pedidos).encode())
+        self.segundos = time.perf_counter() - inicio
+        if self._perfilar:
+            tracemalloc.stop()
+
+    @staticmethod
+    def _llamada(svc, evento: Evento, sesiones: dict, pedidos: dict) -> tuple | None:
+        """(método, argumentos) equivalentes sobre la tienda nueva, o None si no se puede repetir."""
+        metodo, args = evento.metodo, evento.args
+        if metodo == "usar_sesion":
+            sesion = sesiones.get(args[0])
+            if sesion is None:
+                sesion = sesiones[args[0]] = Sesion(cliente=args[1])
+            args = (sesion,)
+        elif metodo in ("procesar_pago", "cancelar_pedido"):
+            pedido = pedidos.get(args[0]) if args[0] != SIN_PEDIDO else None
+            if pedido is None:
+                return None                 # su crear_pedido falló al grabar
+            args = (pedido,) + args[1:]
+            if metodo == "procesar_pago":
+                # La sesión cuyo carrito se vació al cobrar
+                args = args[:3] + (sesiones.setdefault(args[3], Sesion()),)
+        elif metodo == "crear_pedido":
+            args = ()
+        return getattr(svc, metodo), args
+
+    # ── Reporte ───────────────────────────────────────────
+
+    def reporte(self, funciones: int = 8) -> str:
+        lineas = [f"\n  🔁 Reproducción de {os.path.basename(self._ruta)}",
+                  f"  {self.eventos} llamadas ({self.omitidos} omitidas) en "
+                  f"{self.segundos * 1000:.1f} ms | grabación: {self.duracion_original * 1000:.1f} ms"
+                  f" | velocidad: {self._velocidad or 'sin esperas'} | semilla: {self._semilla}"
+                  f" | huella: {self.huella}",
+                  f"\n  {'Etapa':<20} {'n':>6} {'ok':>6} {'p50 ms':>8} {'p95 ms':>8} "
+                  f"{'máx ms':>8} {'total ms':>9} {'original':>9} {'pico KB':>8}",
+                  f"  {'─'*88}"]
+        etapas = sorted(self.etapas.values(), key=lambda e: sum(e.tiempos), reverse=True)
+        for e in etapas:
+            tiempos = sorted(e.tiempos)
+            lineas.append(
+                f"  {e.nombre:<20} {len(tiempos):>6} {e.ok:>6} "
+                f"{_percentil(tiempos, .5) * 1e3:>8.3f} {_percentil(tiempos, .95) * 1e3:>8.3f} "
+                f"{tiempos[-1] * 1e3:>8.3f} {sum(tiempos) * 1e3:>9.1f} {e.original * 1e3:>9.1f} "
+                f"{e.pico_bytes / 1024:>8.1f}")
+        if self._perfilar:
+            lineas.append("\n  Camino caliente por etapa (tiempo propio; con perfilador activo)")
+            for e in etapas:
+                lineas.append(f"\n  ▸ {e.nombre}  (memoria retenida: {e.neto_bytes / 1024:.1f} KB)")
+                lineas.append(f"    {'propio ms':>10} {'acum. ms':>10} {'llamadas':>9}  función")
+                lineas.extend(_funciones_calientes(e.perfil, funciones))
+        return "\n".join(lineas)
+
+
+def _resumen(evento: Evento, resultado, pedidos: dict) -> str:
+    if evento.metodo == "crear_pedido":
+        return f"{evento.metodo}|{resultado.id if resultado else '-'}"
+    if evento.metodo in ("procesar_pago", "cancelar_pedido"):
+        pedido = pedidos[evento.args[0]]
+        return (f"{evento.metodo}|{resultado}|{pedido.estado}|{pedido.id_transaccion}|"
+                f"{pedido.id_reembolso}|{sorted(pedido.claves.items())}")
+    return f"{evento.metodo}|{resultado}"
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    return valores[min(int(len(valores) * p), len(valores) - 1)] if valores else 0.0
+
+
+def _funciones_calientes(perfil, n: int) -> list[str]:
+    import pstats
+    estadisticas = pstats.Stats(perfil).stats
+    raiz = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    filas = sorted(estadisticas.items(), key=lambda kv: kv[1][2], reverse=True)[:n + 1]
+    lineas = []
+    for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in filas:
+        if "_lsprof" in funcion:
+            continue                                         # enable/disable del propio perfilador
+        if archivo.startswith(raiz):
+            lugar = f"{os.path.relpath(archivo, raiz)}:{linea}({funcion})"
+        elif archivo == "~":
+            lugar = funcion                                  # función en C
+        else:
+            lugar = f"{os.path.basename(archivo)}:{linea}({funcion})"
+        lineas.append(f"    {propio * 1e3:>10.2f} {acumulado * 1e3:>10.2f} {llamadas:>9}  {lugar}")
+    return lineas[:n]
@@ -0,0 +1,252 @@
+"""
+CAPA: Infrastructure / Perfilado
+==================================
+Captura de tráfico: graba las llamadas a TiendaService (cliente, carrito,
+pedido, pago, cancelación) con su instante y su duración en una traza
+binaria compacta, para reproducirlas después (ver reproduccion.py).
+
+  grabador = GrabadorTraza("datos/traza.gst")
+  grabador.instalar(svc)          # envuelve los métodos de esta instancia
+  ...                             # menú o API atendiendo tráfico real
+  grabador.cerrar()
+
+Formato (little-endian, struct):
+  cabecera   b"GSTRAZA" + versión (1 byte)
+  registro   op (B) | inicio µs desde el comienzo (Q) | duración µs (I) |
+             ok (B) | argumentos del op
+  textos     nombres, ids y métodos se escriben una sola vez (op TEXTO,
+             largo H + UTF-8) y después se citan por índice (I)
+  pedidos    se citan por su orden de creación en la traza (I), no por id:
+             al reproducir, los ids de pedido pueden ser otros
+  sesiones   se citan por número (I) junto con su cliente (t): la API crea
+             cada sesión ya con su cliente, sin pasar por set_cliente
+
+Sin grabador instalado no hay ningún costo: los métodos originales no
+se tocan.
+"""
+import struct
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+from domain.model.modelos import Pedido, Sesion
+
+
+MAGIA = b"GSTRAZA\x03"
+SIN_PEDIDO = 0xFFFFFFFF
+
+# op → (nombre del método de TiendaService, formato de sus argumentos)
+#   t = índice de texto (I), i = entero (i), p = pedido (I), s = sesión (I),
+#   L = lote: cantidad (H) y luego pares (t, i)
+OPS = {
+    1: ("usar_sesion",        "st"),
+    2: ("set_cliente",        "t"),
+    3: ("agregar_al_carrito", "ti"),
+    4: ("agregar_lote",       "L"),
+    5: ("vaciar_carrito",     ""),
+    6: ("crear_pedido",       "p"),
+    7: ("procesar_pago",      "ptis"),
+    8: ("cancelar_pedido",    "pt"),
+}
+_OP_TEXTO = 0
+_CODIGOS = {nombre: op for op, (nombre, _) in OPS.items()}
+
+_CABECERA = struct.Struct("<BQIB")
+_LARGO_TEXTO = struct.Struct("<H")
+_FORMATOS = {"t": struct.Struct("<I"), "i": struct.Struct("<i"),
+             "p": struct.Struct("<I"), "s": struct.Struct("<I"), "L": struct.Struct("<H")}
+
+
+@dataclass(slots=True)
+class Evento:
+    """Una llamada grabada. Los pedidos y sesiones son números de la traza."""
+    metodo: str
+    inicio: float           # segundos desde el comienzo de la grabación
+    duracion: float         # segundos que tardó la llamada original
+    ok: bool
+    args: tuple
+
+
+# ════════════════════════════════════════════════════
+# ESCRITURA
+# ════════════════════════════════════════════════════
+
+class GrabadorTraza:
+    """Envuelve los métodos de un TiendaService y escribe cada llamada en la traza."""
+
+    def __init__(self, archivo: str):
+        self._archivo: BinaryIO = open(archivo, "wb")
+        self._archivo.write(MAGIA)
+        self._textos: dict[str, int] = {}
+        self._pedidos: dict[str, int] = {}      # id de pedido → número en la traza
+        # id(sesion) → número en la traza, solo de las sesiones vivas: al
+        # liberarse una sesión su id() sale y puede reusarlo otra
+        self._sesiones: dict[int, int] = {}
+        self._siguiente_sesion = 0
+        self._inicio = time.perf_counter()
+        self._lock = threading.Lock()
+        self._svc = None
+        self.eventos = 0
+
+    def instalar(self, svc):
+        self._svc = svc
+        for nombre in _CODIGOS:
+            original = getattr(svc, nombre)
+            setattr(svc, nombre, self._envolver(nombre, original))
+
+    def desinstalar(self):
+        if self._svc is not None:
+            for nombre in _CODIGOS:
+                self._svc.__dict__.pop(nombre, None)
+            self._svc = None
+
+    def cerrar(self):
+        self.desinstalar()
+        with self._lock:
+            if not self._archivo.closed:
+                self._archivo.close()
+
+    def _envolver(self, nombre: str, original):
+        codigo = _CODIGOS[nombre]
+
+        def grabado(*args, **kwargs):
+            inicio = time.perf_counter()
+            resultado, ok = None, False
+            try:
+                resultado = original(*args, **kwargs)
+                ok = resultado_exitoso(nombre, resultado)
+                return resultado
+            finally:
+                # Una excepción también se graba (ok = 0) y sigue su curso
+                self._anotar(codigo, inicio, time.perf_counter() - inicio, ok,
+                             args, kwargs, resultado)
+
+        grabado.__wrapped__ = original
+        return grabado
+
+    def _anotar(self, codigo: int, inicio: float, duracion: float, ok: bool,
+                args: tuple, kwargs: dict, resultado):
+        nombre, formato = OPS[codigo]
+        with self._lock:
+            if self._archivo.closed:
+                return
+            valores = self._valores(nombre, args, kwargs, resultado)
+            cuerpo = [_CABECERA.pack(codigo, int((inicio - self._inicio) * 1e6),
+                                     min(int(duracion * 1e6), 0xFFFFFFFF), ok)]
+            for tipo, valor in zip(formato, valores):
+                if tipo == "t":
+                    cuerpo.append(_FORMATOS["t"].pack(self._texto(valor)))
+                elif tipo == "L":
+                    cuerpo.append(_FORMATOS["L"].pack(len(valor)))
+                    for id_producto, cantidad in valor:
+                        cuerpo.append(_FORMATOS["t"].pack(self._texto(str(id_producto))))
+                        cuerpo.append(_FORMATOS["i"].pack(int(cantidad)))
+                else:
+                    cuerpo.append(_FORMATOS[tipo].pack(valor))
+            self._archivo.write(b"".join(cuerpo))
+            self.eventos += 1
+
+    def _valores(self, nombre: str, args: tuple, kwargs: dict, resultado) -> tuple:
+        """Argumentos de la llamada en el formato de la traza."""
+        a = list(args) + list(kwargs.values())
+        if nombre == "usar_sesion":
+            return (self._sesion(a[0]), a[0].cliente)
+        if nombre == "set_cliente":
+            return (a[0],)
+        if nombre == "agregar_al_carrito":
+            return (a[0], a[1])
+        if nombre == "agregar_lote":
+            return (list(a[0]),)
+        if nombre == "vaciar_carrito":
+            return ()
+        if nombre == "crear_pedido":
+            if resultado is None:
+                return (SIN_PEDIDO,)
+            numero = self._pedidos[resultado.id] = len(self._pedidos)
+            return (numero,)
+        pedido: Pedido = a[0]
+        numero = self._pedidos.get(pedido.id, SIN_PEDIDO)
+        if nombre == "procesar_pago":
+            # La API pasa la sesión cuyo carrito se vacía; el menú usa la activa
+            sesion = kwargs.get("sesion") or (args[3] if len(args) > 3 else self._svc.sesion_actual())
+            metodo = args[1] if len(args) > 1 else kwargs.get("metodo", "")
+            intento = args[2] if len(args) > 2 else kwargs.get("intento", 1)
+            return (numero, metodo, intento, self._sesion(sesion))
+        return (numero, a[1] if len(a) > 1 else "")          # cancelar_pedido
+
+    def _sesion(self, sesion: Sesion) -> int:
+        clave = id(sesion)
+        numero = self._sesiones.get(clave)
+        if numero is None:
+            numero = self._sesiones[clave] = self._siguiente_sesion
+            self._siguiente_sesion += 1
+            weakref.finalize(sesion, self._sesiones.pop, clave, None)
+        return numero
+
+    def _texto(self, texto: str) -> int:
+        indice = self._textos.get(texto)
+        if indice is None:
+            indice = self._textos[texto] = len(self._textos)
+            datos = texto.encode()
+            self._archivo.write(bytes((_OP_TEXTO,)) + _LARGO_TEXTO.pack(len(datos)) + datos)
+        return indice
+
+
+def resultado_exitoso(nombre: str, resultado) -> bool:
+    if nombre == "crear_pedido":
+        return resultado is not None
+    if isinstance(resultado, tuple):
+        return bool(resultado[0])          # (ok, mensaje...)
+    return True
+
+
+# ════════════════════════════════════════════════════
+# LECTURA
+# ════════════════════════════════════════════════════
+
+def leer_traza(ruta: str) -> Iterator[Evento]:
+    """Recorre los eventos de una traza en el orden en que se grabaron."""
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    if not datos.startswith(MAGIA):
+        raise ValueError(f"'{ruta}' no es una traza de GameStore (o es de otra versión).")
+    textos: list[str] = []
+    pos = len(MAGIA)
+    fin = len(datos)
+    try:
+        yield from _eventos(datos, pos, fin, textos)
+    except (struct.error, IndexError):
+        return                                      # último registro cortado (proceso interrumpido)
+
+
+def _eventos(datos: bytes, pos: int, fin: int, textos: list[str]) -> Iterator[Evento]:
+    while pos < fin:
+        codigo = datos[pos]
+        if codigo == _OP_TEXTO:
+            (largo,) = _LARGO_TEXTO.unpack_from(datos, pos + 1)
+            pos += 1 + _LARGO_TEXTO.size
+            textos.append(datos[pos:pos + largo].decode())
+            pos += largo
+            continue
+        _, inicio, duracion, ok = _CABECERA.unpack_from(datos, pos)
+        pos += _CABECERA.size
+        nombre, formato = OPS[codigo]
+        args = []
+        for tipo in formato:
+            estructura = _FORMATOS[tipo]
+            (valor,) = estructura.unpack_from(datos, pos)
+            pos += estructura.size
+            if tipo == "t":
+                valor = textos[valor]
+            elif tipo == "L":
+                lote = []
+                for _ in range(valor):
+                    (indice,) = _FORMATOS["t"].unpack_from(datos, pos)
+                    (cantidad,) = _FORMATOS["i"].unpack_from(datos, pos + _FORMATOS["t"].size)
+                    pos += _FORMATOS["t"].size + _FORMATOS["i"].size
+                    lote.append((textos[indice], cantidad))
+                valor = lote
+            args.append(valor)
+        yield Evento(nombre, inicio / 1e6, duracion / 1e6, bool(ok), tuple(args))
@@ -0,0 +1,284 @@
+"""
+CAPA: Infrastructure / Suscripciones
+======================================
+Registro de suscripciones activas.
+
+  - Una Suscripcion por (cliente, plan) con su inicio y su fin. Comprar
+    el mismo plan antes de que venza alarga el fin (se apila).
+  - Dos ruedas de temporizadores: vencimientos (en 'fin') y recordatorios
+    de renovación ('aviso_dias' antes). revisar() avanza ambas y devuelve
+    lo que toca notificar. Las entradas que quedaron viejas al apilar una
+    compra se reconocen al disparar (su 'fin' ya no coincide) y se ignoran.
+  - Lo disparado queda además pendiente por (cliente, plan) hasta que
+    ese cliente lo recoge con avisos_de(): quien avanza las ruedas no se
+    lleva los avisos de los demás. Renovar o cancelar descarta el aviso.
+  - Persistencia local en un diario TSV de solo-anexar: una fila por
+    activación, recordatorio enviado y vencimiento. Al arrancar se
+    reproduce el diario; si creció mucho más que el número de
+    suscripciones vigentes se reescribe compactado.
+"""
+import csv
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+from domain.model.modelos import Suscripcion
+from infrastructure.suscripciones.rueda import RuedaTemporizadores
+
+
+DIA = 24 * 3600
+
+# "Game Pass Ultimate 1m", "PS Plus Extra 12m", "Nintendo Online 3 meses", "1 año"
+_PATRON_DURACION = re.compile(r"(\d+)\s*(m|mes|meses|a|año|años)\b", re.IGNORECASE)
+
+
+def duracion_plan(nombre: str) -> int:
+    """Días de acceso según el nombre del plan (30 si no indica duración)."""
+    encontrado = _PATRON_DURACION.search(nombre)
+    if encontrado is None:
+        return 30
+    cantidad, unidad = int(encontrado.group(1)), encontrado.group(2).lower()
+    meses = cantidad if unidad.startswith("m") else cantidad * 12
+    return 365 * (meses // 12) + 30 * (meses % 12)
+
+
+def fecha(instante: float) -> str:
+    return datetime.fromtimestamp(instante).strftime("%d/%m/%Y")
+
+
+class RegistroSuscripciones:
+    """Suscripciones vigentes, su calendario de eventos y su diario en disco."""
+
+    def __init__(self, archivo: str | None = None, aviso_dias: float = 3,
+                 resolucion_s: float = 60.0, reloj: Callable[[], float] = time.time):
+        self._archivo = archivo
+        self._aviso = aviso_dias * DIA
+        self._reloj = reloj
+        self._vigentes: dict[tuple[str, str], Suscripcion] = {}
+        self._planes: set[str] = set()                  # ids de plan vistos
+        # (cliente, plan) → suscripción con un aviso sin recoger; si ya no es
+        # la vigente de esa clave, el aviso es su vencimiento
+        self._pendientes: dict[tuple[str, str], Suscripcion] = {}
+        ahora = reloj()
+        self._vencimientos = RuedaTemporizadores(resolucion_s, ahora)
+        self._avisos       = RuedaTemporizadores(resolucion_s, ahora)
+        self._diario = None
+        self._escritor = None
+        self._filas_diario = 0
+        self._lock = threading.Lock()
+        if archivo and os.path.exists(archivo):
+            self._cargar()
+
+    def __len__(self) -> int:
+        return len(self._vigentes)
+
+    # ── Altas ─────────────────────────────────────────────
+
+    def activar(self, cliente: str, id_producto: str, dias: int,
+                ahora: float | None = None) -> Suscripcion:
+        """Activa el plan o, si sigue vigente, suma 'dias' a su fin."""
+        ahora = self._reloj() if ahora is None else ahora
+        with self._lock:
+            clave = (cliente, id_producto)
+            sub = self._vigentes.get(clave)
+            if sub is not None and sub.fin > ahora:
+                sub.fin += dias * DIA
+                sub.avisada = False
+            else:
+                sub = self._vigentes[clave] = Suscripcion(cliente, id_producto,
+                                                          ahora, ahora + dias * DIA)
+                self._planes.add(id_producto)
+            self._pendientes.pop(clave, None)          # renovada: el aviso ya no aplica
+            self._programar(sub)
+            self._anotar("A", sub)
+        return sub
+
+    def revocar(self, cliente: str, id_producto: str, dias: int,
+                ahora: float | None = None) -> Suscripcion | None:
+        """
+        Resta 'dias' al fin del plan (pedido cancelado). Si ya no le queda
+        acceso la suscripción se retira. Retorna la suscripción que sigue
+        vigente, o None.
+        """
+        ahora = self._reloj() if ahora is None else ahora
+        with self._lock:
+            clave = (cliente, id_producto)
+            sub = self._vigentes.get(clave)
+            if sub is None:
+                return None
+            fin = sub.fin - dias * DIA
+            self._pendientes.pop(clave, None)
+            if fin <= ahora or fin <= sub.inicio:
+                del self._vigentes[clave]
+                self._anotar("V", sub)
+                return None
+            # La entrada anterior de las ruedas queda vieja y se ignora al disparar
+            sub.fin, sub.avisada = fin, False
+            self._programar(sub)
+            self._anotar("A", sub)
+        return sub
+
+    def consultar(self, cliente: str, ahora: float | None = None) -> list[Suscripcion]:
+        """Suscripciones vigentes del cliente (aunque revisar() no haya retirado las vencidas)."""
+        ahora = self._reloj() if ahora is None else ahora
+        return [sub for id_plan in self._planes
+                if (sub := self._vigentes.get((cliente, id_plan))) is not None and sub.fin > ahora]
+
+    # ── Calendario ────────────────────────────────────────
+
+    def revisar(self, ahora: float | None = None) -> tuple[list[Suscripcion], list[Suscripcion]]:
+        """
+        Avanza el calendario hasta 'ahora'.
+        Retorna (vencidas, por_vencer): las vencidas dejan de estar vigentes
+        y las por vencer quedan marcadas como avisadas.
+        """
+        ahora = self._reloj() if ahora is None else ahora
+        vencidas, por_vencer = [], []
+        with self._lock:
+            for sub in self._vencimientos.avanzar(ahora):
+                clave = (sub.cliente, sub.id_producto)
+                if sub.fin <= ahora and self._vigentes.get(clave) is sub:
+                    del self._vigentes[clave]
+                    vencidas.append(sub)
+                    self._anotar("V", sub)
+                    self._pendientes[clave] = sub
+            for sub in self._avisos.avanzar(ahora):
+                clave = (sub.cliente, sub.id_producto)
+                if (not sub.avisada and sub.fin - self._aviso <= ahora < sub.fin
+                        and self._vigentes.get(clave) is sub):
+                    sub.avisada = True
+                    por_vencer.append(sub)
+                    self._anotar("R", sub)
+                    self._pendientes[clave] = sub
+        return vencidas, por_vencer
+
+    def avisos_de(self, cliente: str, ahora: float | None = None
+                  ) -> tuple[list[Suscripcion], list[Suscripcion]]:
+        """
+        Avanza el calendario y entrega (vencidas, por_vencer) del cliente
+        disparadas desde que las recogió por última vez, sea quien sea el
+        que avanzó las ruedas.
+        """
+        self.revisar(ahora)
+        vencidas, por_vencer = [], []
+        with self._lock:
+            for id_plan in self._planes:
+                clave = (cliente, id_plan)
+                sub = self._pendientes.pop(clave, None)
+                if sub is not None:
+                    (por_vencer if self._vigentes.get(clave) is sub else vencidas).append(sub)
+        return vencidas, por_vencer
+
+    def _programar(self, sub: Suscripcion):
+        self._vencimientos.programar(sub.fin, sub)
+        if self._aviso:
+            self._avisos.programar(sub.fin - self._aviso, sub)
+
+    # ── Persistencia ──────────────────────────────────────
+
+    def _anotar(self, evento: str, sub: Suscripcion):
+        if not self._archivo:
+            return
+        if self._diario is None:
+            self._abrir_diario()
+        self._escritor.writerow((evento, sub.cliente, sub.id_producto,
+                                 f"{sub.inicio:.3f}", f"{sub.fin:.3f}"))
+        self._diario.flush()
+        self._filas_diario += 1
+
+    def _abrir_diario(self):
+        carpeta = os.path.dirname(self._archivo)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self._diario = open(self._archivo, "a", newline="", encoding="utf-8")
+        self._escritor = csv.writer(self._diario, delimiter="\t")
+
+    def _cargar(self):
+        """
+        Reproduce el diario: la última activación de cada (cliente, plan) manda.
+        Una última fila cortada (el proceso murió a mitad de escribirla) se
+        recorta del archivo, y las filas mal formadas se saltan.
+        """
+        _recortar_fila_incompleta(self._archivo)
+        vigentes = self._vigentes
+        filas = 0
+        with open(self._archivo, newline="", encoding="utf-8") as f:
+            for fila in csv.reader(f, delimiter="\t"):
+                try:
+                    evento, cliente, id_producto, inicio, fin = fila
+                    inicio, fin = float(inicio), float(fin)
+                except ValueError:
+                    continue
+                filas += 1
+                clave = (cliente, id_producto)
+                if evento == "A":
+                    sub = vigentes.get(clave)
+                    if sub is not None and sub.inicio == inicio:
+                        sub.fin, sub.avisada = fin, False
+                    else:
+                        vigentes[clave] = Suscripcion(cliente, id_producto, inicio, fin)
+                        self._planes.add(id_producto)
+                elif evento == "R":
+                    sub = vigentes.get(clave)
+                    if sub is not None and sub.fin == fin:
+                        sub.avisada = True
+                elif evento == "V":
+                    sub = vigentes.get(clave)
+                    if sub is not None and sub.fin == fin:
+                        del vigentes[clave]
+        # Las vencidas durante la parada salen en el próximo revisar()
+        for sub in vigentes.values():
+            self._programar(sub)
+        self._filas_diario = filas
+        if filas > 2 * len(vigentes) + 1000:
+            self.compactar()
+
+    def compactar(self):
+        """Reescribe el diario con una fila por suscripción vigente."""
+        if not self._archivo:
+            return
+        with self._lock:
+            if self._diario is not None:
+                self._diario.close()
+                self._diario = None
+            temporal = self._archivo + ".tmp"
+            carpeta = os.path.dirname(self._archivo)
+            if carpeta:
+                os.makedirs(carpeta, exist_ok=True)
+            with open(temporal, "w", newline="", encoding="utf-8") as f:
+                escritor = csv.writer(f, delimiter="\t")
+                filas = 0
+                for sub in self._vigentes.values():
+                    fila = (sub.cliente, sub.id_producto, f"{sub.inicio:.3f}", f"{sub.fin:.3f}")
+                    escritor.writerow(("A",) + fila)
+                    filas += 1
+                    if sub.avisada:
+                        escritor.writerow(("R",) + fila)
+                        filas += 1
+            os.replace(temporal, self._archivo)
+            self._filas_diario = filas
+
+    def cerrar(self):
+        with self._lock:
+            if self._diario is not None:
+                self._diario.close()
+                self._diario = None
+
+
+def _recortar_fila_incompleta(ruta: str):
+    """Si el diario no termina en salto de línea, lo corta tras el último."""
+    with open(ruta, "r+b") as f:
+        fin = f.seek(0, os.SEEK_END)
+        if fin == 0:
+            return
+        f.seek(fin - 1)
+        if f.read(1) == b"\n":
+            return
+        # Una fila ocupa menos de 1 KB: basta mirar el final
+        inicio = max(fin - 4096, 0)
+        f.seek(inicio)
+        salto = f.read().rfind(b"\n")
+        f.truncate(inicio + salto + 1 if salto >= 0 else 0)
@@ -0,0 +1,64 @@
+"""
+CAPA: Infrastructure / Suscripciones
+======================================
+Rueda de temporizadores para vencimientos y recordatorios.
+
+El tiempo se divide en ranuras de 'resolucion_s' segundos y cada elemento
+se guarda en la lista de la ranura de su instante:
+
+  programar → O(1): un append en la lista de la ranura
+  avanzar   → recorre solo las ranuras ya terminadas y entrega todos sus
+              elementos de una vez
+
+Las ranuras viven en un dict por índice, así que las vacías no ocupan
+memoria y el horizonte no tiene límite (un plan de 12 meses cabe igual
+que uno de 1). No hay cancelación: si un elemento se reprograma, el que
+quedó en la ranura vieja se descarta al disparar (lo decide el dueño).
+"""
+
+
+class RuedaTemporizadores:
+    """Ranuras de tiempo con los elementos que vencen en cada una."""
+
+    def __init__(self, resolucion_s: float = 60.0, inicio: float = 0.0):
+        self._resolucion = resolucion_s
+        self._ranuras: dict[int, list] = {}
+        self._cursor = int(inicio // resolucion_s)     # primera ranura sin disparar
+        self._pendientes = 0
+
+    def __len__(self) -> int:
+        return self._pendientes
+
+    def programar(self, instante: float, elemento):
+        ranura = int(instante // self._resolucion)
+        if ranura < self._cursor:
+            ranura = self._cursor       # ya pasó: sale en el próximo avance
+        lista = self._ranuras.get(ranura)
+        if lista is None:
+            self._ranuras[ranura] = [elemento]
+        else:
+            lista.append(elemento)
+        self._pendientes += 1
+
+    def avanzar(self, hasta: float) -> list:
+        """
+        Saca los elementos de todas las ranuras que terminaron antes de
+        'hasta'. Un elemento sale como mucho 'resolucion_s' tarde.
+        """
+        limite = int(hasta // self._resolucion)
+        if limite <= self._cursor:
+            return []
+        # Tras un salto largo (p. ej. al arrancar) hay más ranuras por
+        # recorrer que ranuras ocupadas: se visitan solo las ocupadas.
+        if limite - self._cursor <= len(self._ranuras):
+            indices = range(self._cursor, limite)
+        else:
+            indices = sorted(r for r in self._ranuras if r < limite)
+        vencidos = []
+        for r in indices:
+            lista = self._ranuras.pop(r, None)
+            if lista:
+                vencidos.extend(lista)
+        self._cursor = limite
+        self._pendientes -= len(vencidos)
+        return vencidos
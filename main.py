@@ -1,15 +1,33 @@
 """
 GameStore — Punto de entrada
+
+  python main.py                   → menú interactivo en consola
+  python main.py --api [PUERTO]    → servidor HTTP/JSON (por defecto 8080)
+  python main.py --perfil-arranque → tiempos de import e inicialización
+  python main.py --grabar [ARCHIVO] [--api [PUERTO]]
+                                   → menú o API grabando el tráfico en una
+                                     traza (por defecto datos/traza.gst)
+  python main.py --reproducir ARCHIVO [--velocidad X] [--semilla N] [--perfil]
+                                   → reproduce la traza y muestra tiempos por
+                                     etapa (y caminos calientes con --perfil)
+
+Las capas se importan dentro de main(), solo las que el modo elegido usa.
 """
 import sys, os
 sys.path.insert(0, os.path.dirname(__file__))
 
-from infrastructure.config.configuracion import ConfiguracionTienda
-from application.services.tienda_service import TiendaService
-from presentation.menu import menu_principal
-
 
 def main():
+    if "--perfil-arranque" in sys.argv:
+        perfil_arranque()
+        return
+    if "--reproducir" in sys.argv:
+        reproducir()
+        return
+
+    from infrastructure.config.configuracion import ConfiguracionTienda
+    from application.services.tienda_service import TiendaService
+
     print("\n" + "═" * 58)
     print("  🎮 Iniciando GameStore Perú")
     print("═" * 58)
@@ -24,7 +42,88 @@ def main():
     print(f"  💳 Pagos   : {config.obtener('pasarelas_activas')}")
 
     svc = TiendaService()
-    menu_principal(svc, config)
+
+    grabador = None
+    if "--grabar" in sys.argv:
+        from infrastructure.perfilado.traza import GrabadorTraza
+        archivo = _valor("--grabar", "datos/traza.gst")
+        os.makedirs(os.path.dirname(archivo) or ".", exist_ok=True)
+        grabador = GrabadorTraza(archivo)
+        grabador.instalar(svc)
+        print(f"  ⏺️  Grabando tráfico en: {archivo}")
+
+    try:
+        if "--api" in sys.argv:
+            from presentation.api_http import servir
+            resto = sys.argv[sys.argv.index("--api") + 1:]
+            puerto = int(resto[0]) if resto and resto[0].isdigit() else 8080
+            servir(svc, puerto=puerto)
+            return
+
+        from presentation.menu import menu_principal
+        menu_principal(svc, config)
+    finally:
+        if grabador is not None:
+            grabador.cerrar()
+            print(f"\n  ⏹️  Traza cerrada: {grabador.eventos} llamadas grabadas.")
+
+
+def _valor(opcion: str, defecto=None):
+    """Argumento que sigue a 'opcion' en la línea de comandos (si no es otra opción)."""
+    resto = sys.argv[sys.argv.index(opcion) + 1:] if opcion in sys.argv else []
+    return resto[0] if resto and not resto[0].startswith("--") else defecto
+
+
+def reproducir():
+    """Reproduce una traza grabada con --grabar y muestra el perfil por etapa."""
+    from infrastructure.perfilado.reproduccion import Reproductor
+
+    archivo = _valor("--reproducir")
+    if archivo is None or not os.path.isfile(archivo):
+        print("  ❌ Indica una traza existente: --reproducir ARCHIVO")
+        return
+    reproductor = Reproductor(archivo,
+                              velocidad=float(_valor("--velocidad", 0)),
+                              semilla=int(_valor("--semilla", 0)),
+                              perfilar="--perfil" in sys.argv)
+    reproductor.ejecutar()
+    print(reproductor.reporte())
+
+
+def perfil_arranque():
+    """Mide cada import y cada primer uso que la app difiere (catálogo, Factory, pagos)."""
+    import contextlib, io
+    from infrastructure.perfilado.arranque import PerfilArranque
+
+    perfil = PerfilArranque()
+    perfil.instalar()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with perfil.etapa("import configuracion"):
+            from infrastructure.config.configuracion import ConfiguracionTienda
+        with perfil.etapa("import tienda_service"):
+            from application.services.tienda_service import TiendaService
+        with perfil.etapa("import menu"):
+            import presentation.menu  # noqa: F401
+        with perfil.etapa("ConfiguracionTienda()"):
+            ConfiguracionTienda()
+        with perfil.etapa("TiendaService()"):
+            svc = TiendaService()
+        with perfil.etapa("1er acceso al catálogo"):
+            svc.listar_catalogo()
+        with perfil.etapa("1er agregar_al_carrito (Factory)"):
+            svc.set_cliente("perfil")
+            svc.agregar_al_carrito("G001", 1)
+        with perfil.etapa("import adapters + CULQI simulada"):
+            # Sustituta de simulados.py: perfilar no cobra en la pasarela real
+            from infrastructure.adapters.simulados import pasarela_con_fallos
+            svc.usar_pasarela("CULQI", pasarela_con_fallos("CULQI", semilla=0))
+        with perfil.etapa("1er procesar_pago (pagos)"):
+            svc.procesar_pago(svc.crear_pedido(), "CULQI")
+        with perfil.etapa("descubrir plugins (1er menú)"):
+            svc.tipos_producto()
+            svc.pasarelas_disponibles()
+    perfil.desinstalar()
+    print(perfil.reporte())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,507 @@
+"""
+CAPA: Presentation / API HTTP
+===============================
+Servidor HTTP/JSON sobre TiendaService usando solo asyncio (stdlib).
+Es otra "cara" de la aplicación, igual que el menú de consola:
+solo habla con TiendaService.
+
+Rutas:
+  GET    /catalogo?tipo=&pagina=&por_pagina=  → catálogo paginado (ETag, gzip)
+  GET    /productos/{id}
+  POST   /sesiones            {"cliente": "Ana", "email": "", "telefono": ""} → {"sesion": "..."}
+  GET    /carrito             (cabecera X-Sesion)
+  POST   /carrito             {"id": "G001", "cantidad": 1}
+  DELETE /carrito
+  POST   /carrito/lote        {"lineas": [{"id": "G001", "cantidad": 1}, ...]}
+  POST   /pedidos             → crea el pedido con el carrito de la sesión
+  POST   /pedidos/{id}/pago   {"metodo": "YAPE", "intento": 1}
+  POST   /pedidos/{id}/cancelacion  {"motivo": ""} → reembolsa y deshace la entrega
+  GET    /historial           → pedidos pagados del cliente de la sesión
+  GET    /suscripciones       → suscripciones vigentes del cliente de la sesión
+                                 y sus avisos (vence pronto / vencida) sin recoger
+
+Detalles HTTP:
+  - Keep-alive por defecto en HTTP/1.1 y pipelining: las peticiones de una
+    conexión se leen y responden en orden.
+  - gzip para respuestas grandes si el cliente envía Accept-Encoding: gzip.
+  - ETag / If-None-Match en el catálogo → 304 sin cuerpo si no cambió.
+"""
+import asyncio
+import contextlib
+import functools
+import gzip
+import hashlib
+import json
+import os
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+
+from application.services.tienda_service import TiendaService
+from domain.model.modelos import Producto, Pedido, Sesion
+from infrastructure.config.configuracion import ConfiguracionTienda
+
+
+MIN_BYTES_GZIP = 1024
+MAX_BYTES_CABECERA = 16 * 1024
+MAX_BYTES_CUERPO = 1024 * 1024
+POR_PAGINA_DEFECTO = 50
+MAX_PAGINAS_CACHE = 256          # páginas de catálogo serializadas que se guardan
+
+_RAZONES = {
+    200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified",
+    400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 411: "Length Required",
+    413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class ErrorHttp(Exception):
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+class Respuesta:
+    def __init__(self, estado: int = 200, cuerpo: bytes = b"",
+                 cabeceras: dict | None = None):
+        self.estado = estado
+        self.cuerpo = cuerpo
+        self.cabeceras = cabeceras or {}
+
+
+def _json(estado: int, datos, cabeceras: dict | None = None) -> Respuesta:
+    cuerpo = json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode()
+    cab = {"Content-Type": "application/json; charset=utf-8"}
+    cab.update(cabeceras or {})
+    return Respuesta(estado, cuerpo, cab)
+
+
+def _producto_a_dict(p: Producto) -> dict:
+    return {"id": p.id, "nombre": p.nombre, "genero": p.genero,
+            "plataforma": p.plataforma, "precio": p.precio,
+            "tipo": p.tipo, "stock": p.stock}
+
+
+def _pedido_a_dict(p: Pedido) -> dict:
+    return {
+        "id": p.id, "cliente": p.cliente, "estado": p.estado,
+        "metodo_pago": p.metodo_pago, "id_transaccion": p.id_transaccion,
+        "id_reembolso": p.id_reembolso,
+        "fecha": p.fecha.isoformat(), "total": round(p.total, 2),
+        "items": [{"id": i.producto.id, "nombre": i.producto.nombre,
+                   "cantidad": i.cantidad, "precio_unitario": i.precio_unitario,
+                   "subtotal": round(i.subtotal, 2)} for i in p.items],
+    }
+
+
+def _iso(instante: float) -> str:
+    return datetime.fromtimestamp(instante).isoformat(timespec="seconds")
+
+
+class ApiTienda:
+    """
+    Enrutador de la API. Guarda las sesiones (cliente + carrito + pedidos
+    creados) y la caché de páginas del catálogo.
+
+    TiendaService no es concurrente: las operaciones que activan una sesión
+    se serializan con un asyncio.Lock. El cobro y el reembolso (las llamadas
+    lentas, hacia la pasarela) se ejecutan en un hilo y fuera del lock: no
+    usan la sesión activa.
+
+    Las sesiones caducan tras api_sesion_ttl_s sin uso (con sus pedidos
+    creados: los pagados siguen en la tienda) y, si hay más de
+    api_sesiones_max, se desalojan las de uso más antiguo.
+    """
+
+    def __init__(self, svc: TiendaService):
+        config = ConfiguracionTienda()
+        self._svc = svc
+        # token → sesión, en orden de último uso (purgar = sacar del frente)
+        self._sesiones:   OrderedDict[str, Sesion] = OrderedDict()
+        self._pedidos:    dict[str, dict[str, Pedido]] = {}
+        self._ultimo_uso: dict[str, float] = {}
+        self._ttl_sesion = config.obtener("api_sesion_ttl_s")
+        self._max_sesiones = config.obtener("api_sesiones_max")
+        self._lock = asyncio.Lock()
+        # (tipo, pagina, por_pagina) → (huella, etag, cuerpo, cuerpo_gzip),
+        # en orden de último uso: pasado MAX_PAGINAS_CACHE sale la más antigua
+        self._cache_catalogo: OrderedDict[tuple, tuple] = OrderedDict()
+
+    # ── Despacho ──────────────────────────────────────────
+
+    async def atender(self, metodo: str, ruta: str, cabeceras: dict,
+                      cuerpo: bytes) -> Respuesta:
+        url = urlsplit(ruta)
+        partes = [p for p in url.path.split("/") if p]
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if partes == ["catalogo"]:
+            self._exigir(metodo, "GET")
+            return self._catalogo(query, cabeceras)
+        if len(partes) == 2 and partes[0] == "productos":
+            self._exigir(metodo, "GET")
+            return self._producto(partes[1])
+        if partes == ["sesiones"]:
+            self._exigir(metodo, "POST")
+            return self._crear_sesion(self._leer_json(cuerpo))
+
+        token = cabeceras.get("x-sesion", "")
+        if partes == ["carrito"]:
+            self._exigir(metodo, "GET", "POST", "DELETE")
+            async with self._lock:
+                return self._carrito(metodo, token, cuerpo)
+        if partes == ["carrito", "lote"]:
+            self._exigir(metodo, "POST")
+            async with self._lock:
+                return self._carrito_lote(token, self._leer_json(cuerpo))
+        if partes == ["pedidos"]:
+            self._exigir(metodo, "POST")
+            async with self._lock:
+                return self._crear_pedido(token)
+        if len(partes) == 3 and partes[0] == "pedidos" and partes[2] == "pago":
+            self._exigir(metodo, "POST")
+            return await self._pagar(token, partes[1], self._leer_json(cuerpo))
+        if len(partes) == 3 and partes[0] == "pedidos" and partes[2] == "cancelacion":
+            self._exigir(metodo, "POST")
+            return await self._cancelar(token, partes[1], self._leer_json(cuerpo))
+        if partes == ["historial"]:
+            self._exigir(metodo, "GET")
+            return self._historial(token)
+        if partes == ["suscripciones"]:
+            self._exigir(metodo, "GET")
+            return self._suscripciones(token)
+        raise ErrorHttp(404, f"Ruta '{url.path}' no existe.")
+
+    @staticmethod
+    def _exigir(metodo: str, *permitidos: str):
+        if metodo not in permitidos:
+            raise ErrorHttp(405, f"Método {metodo} no permitido.")
+
+    @staticmethod
+    def _leer_json(cuerpo: bytes) -> dict:
+        if not cuerpo:
+            return {}
+        try:
+            datos = json.loads(cuerpo)
+        except ValueError:
+            raise ErrorHttp(400, "El cuerpo no es JSON válido.")
+        if not isinstance(datos, dict):
+            raise ErrorHttp(400, "Se esperaba un objeto JSON.")
+        return datos
+
+    def _sesion(self, token: str) -> Sesion:
+        self._purgar_sesiones()
+        sesion = self._sesiones.get(token)
+        if sesion is None:
+            raise ErrorHttp(401, "Falta la cabecera X-Sesion o la sesión no existe (o caducó).")
+        self._sesiones.move_to_end(token)
+        self._ultimo_uso[token] = time.monotonic()
+        return sesion
+
+    def _purgar_sesiones(self):
+        """Quita del frente las sesiones vencidas y las que pasan del máximo."""
+        vence = time.monotonic() - self._ttl_sesion
+        while self._sesiones:
+            token = next(iter(self._sesiones))
+            if self._ultimo_uso[token] > vence and len(self._sesiones) <= self._max_sesiones:
+                break
+            del self._sesiones[token], self._pedidos[token], self._ultimo_uso[token]
+
+    # ── Catálogo ──────────────────────────────────────────
+
+    def _catalogo(self, query: dict, cabeceras: dict) -> Respuesta:
+        tipo = query.get("tipo", "").strip().upper()
+        if tipo and tipo not in {t for t, _ in self._svc.tipos_producto()}:
+            raise ErrorHttp(400, f"Tipo de producto desconocido: '{tipo}'.")
+        try:
+            pagina     = max(int(query.get("pagina", 0)), 0)
+            por_pagina = min(max(int(query.get("por_pagina", POR_PAGINA_DEFECTO)), 1), 1000)
+        except ValueError:
+            raise ErrorHttp(400, "pagina y por_pagina deben ser enteros.")
+
+        productos = self._svc.listar_catalogo(tipo)
+        inicio = pagina * por_pagina
+        visibles = productos[inicio:inicio + por_pagina]
+        # La huella cubre solo lo que se serializa: si no cambió, el cuerpo,
+        # su ETag y su versión comprimida se reutilizan tal cual.
+        huella = (len(productos),
+                  tuple((p.id, p.nombre, p.genero, p.plataforma, p.precio, p.tipo, p.stock)
+                        for p in visibles))
+
+        clave = (tipo, pagina, por_pagina)
+        cache = self._cache_catalogo.get(clave)
+        if cache is None or cache[0] != huella:
+            cuerpo = json.dumps({
+                "pagina": pagina, "por_pagina": por_pagina, "total": len(productos),
+                "productos": [_producto_a_dict(p) for p in visibles],
+            }, ensure_ascii=False, separators=(",", ":")).encode()
+            etag = '"' + hashlib.sha1(cuerpo).hexdigest() + '"'
+            comprimido = gzip.compress(cuerpo, 5) if len(cuerpo) >= MIN_BYTES_GZIP else None
+            cache = (huella, etag, cuerpo, comprimido)
+            self._cache_catalogo[clave] = cache
+            if len(self._cache_catalogo) > MAX_PAGINAS_CACHE:
+                self._cache_catalogo.popitem(last=False)
+        self._cache_catalogo.move_to_end(clave)
+
+        _, etag, cuerpo, comprimido = cache
+        cab = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag in cabeceras.get("if-none-match", ""):
+            return Respuesta(304, b"", cab)
+        cab["Content-Type"] = "application/json; charset=utf-8"
+        if comprimido is not None and "gzip" in cabeceras.get("accept-encoding", ""):
+            cab["Content-Encoding"] = "gzip"
+            return Respuesta(200, comprimido, cab)
+        return Respuesta(200, cuerpo, cab)
+
+    def _producto(self, id_producto: str) -> Respuesta:
+        producto = self._svc.buscar_producto(id_producto)
+        if producto is None:
+            raise ErrorHttp(404, f"Producto '{id_producto}' no encontrado.")
+        return _json(200, _producto_a_dict(producto))
+
+    # ── Sesión y carrito ──────────────────────────────────
+
+    def _crear_sesion(self, datos: dict) -> Respuesta:
+        cliente = str(datos.get("cliente", "")).strip()
+        if not cliente:
+            raise ErrorHttp(400, "El campo 'cliente' es obligatorio.")
+        try:
+            registrado = self._svc.registrar_cliente(
+                cliente, str(datos.get("email", "")), str(datos.get("telefono", "")))
+        except ValueError as e:
+            raise ErrorHttp(409, str(e))
+        token = secrets.token_hex(16)
+        self._sesiones[token]   = Sesion(cliente=registrado.nombre)
+        self._pedidos[token]    = {}
+        self._ultimo_uso[token] = time.monotonic()
+        self._purgar_sesiones()
+        return _json(201, {"sesion": token, "cliente": registrado.nombre,
+                           "id_cliente": registrado.id})
+
+    def _carrito(self, metodo: str, token: str, cuerpo: bytes) -> Respuesta:
+        self._svc.usar_sesion(self._sesion(token))
+        if metodo == "POST":
+            datos = self._leer_json(cuerpo)
+            try:
+                cantidad = int(datos.get("cantidad", 1))
+            except (TypeError, ValueError):
+                raise ErrorHttp(400, "'cantidad' debe ser un entero.")
+            if cantidad <= 0:
+                raise ErrorHttp(400, "'cantidad' debe ser mayor que 0.")
+            ok, msg = self._svc.agregar_al_carrito(str(datos.get("id", "")), cantidad)
+            if not ok:
+                raise ErrorHttp(409, msg)
+        elif metodo == "DELETE":
+            self._svc.vaciar_carrito()
+        return self._contenido_carrito()
+
+    def _carrito_lote(self, token: str, datos: dict) -> Respuesta:
+        self._svc.usar_sesion(self._sesion(token))
+        lineas = datos.get("lineas")
+        if not isinstance(lineas, list):
+            raise ErrorHttp(400, "'lineas' debe ser una lista.")
+        try:
+            pares = [(str(l["id"]), int(l.get("cantidad", 1))) for l in lineas]
+        except (TypeError, KeyError, ValueError, AttributeError):
+            raise ErrorHttp(400, "Cada línea necesita 'id' y una 'cantidad' entera.")
+        ok, resultados = self._svc.agregar_lote(pares)
+        detalle = [{"id": i, "ok": v, "mensaje": m} for i, v, m in resultados]
+        if not ok:
+            return _json(409, {"error": "El lote no se aplicó.", "lineas": detalle})
+        return _json(200, {"lineas": detalle, **self._datos_carrito()})
+
+    def _contenido_carrito(self) -> Respuesta:
+        return _json(200, self._datos_carrito())
+
+    def _datos_carrito(self) -> dict:
+        items = self._svc.ver_carrito()
+        return {
+            "items": [{"id": i.producto.id, "nombre": i.producto.nombre,
+                       "cantidad": i.cantidad, "precio_unitario": i.precio_unitario,
+                       "subtotal": round(i.subtotal, 2)} for i in items],
+            "total": round(self._svc.total_carrito(), 2),
+            "sugerencias": [{"id": p.id, "nombre": p.nombre, "precio": p.precio}
+                            for p in self._svc.sugerencias()],
+        }
+
+    # ── Pedidos y pago ────────────────────────────────────
+
+    def _crear_pedido(self, token: str) -> Respuesta:
+        self._svc.usar_sesion(self._sesion(token))
+        pedido = self._svc.crear_pedido()
+        if pedido is None:
+            raise ErrorHttp(409, "El carrito está vacío.")
+        self._pedidos[token][pedido.id] = pedido
+        return _json(201, _pedido_a_dict(pedido))
+
+    async def _pagar(self, token: str, id_pedido: str, datos: dict) -> Respuesta:
+        sesion = self._sesion(token)
+        pedido = self._pedidos[token].get(id_pedido)
+        if pedido is None:
+            raise ErrorHttp(404, f"Pedido '{id_pedido}' no encontrado.")
+        metodo = str(datos.get("metodo", ""))
+        try:
+            intento = int(datos.get("intento", 1))
+        except (TypeError, ValueError):
+            raise ErrorHttp(400, "'intento' debe ser un entero.")
+
+        # Sin el lock: el cobro recibe su sesión y no toca la activa, así que
+        # un pago lento no frena el carrito ni los pedidos de otras sesiones
+        loop = asyncio.get_running_loop()
+        ok, msg = await loop.run_in_executor(
+            None, functools.partial(self._svc.procesar_pago, pedido, metodo, intento,
+                                    sesion=sesion))
+        if not ok:
+            raise ErrorHttp(409, msg)
+        # El pedido se conserva: un reintento del cliente (mismo intento)
+        # recibe el mismo resultado sin un segundo cobro.
+        return _json(200, {"mensaje": msg, "pedido": _pedido_a_dict(pedido)})
+
+    async def _cancelar(self, token: str, id_pedido: str, datos: dict) -> Respuesta:
+        sesion = self._sesion(token)
+        pedido = self._pedidos[token].get(id_pedido) or self._svc.buscar_pedido(id_pedido)
+        if pedido is None or pedido.cliente != sesion.cliente:
+            raise ErrorHttp(404, f"Pedido '{id_pedido}' no encontrado.")
+        motivo = str(datos.get("motivo", ""))
+
+        # El reembolso llama a la pasarela: igual que el cobro, en un hilo y
+        # sin el lock (cancelar_pedido no usa la sesión activa)
+        loop = asyncio.get_running_loop()
+        ok, msg = await loop.run_in_executor(
+            None, self._svc.cancelar_pedido, pedido, motivo)
+        if not ok:
+            raise ErrorHttp(409, msg)
+        return _json(200, {"mensaje": msg, "pedido": _pedido_a_dict(pedido)})
+
+    def _historial(self, token: str) -> Respuesta:
+        cliente = self._sesion(token).cliente
+        pedidos = self._svc.pedidos_de(cliente)
+        return _json(200, {"pedidos": [_pedido_a_dict(p) for p in pedidos]})
+
+    def _suscripciones(self, token: str) -> Respuesta:
+        cliente = self._sesion(token).cliente
+        vencidas, por_vencer = self._svc.avisos_suscripcion(cliente)
+        return _json(200, {
+            "suscripciones": [{"id": s.id_producto, "inicio": _iso(s.inicio), "fin": _iso(s.fin)}
+                              for s in self._svc.suscripciones_de(cliente)],
+            "avisos": [{"id": s.id_producto, "evento": evento, "fin": _iso(s.fin)}
+                       for evento, subs in (("por_vencer", por_vencer), ("vencida", vencidas))
+                       for s in subs],
+        })
+
+
+# ════════════════════════════════════════════════════
+# PROTOCOLO — lectura de peticiones y escritura de respuestas
+# ════════════════════════════════════════════════════
+
+def _serializar(resp: Respuesta, mantener_viva: bool) -> bytes:
+    cab = dict(resp.cabeceras)
+    if resp.estado != 304:
+        cab["Content-Length"] = str(len(resp.cuerpo))
+    cab["Connection"] = "keep-alive" if mantener_viva else "close"
+    lineas = [f"HTTP/1.1 {resp.estado} {_RAZONES.get(resp.estado, '')}"]
+    lineas.extend(f"{k}: {v}" for k, v in cab.items())
+    return ("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1") + resp.cuerpo
+
+
+async def _manejar_conexion(api: ApiTienda, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter):
+    try:
+        while True:
+            try:
+                crudo = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                return
+            except asyncio.LimitOverrunError:
+                writer.write(_serializar(_json(413, {"error": "Cabecera demasiado grande."}), False))
+                return
+
+            linea, *resto = crudo.decode("latin-1").split("\r\n")
+            try:
+                metodo, ruta, version = linea.split(" ", 2)
+            except ValueError:
+                writer.write(_serializar(_json(400, {"error": "Línea de petición inválida."}), False))
+                return
+            cabeceras = {}
+            for cab in resto:
+                if ":" in cab:
+                    k, v = cab.split(":", 1)
+                    cabeceras[k.strip().lower()] = v.strip()
+
+            conexion = cabeceras.get("connection", "").lower()
+            if version == "HTTP/1.0":
+                mantener_viva = conexion == "keep-alive"
+            else:
+                mantener_viva = conexion != "close"
+
+            if "chunked" in cabeceras.get("transfer-encoding", "").lower():
+                writer.write(_serializar(_json(411, {"error": "Envía Content-Length."}), False))
+                return
+            try:
+                largo = int(cabeceras.get("content-length", "0") or 0)
+            except ValueError:
+                largo = -1
+            if largo < 0:
+                writer.write(_serializar(_json(400, {"error": "Content-Length inválido."}), False))
+                return
+            if largo > MAX_BYTES_CUERPO:
+                writer.write(_serializar(_json(413, {"error": "Cuerpo demasiado grande."}), False))
+                return
+            cuerpo = await reader.readexactly(largo) if largo else b""
+
+            try:
+                resp = await api.atender(metodo.upper(), ruta, cabeceras, cuerpo)
+            except ErrorHttp as e:
+                resp = _json(e.estado, {"error": e.mensaje})
+            except Exception as e:   # noqa: BLE001 — la conexión debe responder igual
+                resp = _json(500, {"error": f"{type(e).__name__}: {e}"})
+
+            # Pipelining: las peticiones siguientes ya pueden estar en el buffer
+            # del reader; se atienden en orden en la próxima vuelta del bucle.
+            writer.write(_serializar(resp, mantener_viva))
+            await writer.drain()
+            if not mantener_viva:
+                return
+    except (ConnectionError, asyncio.IncompleteReadError):
+        return
+    finally:
+        with contextlib.suppress(Exception):
+            await writer.drain()
+        writer.close()
+
+
+async def iniciar_servidor(svc: TiendaService, host: str = "127.0.0.1",
+                           puerto: int = 8080) -> asyncio.AbstractServer:
+    """Crea y arranca el servidor (útil para embeberlo o en benchmarks)."""
+    api = ApiTienda(svc)
+    return await asyncio.start_server(
+        lambda r, w: _manejar_conexion(api, r, w), host, puerto,
+        limit=MAX_BYTES_CABECERA,
+    )
+
+
+def servir(svc: TiendaService, host: str = "127.0.0.1", puerto: int = 8080,
+           silencioso: bool = True):
+    """
+    Bloquea atendiendo peticiones hasta Ctrl+C.
+    Con silencioso=True se descartan los print() de las capas inferiores
+    (Factory, Adapter...), que por petición serían demasiado ruido.
+    """
+    async def _principal():
+        servidor = await iniciar_servidor(svc, host, puerto)
+        print(f"  🌐 API escuchando en http://{host}:{puerto}")
+        salida = open(os.devnull, "w") if silencioso else None
+        try:
+            with contextlib.redirect_stdout(salida) if salida else contextlib.nullcontext():
+                async with servidor:
+                    await servidor.serve_forever()
+        finally:
+            if salida:
+                salida.close()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_principal())
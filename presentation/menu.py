@@ -3,13 +3,13 @@ CAPA: Presentation
 ====================
 Menú interactivo en consola. Solo habla con TiendaService.
 """
-import os
 from application.services.tienda_service import TiendaService
 from infrastructure.config.configuracion import ConfiguracionTienda
+from presentation.render import Pantalla, RenderizadorTienda
 
 
-def cls():
-    os.system("cls" if os.name == "nt" else "clear")
+# Filas cacheadas entre redibujados de todas las pantallas
+_render = RenderizadorTienda()
 
 
 def sep(titulo=""):
@@ -25,24 +25,30 @@ def enter():
 
 # ── Menú principal ───────────────────────────────────────
 
-def menu_principal(svc: TiendaService, config: ConfiguracionTienda):
-    while True:
-        cls()
-        sep(f"🎮 {config.obtener('nombre_tienda')} — Menú Principal")
-        print(f"""
+_OPCIONES_PRINCIPAL = """
   [1] 📋 Ver catálogo
   [2] 🛒 Agregar al carrito
   [3] 🧾 Ver carrito
   [4] 💳 Finalizar compra
   [5] 📦 Historial de pedidos
   [6] ⚙️  Configuración de la tienda
+  [7] ⭐ Mis suscripciones
   [0] 🚪 Salir
-        """)
+        """
+
+
+def menu_principal(svc: TiendaService, config: ConfiguracionTienda):
+    while True:
+        pantalla = Pantalla(limpiar=True)
+        pantalla.separador(f"🎮 {config.obtener('nombre_tienda')} — Menú Principal")
+        pantalla.linea(_OPCIONES_PRINCIPAL)
 
         if svc._cliente_actual:
-            print(f"  👤 Cliente: {svc._cliente_actual}  |  "
-                  f"Carrito: {len(svc.ver_carrito())} item(s)  |  "
-                  f"Total: S/ {svc.total_carrito():.2f}")
+            pantalla.linea(f"  👤 Cliente: {svc._cliente_actual}  |  "
+                           f"Carrito: {len(svc.ver_carrito())} item(s)  |  "
+                           f"Total: S/ {svc.total_carrito():.2f}")
+            pantalla.lineas(_avisos_suscripcion(svc))
+        pantalla.volcar()
 
         op = input("\n  Opción: ").strip()
 
@@ -55,6 +61,7 @@ def menu_principal(svc: TiendaService, config: ConfiguracionTienda):
             sep("⚙️  Configuración")
             config.mostrar()
             enter()
+        elif op == "7": menu_suscripciones(svc)
         elif op == "0":
             print("\n  👋 ¡Gracias por visitar GameStore!\n")
             break
@@ -67,19 +74,39 @@ def menu_principal(svc: TiendaService, config: ConfiguracionTienda):
 
 def menu_catalogo(svc: TiendaService):
     sep("📋 Catálogo de Juegos")
-    print("  Filtrar por: [1] Todos  [2] Físico  [3] Digital  [4] DLC  [5] Suscripción")
+    # Opciones generadas desde el registro de tipos (incluye plugins)
+    tipos = svc.tipos_producto()
+    filtros = {str(n): tipo for n, (tipo, _) in enumerate(tipos, start=2)}
+    opciones = "  ".join(f"[{n}] {etiqueta}" for n, (_, etiqueta) in enumerate(tipos, start=2))
+    print(f"  Filtrar por: [1] Todos  {opciones}")
     f = input("  Filtro: ").strip()
-    filtros = {"2": "FISICO", "3": "DIGITAL", "4": "DLC", "5": "SUSCRIPCION"}
     filtro = filtros.get(f, "")
 
     productos = svc.listar_catalogo(filtro)
-    print(f"\n  {'ID':<6} {'Nombre':<35} {'Plataforma':<18} {'Tipo':<12} {'Precio':>8}")
-    print(f"  {'─'*82}")
-    for p in productos:
-        stock_txt = f"(stock: {p.stock})" if p.tipo == "FISICO" else ""
-        print(f"  {p.id:<6} {p.nombre:<35} {p.plataforma:<18} {p.tipo:<12} "
-              f"S/{p.precio:>7.2f} {stock_txt}")
-    enter()
+    pagina = 0
+    while True:
+        filas, pagina, total = _render.paginar(productos, pagina)
+        pantalla = Pantalla()
+        pantalla.lineas(_render.encabezado_catalogo())
+        pantalla.lineas(_render.fila_producto(p) for p in filas)
+        pantalla.volcar()
+        pagina = _navegar_paginas(pagina, total)
+        if pagina is None:
+            return
+
+
+def _navegar_paginas(pagina: int, total: int) -> int | None:
+    """Pie de paginación. Retorna la nueva página o None si el usuario sale."""
+    if total <= 1:
+        enter()
+        return None
+    print(f"\n  Página {pagina + 1}/{total}  —  [N] Siguiente  [P] Anterior  [ENTER] Volver")
+    op = input("  Opción: ").strip().upper()
+    if op == "N":
+        return pagina + 1
+    if op == "P":
+        return pagina - 1
+    return None
 
 
 def menu_agregar(svc: TiendaService):
@@ -124,19 +151,22 @@ def menu_carrito(svc: TiendaService):
         enter()
         return
 
-    print(f"\n  {'Producto':<35} {'Cant':>5} {'P.Unit':>8} {'Subtotal':>10}")
-    print(f"  {'─'*62}")
-    for item in items:
-        print(f"  {item.producto.nombre:<35} {item.cantidad:>5} "
-              f"S/{item.precio_unitario:>7.2f} S/{item.subtotal:>9.2f}")
-    print(f"  {'─'*62}")
-
-    igv = ConfiguracionTienda().calcular_igv(svc.total_carrito())
-    print(f"  {'Subtotal':>50} S/{svc.total_carrito():>9.2f}")
-    print(f"  {'IGV (18%)':>50} S/{igv:>9.2f}")
-    print(f"  {'TOTAL':>50} S/{svc.total_carrito():>9.2f}")
-
-    print("\n  [1] Continuar comprando  [2] Vaciar carrito  [ENTER] Volver")
+    total = svc.total_carrito()
+    igv = ConfiguracionTienda().calcular_igv(total)
+    pantalla = Pantalla()
+    pantalla.linea(f"\n  {'Producto':<35} {'Cant':>5} {'P.Unit':>8} {'Subtotal':>10}")
+    pantalla.linea(f"  {'─'*62}")
+    pantalla.lineas(_render.fila_item(item) for item in items)
+    pantalla.linea(f"  {'─'*62}")
+    pantalla.linea(f"  {'Subtotal':>50} S/{total:>9.2f}")
+    pantalla.linea(f"  {'IGV (18%)':>50} S/{igv:>9.2f}")
+    pantalla.linea(f"  {'TOTAL':>50} S/{total:>9.2f}")
+    sugerencias = svc.sugerencias()
+    if sugerencias:
+        pantalla.linea("\n  Quienes compraron esto también compraron:")
+        pantalla.lineas(_render.fila_sugerencia(p) for p in sugerencias)
+    pantalla.linea("\n  [1] Continuar comprando  [2] Vaciar carrito  [ENTER] Volver")
+    pantalla.volcar()
     op = input("  Opción: ").strip()
     if op == "2":
         svc.vaciar_carrito()
@@ -153,11 +183,14 @@ def menu_checkout(svc: TiendaService):
         return
 
     pedido = svc.crear_pedido()
-    pedido.mostrar()
+    _mostrar_pedido(pedido)
 
+    # Opciones generadas desde el registro de pasarelas (incluye plugins)
+    disponibles = svc.pasarelas_disponibles()
+    metodos = {str(n): clave for n, (clave, _) in enumerate(disponibles, start=1)}
     print(f"\n  Método de pago:")
-    print(f"    [1] PayPal    [2] Culqi    [3] Yape")
-    metodos = {"1": "PAYPAL", "2": "CULQI", "3": "YAPE"}
+    print("    " + "    ".join(f"[{n}] {etiqueta}"
+                                for n, (_, etiqueta) in enumerate(disponibles, start=1)))
     op = input("  Elige método: ").strip()
     metodo = metodos.get(op)
 
@@ -172,7 +205,7 @@ def menu_checkout(svc: TiendaService):
 
     if ok:
         print(f"\n  ✅ {msg}")
-        pedido.mostrar()
+        _mostrar_pedido(pedido)
     else:
         print(f"\n  ❌ {msg}")
 
@@ -185,12 +218,81 @@ def menu_historial(svc: TiendaService):
 
     if not pedidos:
         print("  No hay pedidos registrados aún.")
-    else:
-        for p in pedidos:
-            icono = "🟢" if p.estado == "PAGADO" else "🔴"
-            print(f"\n  {icono} Pedido {p.id} | {p.cliente} | "
-                  f"S/{p.total:.2f} | {p.metodo_pago}")
-            for item in p.items:
-                print(f"     → {item.cantidad}x {item.producto.nombre}")
+        enter()
+        return
+
+    pagina = 0
+    while True:
+        visibles, pagina, total = _render.paginar(pedidos, pagina)
+        pantalla = Pantalla()
+        for p in visibles:
+            pantalla.lineas(_render.resumen_pedido(p))
+        pantalla.volcar()
+        print(f"\n  Página {pagina + 1}/{total}  —  [N] Siguiente  [P] Anterior  "
+              f"[C] Cancelar pedido  [ENTER] Volver")
+        op = input("  Opción: ").strip().upper()
+        if op == "N":
+            pagina += 1
+        elif op == "P":
+            pagina -= 1
+        elif op == "C":
+            _cancelar_pedido(svc)
+        else:
+            return
+
+
+def _cancelar_pedido(svc: TiendaService):
+    id_pedido = input("  ID del pedido a cancelar: ").strip()
+    pedido = svc.buscar_pedido(id_pedido)
+    if pedido is None:
+        print(f"  ❌ Pedido '{id_pedido}' no encontrado.")
+        enter()
+        return
+    if input(f"  ¿Cancelar {pedido.id} y reembolsar S/{pedido.total:.2f}? (s/n): ").strip().lower() != "s":
+        return
+    motivo = input("  Motivo (opcional): ").strip()
+    ok, msg = svc.cancelar_pedido(pedido, motivo)
+    print(f"\n  {'✅' if ok else '❌'} {msg}")
+    enter()
 
+
+def menu_suscripciones(svc: TiendaService):
+    sep("⭐ Mis Suscripciones")
+    if not svc._cliente_actual:
+        print("  ⚠️  Ingresa tu nombre primero (opción 2).")
+        enter()
+        return
+    suscripciones = svc.suscripciones_de(svc._cliente_actual)
+    if not suscripciones:
+        print("  No tienes suscripciones activas.")
+        enter()
+        return
+    pantalla = Pantalla()
+    pantalla.linea(f"\n  {'Plan':<35} {'Desde':>10} {'Hasta':>10}")
+    pantalla.linea(f"  {'─'*57}")
+    pantalla.lineas(_render.fila_suscripcion(sub, svc.buscar_producto(sub.id_producto))
+                    for sub in suscripciones)
+    pantalla.volcar()
     enter()
+
+
+def _avisos_suscripcion(svc: TiendaService) -> list[str]:
+    """Vencimientos y recordatorios pendientes del cliente actual."""
+    if not svc._cliente_actual:
+        return []
+    vencidas, por_vencer = svc.avisos_suscripcion(svc._cliente_actual)
+    lineas = []
+    for sub in por_vencer + vencidas:
+        producto = svc.buscar_producto(sub.id_producto)
+        nombre = producto.nombre if producto else sub.id_producto
+        if sub in por_vencer:
+            lineas.append(f"  🔔 Tu suscripción {nombre} vence pronto. ¡Renuévala!")
+        else:
+            lineas.append(f"  ⌛ Tu suscripción {nombre} ha vencido.")
+    return lineas
+
+
+def _mostrar_pedido(pedido):
+    pantalla = Pantalla()
+    pantalla.lineas(_render.lineas_pedido(pedido))
+    pantalla.volcar()
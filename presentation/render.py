@@ -0,0 +1,159 @@
+"""
+CAPA: Presentation / Render
+=============================
+Renderizado de las pantallas de consola (catálogo, carrito, historial).
+
+- Cada fila formateada se guarda en caché junto con la "versión" del
+  producto o pedido que la generó (precio, stock, estado...). Si la
+  versión no cambió, el redibujado reutiliza la cadena ya construida.
+- Las listas largas se paginan.
+- Toda la pantalla se arma en un buffer y se escribe con un solo write.
+- La pantalla se limpia con secuencias ANSI, sin lanzar un subproceso.
+"""
+import sys
+from datetime import datetime
+
+from domain.model.modelos import Producto, ItemPedido, Pedido, Suscripcion
+
+
+LIMPIAR_PANTALLA = "\033[2J\033[H"
+FILAS_POR_PAGINA = 20
+ANCHO_SEPARADOR = 58
+
+
+class Pantalla:
+    """Buffer de líneas que se vuelca a la salida en una única escritura."""
+
+    def __init__(self, limpiar: bool = False):
+        self._partes: list[str] = [LIMPIAR_PANTALLA] if limpiar else []
+
+    def linea(self, texto: str = ""):
+        self._partes.append(texto + "\n")
+
+    def lineas(self, textos):
+        self._partes.extend(t + "\n" for t in textos)
+
+    def separador(self, titulo: str = ""):
+        self._partes.append("\n" + "═" * ANCHO_SEPARADOR + "\n")
+        if titulo:
+            self._partes.append(f"  {titulo}\n")
+            self._partes.append("═" * ANCHO_SEPARADOR + "\n")
+
+    def volcar(self, salida=None):
+        salida = salida or sys.stdout
+        salida.write("".join(self._partes))
+        salida.flush()
+        self._partes = []
+
+
+class RenderizadorTienda:
+    """
+    Construye y cachea las filas de texto de cada pantalla.
+
+    Las cachés se indexan por id (producto o pedido) y guardan la tupla de
+    versión con la que se generó la fila: un cambio de stock o de precio
+    invalida solo la fila de ese producto.
+    """
+
+    def __init__(self, por_pagina: int = FILAS_POR_PAGINA):
+        self.por_pagina = por_pagina
+        self._filas_producto: dict[str, tuple[tuple, str]] = {}
+        self._filas_item:     dict[str, tuple[tuple, str]] = {}
+        self._lineas_pedido:  dict[str, tuple[tuple, list[str]]] = {}
+        self._resumen_pedido: dict[str, tuple[tuple, list[str]]] = {}
+
+    # ── Catálogo ──────────────────────────────────────────
+
+    @staticmethod
+    def encabezado_catalogo() -> list[str]:
+        return [f"\n  {'ID':<6} {'Nombre':<35} {'Plataforma':<18} {'Tipo':<12} {'Precio':>8}",
+                f"  {'─'*82}"]
+
+    def fila_producto(self, p: Producto) -> str:
+        version = (p.nombre, p.plataforma, p.tipo, p.precio, p.stock)
+        cache = self._filas_producto.get(p.id)
+        if cache is not None and cache[0] == version:
+            return cache[1]
+        stock_txt = f"(stock: {p.stock})" if p.tipo == "FISICO" else ""
+        fila = (f"  {p.id:<6} {p.nombre:<35} {p.plataforma:<18} {p.tipo:<12} "
+                f"S/{p.precio:>7.2f} {stock_txt}")
+        self._filas_producto[p.id] = (version, fila)
+        return fila
+
+    # ── Carrito ───────────────────────────────────────────
+
+    def fila_item(self, item: ItemPedido) -> str:
+        p = item.producto
+        version = (p.nombre, item.cantidad, item.precio_unitario, item.promocion)
+        cache = self._filas_item.get(p.id)
+        if cache is not None and cache[0] == version:
+            return cache[1]
+        fila = (f"  {p.nombre:<35} {item.cantidad:>5} "
+                f"S/{item.precio_unitario:>7.2f} S/{item.subtotal:>9.2f}")
+        if item.promocion:
+            fila += f"  🏷️  {item.promocion}"
+        self._filas_item[p.id] = (version, fila)
+        return fila
+
+    @staticmethod
+    def fila_sugerencia(p: Producto) -> str:
+        return f"  💡 [{p.id}] {p.nombre:<35} {p.tipo:<12} S/{p.precio:>7.2f}"
+
+    # ── Pedidos ───────────────────────────────────────────
+
+    @staticmethod
+    def _version_pedido(pedido: Pedido) -> tuple:
+        return (pedido.estado, pedido.metodo_pago, pedido.id_transaccion,
+                tuple((i.producto.id, i.cantidad, i.precio_unitario) for i in pedido.items))
+
+    def lineas_pedido(self, pedido: Pedido) -> list[str]:
+        """Detalle completo del pedido (equivalente a Pedido.mostrar)."""
+        version = self._version_pedido(pedido)
+        cache = self._lineas_pedido.get(pedido.id)
+        if cache is not None and cache[0] == version:
+            return cache[1]
+        lineas = pedido.lineas()
+        self._lineas_pedido[pedido.id] = (version, lineas)
+        return lineas
+
+    def resumen_pedido(self, pedido: Pedido) -> list[str]:
+        """Bloque compacto usado en el historial."""
+        version = self._version_pedido(pedido)
+        cache = self._resumen_pedido.get(pedido.id)
+        if cache is not None and cache[0] == version:
+            return cache[1]
+        icono = {"PAGADO": "🟢", "CANCELADO": "⚪"}.get(pedido.estado, "🔴")
+        lineas = [f"\n  {icono} Pedido {pedido.id} | {pedido.cliente} | "
+                  f"S/{pedido.total:.2f} | {pedido.metodo_pago}"]
+        lineas.extend(f"     → {item.cantidad}x {item.producto.nombre}"
+                      for item in pedido.items)
+        self._resumen_pedido[pedido.id] = (version, lineas)
+        return lineas
+
+    # ── Suscripciones ─────────────────────────────────────
+
+    @staticmethod
+    def fila_suscripcion(sub: Suscripcion, producto: Producto | None) -> str:
+        nombre = producto.nombre if producto else sub.id_producto
+        desde = datetime.fromtimestamp(sub.inicio).strftime("%d/%m/%Y")
+        hasta = datetime.fromtimestamp(sub.fin).strftime("%d/%m/%Y")
+        return f"  {nombre:<35} {desde:>10} {hasta:>10}"
+
+    # ── Paginación ────────────────────────────────────────
+
+    def paginar(self, elementos: list, pagina: int) -> tuple[list, int, int]:
+        """
+        Retorna (elementos_de_la_pagina, pagina_ajustada, total_paginas).
+        Las páginas empiezan en 0.
+        """
+        total = max(1, -(-len(elementos) // self.por_pagina))
+        pagina = min(max(pagina, 0), total - 1)
+        inicio = pagina * self.por_pagina
+        return elementos[inicio:inicio + self.por_pagina], pagina, total
+
+    def invalidar(self):
+        """Descarta todas las filas cacheadas."""
+        self._filas_producto.clear()
+        self._filas_item.clear()
+        self._lineas_pedido.clear()
+        self._resumen_pedido.clear()